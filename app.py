@@ -17,7 +17,7 @@ from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
 from dotenv import load_dotenv
-from flask import Flask, jsonify, render_template, request, redirect, url_for, session
+from flask import Flask, Response, jsonify, render_template, request, redirect, stream_with_context, url_for, session
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_talisman import Talisman
@@ -28,6 +28,13 @@ import config
 from backend import api as api_bp
 from backend import certificados as certificados_bp
 from backend import publico as publico_bp
+from backend import recursos as recursos_bp
+from backend.cache_paginas import invalidar_paginas_ciudadano, obtener_cache_paginas
+from backend.cache_pdf import invalidar_pdfs_ciudadano, obtener_cache, obtener_cache_vista_previa
+from backend.exportacion_zip import datos_exportacion, generar_zip_certificados
+from backend.filtro_codigos import obtener_filtro_codigos
+from backend.pdf import configurar_reportlab
+from backend.recursos import url_recurso, urls_recurso
 from backend.ciudadanos import seed_si_vacia
 from models import init_db
 from models import AdminUser, AdminLoginAttempt, Ciudadano, DocumentoGenerado, db
@@ -39,6 +46,7 @@ def crear_app() -> Flask:
 
     app = Flask(__name__)
     app.config.from_object(config)
+    configurar_reportlab(app.config)
 
     # Directorios
     os.makedirs(str(config.DATABASE_DIR), exist_ok=True)
@@ -87,6 +95,10 @@ def crear_app() -> Flask:
             "ui_min_transition_seconds": getattr(config, "UI_MIN_TRANSITION_SECONDS", 2),
         }
 
+    # CSS/JS compilados con huella (manage_assets.py build); sin compilar, los originales
+    app.add_template_global(url_recurso, "url_recurso")
+    app.add_template_global(urls_recurso, "urls_recurso")
+
     with app.app_context():
         asegurar_tablas()
         if config.SEED_ON_START:
@@ -97,6 +109,7 @@ def crear_app() -> Flask:
     app.register_blueprint(api_bp)
     app.register_blueprint(certificados_bp)
     app.register_blueprint(publico_bp)
+    app.register_blueprint(recursos_bp)
 
     # Páginas (templates)
     @app.get("/")
@@ -416,6 +429,24 @@ def crear_app() -> Flask:
         )
 
     
+    @app.get("/admin/estadisticas/caches")
+    def admin_estadisticas_caches():
+        """Aciertos/fallos de las cachés en memoria (del proceso que atiende la petición)."""
+        gate = _require_admin()
+        if gate:
+            return gate
+
+        filtro = obtener_filtro_codigos()
+        return jsonify(
+            {
+                "pid": os.getpid(),
+                "pdf": obtener_cache().estadisticas(),
+                "vista_previa": obtener_cache_vista_previa().estadisticas(),
+                "paginas_verificacion": obtener_cache_paginas().estadisticas(),
+                "filtro_codigos": filtro.estadisticas() if filtro is not None else None,
+            }
+        )
+
     @app.get("/admin/certificados")
     def admin_certificado():
         """Generador de certificados como administrador (sin reto de fecha de nacimiento).
@@ -451,6 +482,31 @@ def crear_app() -> Flask:
         )
 
 
+    def _consulta_registros(q_raw: str, origen: str):
+        """Join DocumentoGenerado + Ciudadano con los filtros del listado de registros.
+
+        Retorna (query, origen normalizado).
+        """
+        query = (
+            db.session.query(DocumentoGenerado, Ciudadano)
+            .join(Ciudadano, DocumentoGenerado.ciudadano_id == Ciudadano.id)
+        )
+
+        if q_raw:
+            s = f"%{q_raw}%"
+            query = query.filter(
+                (DocumentoGenerado.codigo.ilike(s))
+                | (Ciudadano.numero_documento.ilike(s))
+                | (Ciudadano.nombre_completo.ilike(s))
+            )
+
+        if origen in {"usuario", "admin"}:
+            query = query.filter(DocumentoGenerado.generado_por == origen)
+        else:
+            origen = "todos"
+
+        return query, origen
+
     @app.get("/admin/certificados/registros")
     def admin_registros_certificados():
         """Listado de todos los certificados generados (usuario y admin).
@@ -472,24 +528,7 @@ def crear_app() -> Flask:
         # Paginación: máximo 10 registros por página (carga desde BD por página)
         per_page = 10
 
-        # Join DocumentoGenerado + Ciudadano para mostrar datos del titular
-        query = (
-            db.session.query(DocumentoGenerado, Ciudadano)
-            .join(Ciudadano, DocumentoGenerado.ciudadano_id == Ciudadano.id)
-        )
-
-        if q_raw:
-            s = f"%{q_raw}%"
-            query = query.filter(
-                (DocumentoGenerado.codigo.ilike(s))
-                | (Ciudadano.numero_documento.ilike(s))
-                | (Ciudadano.nombre_completo.ilike(s))
-            )
-
-        if origen in {"usuario", "admin"}:
-            query = query.filter(DocumentoGenerado.generado_por == origen)
-        else:
-            origen = "todos"
+        query, origen = _consulta_registros(q_raw, origen)
 
         total = query.count()
         pages = max(1, int(math.ceil(total / per_page))) if total else 1
@@ -551,6 +590,41 @@ def crear_app() -> Flask:
             pages=pages,
             prev_url=_page_url(page_i - 1) if page_i > 1 else None,
             next_url=_page_url(page_i + 1) if page_i < pages else None,
+            export_url=url_for(
+                "admin_registros_exportar",
+                **{k: v for k, v in {"q": q_raw, "origen": origen}.items() if v and v != "todos"},
+            ),
+        )
+
+    @app.get("/admin/certificados/registros/exportar")
+    def admin_registros_exportar():
+        """Descarga un ZIP con todos los certificados que coinciden con el filtro actual.
+
+        El ZIP se emite por partes mientras los PDFs se renderizan en paralelo.
+        """
+        gate = _require_admin()
+        if gate:
+            return gate
+
+        q_raw = (request.args.get("q") or "").strip()
+        origen = (request.args.get("origen") or "todos").strip().lower()
+        query, _ = _consulta_registros(q_raw, origen)
+        items = datos_exportacion(query.order_by(DocumentoGenerado.id.desc()).all())
+
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        chunks = generar_zip_certificados(
+            app,
+            items,
+            base_url=request.host_url.rstrip("/"),
+            hilos=config.RENDER_WORKERS or 1,
+        )
+        return Response(
+            stream_with_context(chunks),
+            mimetype="application/zip",
+            headers={
+                "Content-Disposition": f'attachment; filename="certificados_{stamp}.zip"',
+                "Cache-Control": "no-store",
+            },
         )
 
 
@@ -922,6 +996,9 @@ def crear_app() -> Flask:
         r.fecha_nacimiento = nacimiento
         r.activo = bool(activo)
         db.session.commit()
+        # Los PDFs y la página de verificación en caché llevan los datos del titular
+        invalidar_pdfs_ciudadano(r.id)
+        invalidar_paginas_ciudadano(r.id)
 
         _set_admin_flash("success", f"Usuario \"{r.nombre_completo}\" ha sido actualizado.")
         return redirect(url_for("admin_ciudadanos", estado="todos", q=numero_norm))
@@ -939,6 +1016,8 @@ def crear_app() -> Flask:
 
         r.activo = not bool(r.activo)
         db.session.commit()
+        # La página de verificación muestra el estado de afiliación
+        invalidar_paginas_ciudadano(r.id)
 
         _set_admin_flash(
             "success",
@@ -1,5 +1,6 @@
 from .rutas_api import api
 from .rutas_certificados import certificados
 from .rutas_publicas import publico
+from .recursos import recursos
 
-__all__ = ["api", "certificados", "publico"]
+__all__ = ["api", "certificados", "publico", "recursos"]
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
+from flask import current_app
+
+from backend.pdf import version_render
+
+
+_ultimo_barrido = 0.0
+
+# Los PDFs de otra versión del render ya no se sirven (no coinciden con ninguna
+# clave). Se conservan unos minutos por si un worker aún sin actualizar los
+# está entregando durante un despliegue escalonado.
+GRACIA_OTRA_VERSION_S = 600
+
+
+def almacen_activo() -> bool:
+    return bool(current_app.config.get("PDF_ALMACEN_DISCO"))
+
+
+def _directorio() -> Path:
+    return Path(current_app.config.get("CERTIFICADOS_DIR") or "generated") / "pdf"
+
+
+def _retencion_s() -> float:
+    return float(current_app.config.get("CERT_FILE_RETENTION_HOURS") or 24) * 3600
+
+
+def ruta_almacen(clave: tuple) -> Path:
+    """Ruta del PDF para `clave`: <versión del render>/ab/cd/abcd….pdf.
+
+    El nombre es la huella de la clave (todo lo que influye en los bytes, con
+    la versión del render), así que un cambio en los datos del titular o un
+    despliegue que cambia el render produce otro archivo. El directorio por
+    versión permite retirar de una vez los PDFs de renders anteriores.
+    """
+    nombre = hashlib.sha256(repr(clave).encode("utf-8")).hexdigest()
+    return _directorio() / version_render() / nombre[:2] / nombre[2:4] / f"{nombre}.pdf"
+
+
+def vigente(ruta: Path) -> bool:
+    """El archivo existe y no superó CERT_FILE_RETENTION_HOURS."""
+    try:
+        return time.time() - ruta.stat().st_mtime <= _retencion_s()
+    except FileNotFoundError:
+        return False
+
+
+def leer(clave: tuple) -> bytes | None:
+    ruta = ruta_almacen(clave)
+    if not vigente(ruta):
+        return None
+    try:
+        return ruta.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def guardar(clave: tuple, data: bytes) -> Path:
+    """Escritura atómica: archivo temporal en el mismo directorio + os.replace."""
+    ruta = ruta_almacen(clave)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ruta.with_name(f".{ruta.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, ruta)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+    _barrer_si_toca()
+    return ruta
+
+
+def limpiar_almacen() -> int:
+    """Elimina los PDFs con más de CERT_FILE_RETENTION_HOURS y los de renders anteriores.
+
+    Los de otra versión del render (incluida la distribución antigua ab/cd/
+    sin versión) se eliminan pasados GRACIA_OTRA_VERSION_S. Retorna cuántos.
+    """
+    raiz = _directorio()
+    if not raiz.exists():
+        return 0
+
+    ahora = time.time()
+    actual = version_render()
+    eliminados = 0
+    for ruta in raiz.rglob("*"):
+        try:
+            if not ruta.is_file():
+                continue
+            vigencia = _retencion_s() if ruta.relative_to(raiz).parts[0] == actual else GRACIA_OTRA_VERSION_S
+            if ahora - ruta.stat().st_mtime > vigencia:
+                ruta.unlink()
+                eliminados += 1
+        except OSError:
+            pass
+
+    # Directorios vacíos de otras versiones (los más profundos primero)
+    for carpeta in sorted((c for c in raiz.rglob("*") if c.is_dir()), key=lambda c: len(c.parts), reverse=True):
+        if carpeta.relative_to(raiz).parts[0] != actual:
+            try:
+                carpeta.rmdir()
+            except OSError:
+                pass
+    return eliminados
+
+
+def _barrer_si_toca() -> None:
+    # A lo sumo un barrido por hora y por proceso, aprovechando las escrituras.
+    global _ultimo_barrido
+    ahora = time.time()
+    if ahora - _ultimo_barrido < 3600:
+        return
+    _ultimo_barrido = ahora
+    limpiar_almacen()
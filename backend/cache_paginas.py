@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import current_app
+from markupsafe import escape
+
+
+# Marcador del token CSRF de base.html: la página cacheada es compartida entre
+# visitantes, así que el token de cada sesión se inserta al servirla.
+MARCA_CSRF = "__csrf_token_pagina_cacheada__"
+
+
+class PaginaCacheada:
+    """HTML renderizado junto con sus validadores (para responder 304 sin consultar la BD)."""
+
+    __slots__ = ("html", "etag", "ultima")
+
+    def __init__(self, html: str, etag: str, ultima: datetime | None) -> None:
+        self.html = html
+        self.etag = etag
+        self.ultima = ultima
+
+
+class CachePaginas:
+    """Micro-caché LRU de páginas HTML con vencimiento corto.
+
+    - Cada entrada vence `ttl_s` segundos después de guardarse.
+    - Al superar `max_entradas` se expulsan las menos usadas.
+    - Las entradas se indexan también por ciudadano para poder invalidarlas
+      cuando el Admin lo edita o lo activa/desactiva.
+    """
+
+    def __init__(self, ttl_s: float, max_entradas: int) -> None:
+        self.ttl_s = max(0.0, float(ttl_s))
+        self.max_entradas = max(0, int(max_entradas))
+        self._entradas: OrderedDict[str, tuple[PaginaCacheada, int, float]] = OrderedDict()
+        self._por_ciudadano: dict[int, set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def activa(self) -> bool:
+        return self.ttl_s > 0 and self.max_entradas > 0
+
+    def get(self, clave: str) -> PaginaCacheada | None:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada[2] <= time.monotonic():
+                if entrada is not None:
+                    self._quitar(clave)
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.hits += 1
+            return entrada[0]
+
+    def put(self, clave: str, pagina: PaginaCacheada, *, ciudadano_id: int) -> None:
+        if not self.activa:
+            return
+
+        with self._lock:
+            if clave in self._entradas:
+                self._quitar(clave)
+
+            self._entradas[clave] = (pagina, ciudadano_id, time.monotonic() + self.ttl_s)
+            self._por_ciudadano.setdefault(ciudadano_id, set()).add(clave)
+
+            while len(self._entradas) > self.max_entradas:
+                self._quitar(next(iter(self._entradas)))
+
+    def invalidar_ciudadano(self, ciudadano_id: int) -> int:
+        """Elimina todas las páginas del ciudadano. Retorna cuántas se quitaron."""
+        with self._lock:
+            claves = list(self._por_ciudadano.get(ciudadano_id, ()))
+            for clave in claves:
+                self._quitar(clave)
+            return len(claves)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self._por_ciudadano.clear()
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _quitar(self, clave: str) -> None:
+        _, ciudadano_id, _ = self._entradas.pop(clave)
+        claves = self._por_ciudadano.get(ciudadano_id)
+        if claves is not None:
+            claves.discard(clave)
+            if not claves:
+                del self._por_ciudadano[ciudadano_id]
+
+
+def obtener_cache_paginas() -> CachePaginas:
+    """Caché de páginas de verificación de la app actual (PAGINA_VERIFICACION_CACHE_*)."""
+    cache = current_app.extensions.get("cache_paginas_verificacion")
+    if cache is None:
+        cfg = current_app.config
+        cache = current_app.extensions.setdefault(
+            "cache_paginas_verificacion",
+            CachePaginas(
+                float(cfg.get("PAGINA_VERIFICACION_CACHE_SECONDS") or 0),
+                int(cfg.get("PAGINA_VERIFICACION_CACHE_MAX") or 0),
+            ),
+        )
+    return cache
+
+
+def contexto_cacheable() -> dict:
+    """Variables extra para render_template: el token CSRF queda como marcador."""
+    return {"csrf_token": lambda: MARCA_CSRF}
+
+
+def html_para_peticion(pagina: PaginaCacheada) -> str:
+    """HTML de la página cacheada con el token CSRF de la sesión actual."""
+    generar = current_app.jinja_env.globals.get("csrf_token")
+    token = str(escape(generar())) if generar is not None else ""
+    return pagina.html.replace(MARCA_CSRF, token, 1)
+
+
+def invalidar_paginas_ciudadano(ciudadano_id: int) -> int:
+    """Descarta las páginas de verificación en caché del ciudadano."""
+    return obtener_cache_paginas().invalidar_ciudadano(ciudadano_id)
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from flask import current_app
+
+from backend import almacen_pdf, firma_digital
+from backend.condicional import huella, ultima_modificacion
+from backend.pdf import estampar_copia_verificacion, version_firma_configurada, version_render
+from backend.plantillas import definicion_plantilla
+from backend.render_unico import una_sola_vez
+from backend.servicio_render import cupo_render, renderizar_certificado
+
+
+class CachePDF:
+    """Caché LRU de PDFs renderizados con presupuesto de memoria en bytes.
+
+    - Al superar el presupuesto se expulsan las entradas menos usadas.
+    - Un PDF más grande que el presupuesto completo no se guarda.
+    - Las entradas se indexan también por ciudadano para poder invalidarlas
+      cuando el Admin edita sus datos.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self._entradas: OrderedDict[tuple, tuple[bytes, int]] = OrderedDict()
+        self._por_ciudadano: dict[int, set[tuple]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, clave: tuple) -> bytes | None:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.hits += 1
+            return entrada[0]
+
+    def put(self, clave: tuple, data: bytes, *, ciudadano_id: int) -> None:
+        size = len(data)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if clave in self._entradas:
+                self._quitar(clave)
+
+            self._entradas[clave] = (data, ciudadano_id)
+            self._por_ciudadano.setdefault(ciudadano_id, set()).add(clave)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes and self._entradas:
+                self._quitar(next(iter(self._entradas)))
+
+    def invalidar_ciudadano(self, ciudadano_id: int) -> int:
+        """Elimina todas las entradas del ciudadano. Retorna cuántas se quitaron."""
+        with self._lock:
+            claves = list(self._por_ciudadano.get(ciudadano_id, ()))
+            for clave in claves:
+                self._quitar(clave)
+            return len(claves)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self._por_ciudadano.clear()
+            self._bytes = 0
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _quitar(self, clave: tuple) -> None:
+        data, ciudadano_id = self._entradas.pop(clave)
+        self._bytes -= len(data)
+        claves = self._por_ciudadano.get(ciudadano_id)
+        if claves is not None:
+            claves.discard(clave)
+            if not claves:
+                del self._por_ciudadano[ciudadano_id]
+
+
+def obtener_cache() -> CachePDF:
+    """Caché de la app actual (se crea al primer uso con PDF_CACHE_MAX_BYTES)."""
+    cache = current_app.extensions.get("cache_pdf")
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            "cache_pdf",
+            CachePDF(int(current_app.config.get("PDF_CACHE_MAX_BYTES") or 0)),
+        )
+    return cache
+
+
+def obtener_cache_vista_previa() -> CachePDF:
+    """Caché de vistas previas PNG (VISTA_PREVIA_CACHE_MAX_BYTES)."""
+    cache = current_app.extensions.get("cache_vista_previa")
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            "cache_vista_previa",
+            CachePDF(int(current_app.config.get("VISTA_PREVIA_CACHE_MAX_BYTES") or 0)),
+        )
+    return cache
+
+
+def clave_certificado(*, doc, ciudadano, verify_url: str) -> tuple:
+    """Todo lo que influye en los bytes del certificado.
+
+    Incluye el registro (con su versión de plantilla), los datos del titular,
+    la configuración del firmante (con el mtime del archivo de firma, para
+    que reemplazarlo invalide la caché), el motor y la versión del render
+    (cambia con cada despliegue que toca el código de backend/pdf*.py o las
+    librerías) y el enlace de verificación (depende del host de la petición).
+    """
+    cfg = current_app.config
+    return (
+        doc.codigo,
+        doc.creado_en,
+        getattr(doc, "plantilla_version", None) or 1,
+        getattr(doc, "tipo_documento", "certificado_afiliacion"),
+        getattr(doc, "texto_personalizado", None),
+        ciudadano.id,
+        ciudadano.nombre_completo,
+        ciudadano.tipo_documento,
+        ciudadano.numero_documento,
+        cfg.get("CAPITAN_MENOR_NOMBRE"),
+        cfg.get("CAPITAN_MENOR_DOCUMENTO_TIPO"),
+        cfg.get("CAPITAN_MENOR_DOCUMENTO_NUMERO"),
+        cfg.get("CAPITAN_MENOR_FIRMA_RUTA"),
+        version_firma_configurada(),
+        cfg.get("APP_TIMEZONE"),
+        cfg.get("PDF_COMPACTO"),
+        cfg.get("PDF_MOTOR") or "canvas",
+        version_render(),
+        verify_url,
+    )
+
+
+def validadores_certificado(*, doc, ciudadano, verify_url: str) -> tuple[str, datetime | None]:
+    """ETag y Last-Modified del certificado, calculados sin renderizarlo.
+
+    El render es determinista, así que la clave de caché identifica los bytes
+    (con firma digital, los bytes firmados guardados). Last-Modified es la
+    emisión o el último cambio del titular, lo que sea más reciente.
+    """
+    clave = clave_certificado(doc=doc, ciudadano=ciudadano, verify_url=verify_url)
+    etag = huella(clave, bool(current_app.config.get("PDF_FIRMA_DIGITAL")))
+    ultima = ultima_modificacion(
+        doc.creado_en,
+        getattr(ciudadano, "actualizado_en", None) or getattr(ciudadano, "fecha_registro", None),
+    )
+    return etag, ultima
+
+
+def obtener_pdf_certificado(*, doc, ciudadano, verify_url: str, guardar_en_cache: bool = True) -> bytes:
+    """Retorna el PDF del certificado desde caché o lo renderiza y lo guarda.
+
+    Con PDF_ALMACEN_DISCO, antes de renderizar se busca en el almacén en disco
+    y cada render nuevo se persiste ahí. Con PDF_FIRMA_DIGITAL se entrega el
+    PDF firmado guardado en el registro; solo se vuelve a firmar si cambió el
+    contenido (la huella de `clave_certificado`).
+
+    Con guardar_en_cache=False (exportaciones masivas) se aprovecha la caché
+    pero no se llena con documentos que probablemente no se vuelvan a pedir.
+    """
+    cache = obtener_cache()
+    clave = clave_certificado(doc=doc, ciudadano=ciudadano, verify_url=verify_url)
+
+    pdf_bytes = cache.get(clave)
+    if pdf_bytes is not None:
+        return pdf_bytes
+
+    version = getattr(doc, "plantilla_version", None) or 1
+
+    def _render() -> bytes:
+        if almacen_pdf.almacen_activo():
+            data = almacen_pdf.leer(clave)
+            if data is not None:
+                return data
+
+        firmar = firma_digital.firma_digital_activa()
+        # La firma guardada solo sirve si se hizo sobre este mismo contenido.
+        huella_contenido = huella(clave) if firmar else ""
+        data = firma_digital.pdf_firmado_guardado(doc.id, huella_contenido) if firmar else None
+        if data is None:
+            data = renderizar_certificado(
+                ciudadano=ciudadano,
+                codigo=doc.codigo,
+                verify_url=verify_url,
+                emitido_en_utc=doc.creado_en,
+                tipo_documento=getattr(doc, "tipo_documento", "certificado_afiliacion"),
+                texto_personalizado=getattr(doc, "texto_personalizado", None),
+                # La matriz guardada solo sirve si el enlace coincide (mismo host).
+                qr_matriz=doc.qr_matriz if getattr(doc, "qr_datos", None) == verify_url else None,
+                plantilla_version=version,
+                plantilla_definicion=definicion_plantilla(version),
+            )
+            if firmar:
+                data = firma_digital.firmar_y_guardar(doc, data, huella=huella_contenido)
+
+        if almacen_pdf.almacen_activo():
+            almacen_pdf.guardar(clave, data)
+        return data
+
+    # Varias lecturas simultáneas del mismo QR comparten un único render.
+    pdf_bytes = una_sola_vez(clave, _render)
+    if guardar_en_cache:
+        cache.put(clave, pdf_bytes, ciudadano_id=ciudadano.id)
+    return pdf_bytes
+
+
+def ruta_pdf_almacenado(*, doc, ciudadano, verify_url: str) -> Path | None:
+    """Archivo del certificado para que lo envíe el servidor web (PDF_ENTREGA).
+
+    Retorna None si la entrega delegada no está configurada; en ese caso la
+    respuesta se arma con los bytes en memoria como siempre.
+    """
+    if not almacen_pdf.almacen_activo() or not current_app.config.get("PDF_ENTREGA"):
+        return None
+
+    clave = clave_certificado(doc=doc, ciudadano=ciudadano, verify_url=verify_url)
+    ruta = almacen_pdf.ruta_almacen(clave)
+    if not almacen_pdf.vigente(ruta):
+        # El servidor web envía el archivo: no hace falta retenerlo en memoria.
+        data = obtener_pdf_certificado(doc=doc, ciudadano=ciudadano, verify_url=verify_url, guardar_en_cache=False)
+        if not almacen_pdf.vigente(ruta):  # venía de la caché en memoria
+            ruta = almacen_pdf.guardar(clave, data)
+    return ruta
+
+
+def validadores_copia_verificacion(
+    *, doc, ciudadano, verify_url: str, consultado_en: datetime
+) -> tuple[str, datetime | None]:
+    """Validadores de la copia de verificación: cambian con el minuto de consulta del sello.
+
+    Last-Modified es el inicio de ese mismo minuto, para que If-Modified-Since
+    solo coincida dentro de él (como el ETag). Ambos salen de `consultado_en`
+    (hora local del servidor, como la imprime el sello), convertido a UTC una
+    sola vez: no se vuelve a leer el reloj.
+    """
+    etag, _ = validadores_certificado(doc=doc, ciudadano=ciudadano, verify_url=verify_url)
+    minuto = consultado_en.replace(second=0, microsecond=0)
+    ultima = minuto.astimezone(timezone.utc)
+    return huella("verificacion", etag, minuto), ultima
+
+
+def obtener_copia_verificacion(*, doc, ciudadano, verify_url: str, consultado_en: datetime) -> bytes:
+    """Copia para verificación pública: sello sobre el certificado (cacheado).
+
+    El sello muestra la hora al minuto, así que las consultas simultáneas del
+    mismo código dentro de ese minuto comparten también el estampado.
+    """
+    consultado_en = consultado_en.replace(second=0, microsecond=0)
+    clave = ("verificacion", clave_certificado(doc=doc, ciudadano=ciudadano, verify_url=verify_url), consultado_en)
+
+    firmar = firma_digital.firma_digital_activa()
+    if firmar:
+        # El sello firmado lleva la hora de firma: se guarda para que el
+        # mismo minuto entregue los mismos bytes (un solo ETag).
+        pdf_bytes = obtener_cache().get(clave)
+        if pdf_bytes is not None:
+            return pdf_bytes
+
+    def _estampar() -> bytes:
+        pdf_base = obtener_pdf_certificado(doc=doc, ciudadano=ciudadano, verify_url=verify_url)
+        with cupo_render():
+            if firmar:
+                # Reescribir el PDF invalidaría la firma del certificado.
+                return firma_digital.sellar_copia_verificacion(pdf_base, consultado_en=consultado_en)
+            return estampar_copia_verificacion(pdf_base, consultado_en=consultado_en)
+
+    pdf_bytes = una_sola_vez(clave, _estampar)
+    if firmar:
+        obtener_cache().put(clave, pdf_bytes, ciudadano_id=ciudadano.id)
+    return pdf_bytes
+
+
+def invalidar_pdfs_ciudadano(ciudadano_id: int) -> int:
+    """Descarta los PDFs y vistas previas en caché del ciudadano (p. ej. tras editarlo en Admin)."""
+    quitados = obtener_cache().invalidar_ciudadano(ciudadano_id)
+    return quitados + obtener_cache_vista_previa().invalidar_ciudadano(ciudadano_id)
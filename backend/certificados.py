@@ -6,9 +6,12 @@ from typing import Optional, Tuple
 
 from zoneinfo import ZoneInfo
 
-from flask import current_app
+from flask import current_app, has_request_context, request
 from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
 
+from backend.filtro_codigos import registrar_codigo_emitido
+from backend.plantillas import version_vigente
+from backend.qr import empaquetar_qr, matriz_qr
 from models import Ciudadano, DocumentoGenerado, db
  
 
@@ -58,6 +61,30 @@ def _nuevo_codigo_unico() -> str:
 
 
 
+def url_verificacion(codigo: str, *, base_url: str | None = None) -> str:
+    """Enlace absoluto de verificación que va en el QR y en el PDF.
+
+    Usa la ruta corta /v/<codigo>: un enlace más corto baja la versión del QR
+    (menos módulos que dibujar y más fácil de escanear). Por defecto usa el
+    host de la petición actual.
+    """
+    if base_url is None:
+        base_url = request.host_url
+    return f"{base_url.rstrip('/')}/v/{codigo}"
+
+
+def _qr_precalculado(codigo: str) -> tuple[Optional[str], Optional[bytes]]:
+    """Codifica el QR una sola vez al emitir el documento.
+
+    Fuera de una petición (CLI, seeds) no hay host para el enlace: se deja en
+    None y el QR se codifica al renderizar.
+    """
+    if not has_request_context():
+        return None, None
+    datos = url_verificacion(codigo)
+    return datos, empaquetar_qr(matriz_qr(datos))
+
+
 def _tz() -> ZoneInfo:
     tz_name = current_app.config.get("APP_TIMEZONE") or "America/Bogota"
     try:
@@ -131,6 +158,7 @@ def generar_o_reutilizar_certificado(
             return del_dia, True
 
     codigo = _nuevo_codigo_unico()
+    qr_datos, qr_matriz = _qr_precalculado(codigo)
 
     doc = DocumentoGenerado(
         codigo=codigo,
@@ -138,6 +166,9 @@ def generar_o_reutilizar_certificado(
         generado_por=generado_por,
         tipo_documento=tipo_documento,
         texto_personalizado=texto_personalizado,
+        qr_datos=qr_datos,
+        qr_matriz=qr_matriz,
+        plantilla_version=version_vigente(),
         ip_solicitante=ip,
         user_agent=(user_agent[:255] if user_agent else None),
         # Mantener columna existente (SQLite) sin guardar archivo real.
@@ -146,6 +177,7 @@ def generar_o_reutilizar_certificado(
     )
     db.session.add(doc)
     db.session.commit()
+    registrar_codigo_emitido(codigo)
 
     return doc, False
 
@@ -180,6 +212,7 @@ def generar_certificado_especial(
 
     codigo = _nuevo_codigo_unico()
     t = normalizar_texto_especial(texto_personalizado)
+    qr_datos, qr_matriz = _qr_precalculado(codigo)
 
     doc = DocumentoGenerado(
         codigo=codigo,
@@ -187,6 +220,9 @@ def generar_certificado_especial(
         generado_por=generado_por,
         tipo_documento="certificado_especial",
         texto_personalizado=t,
+        qr_datos=qr_datos,
+        qr_matriz=qr_matriz,
+        plantilla_version=version_vigente(),
         ip_solicitante=ip,
         user_agent=(user_agent[:255] if user_agent else None),
         pdf_path="",
@@ -194,4 +230,5 @@ def generar_certificado_especial(
     )
     db.session.add(doc)
     db.session.commit()
+    registrar_codigo_emitido(codigo)
     return doc
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from datetime import datetime, timezone
+
+from flask import Response, current_app, request
+from werkzeug.http import is_resource_modified
+
+
+def huella(*partes) -> str:
+    """ETag a partir de los datos que determinan la respuesta (sin generarla)."""
+    return hashlib.sha256(repr(partes).encode("utf-8")).hexdigest()
+
+
+def ultima_modificacion(*fechas: datetime | None) -> datetime | None:
+    """La más reciente de las fechas (UTC naive de la BD), lista para Last-Modified."""
+    validas = [f for f in fechas if f is not None]
+    if not validas:
+        return None
+    # HTTP trabaja a resolución de segundos.
+    return max(validas).replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def version_despliegue() -> str:
+    """Identifica las plantillas HTML desplegadas (igual en todos los workers).
+
+    Se incluye en los validadores de páginas HTML para que un despliegue con
+    cambios de maquetación no deje revalidar páginas viejas.
+    """
+    version = current_app.extensions.get("version_despliegue")
+    if version is None:
+        carpeta = os.path.join(current_app.root_path, current_app.template_folder or "templates")
+        marcas = []
+        for raiz, _, archivos in os.walk(carpeta):
+            for nombre in sorted(archivos):
+                ruta = os.path.join(raiz, nombre)
+                marcas.append((os.path.relpath(ruta, carpeta), os.stat(ruta).st_mtime_ns))
+        version = current_app.extensions.setdefault("version_despliegue", huella(*sorted(marcas))[:16])
+    return version
+
+
+def no_modificado(etag: str, ultima: datetime | None = None) -> Response | None:
+    """304 si la petición condicional coincide con los validadores; None si hay que responder completo.
+
+    Se evalúa antes de renderizar: los validadores salen de los metadatos.
+    """
+    if not is_resource_modified(request.environ, etag=etag, last_modified=ultima):
+        resp = current_app.response_class(status=304)
+        aplicar_validadores(resp, etag, ultima)
+        return resp
+    return None
+
+
+def aplicar_validadores(resp: Response, etag: str, ultima: datetime | None = None) -> Response:
+    resp.set_etag(etag)
+    if ultima is not None:
+        resp.last_modified = ultima
+    resp.cache_control.no_cache = True
+    return resp
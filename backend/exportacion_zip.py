@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from types import SimpleNamespace
+from typing import Iterable, Iterator
+
+from flask import Flask
+
+from backend.cache_pdf import obtener_pdf_certificado
+from backend.certificados import url_verificacion
+from backend.servicio_render import ColaRenderLlena
+
+
+class _SalidaZip:
+    """Destino de escritura para zipfile que solo acumula lo pendiente de enviar.
+
+    zipfile soporta destinos no "seekables" (usa descriptores de datos), así que
+    el archivo se puede emitir por partes sin armarlo completo en memoria.
+    """
+
+    def __init__(self) -> None:
+        self._partes: list[bytes] = []
+        self._pos = 0
+
+    def write(self, data) -> int:
+        self._partes.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def vaciar(self) -> bytes:
+        data = b"".join(self._partes)
+        self._partes.clear()
+        return data
+
+
+def datos_exportacion(pares: Iterable) -> list[tuple[SimpleNamespace, SimpleNamespace]]:
+    """Copia (DocumentoGenerado, Ciudadano) a objetos simples para usarlos fuera de la sesión de BD."""
+    items = []
+    for doc, c in pares:
+        items.append(
+            (
+                SimpleNamespace(
+                    id=doc.id,
+                    codigo=doc.codigo,
+                    creado_en=doc.creado_en,
+                    tipo_documento=getattr(doc, "tipo_documento", "certificado_afiliacion"),
+                    texto_personalizado=getattr(doc, "texto_personalizado", None),
+                    qr_datos=doc.qr_datos,
+                    qr_matriz=doc.qr_matriz,
+                    plantilla_version=doc.plantilla_version,
+                ),
+                SimpleNamespace(
+                    id=c.id,
+                    nombre_completo=c.nombre_completo,
+                    tipo_documento=c.tipo_documento,
+                    numero_documento=c.numero_documento,
+                ),
+            )
+        )
+    return items
+
+
+def _renderizar(app: Flask, doc, ciudadano, verify_url: str, espera_max_s: float) -> bytes:
+    # Si el pool está lleno se reintenta: la exportación cede el paso a las
+    # descargas interactivas en lugar de fallar.
+    limite = time.monotonic() + espera_max_s
+    with app.app_context():
+        while True:
+            try:
+                return obtener_pdf_certificado(
+                    doc=doc,
+                    ciudadano=ciudadano,
+                    verify_url=verify_url,
+                    guardar_en_cache=False,
+                )
+            except ColaRenderLlena:
+                if time.monotonic() >= limite:
+                    raise
+                time.sleep(0.25)
+
+
+def generar_zip_certificados(
+    app: Flask,
+    items: list[tuple[SimpleNamespace, SimpleNamespace]],
+    *,
+    base_url: str,
+    hilos: int,
+    espera_max_s: float = 60.0,
+) -> Iterator[bytes]:
+    """Emite un ZIP con los certificados de `items` a medida que se renderizan.
+
+    - Los renders corren en paralelo (`hilos`), con una ventana acotada de
+      trabajos pendientes para no retener cientos de PDFs en memoria.
+    - Cada entrada se escribe al terminar su render (el orden puede variar).
+    - Los códigos que fallen se listan en ERRORES.txt al final del archivo.
+    """
+    hilos = max(1, int(hilos))
+    ventana = hilos * 2
+    salida = _SalidaZip()
+    errores: list[str] = []
+
+    with zipfile.ZipFile(salida, mode="w", compression=zipfile.ZIP_STORED) as zf:
+        with ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="export-zip") as ejecutor:
+            pendientes: dict = {}
+            restantes = iter(items)
+
+            def _encolar() -> None:
+                for doc, c in restantes:
+                    verify_url = url_verificacion(doc.codigo, base_url=base_url)
+                    futuro = ejecutor.submit(_renderizar, app, doc, c, verify_url, espera_max_s)
+                    pendientes[futuro] = doc.codigo
+                    if len(pendientes) >= ventana:
+                        return
+
+            _encolar()
+            while pendientes:
+                listos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    codigo = pendientes.pop(futuro)
+                    try:
+                        pdf_bytes = futuro.result()
+                    except Exception as e:  # noqa: BLE001
+                        app.logger.warning("Exportación ZIP: no se pudo generar %s: %s", codigo, e)
+                        errores.append(codigo)
+                        continue
+                    zf.writestr(f"certificado_{codigo}.pdf", pdf_bytes)
+                    yield salida.vaciar()
+                _encolar()
+
+        if errores:
+            zf.writestr("ERRORES.txt", "No se pudieron generar:\n" + "\n".join(errores) + "\n")
+
+    yield salida.vaciar()
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from models import DocumentoGenerado, db
+
+
+# Formato de _nuevo_codigo_unico: CIP + YYYYMMDDHHMMSS (UTC) + 4 dígitos (6 en el fallback).
+_FORMATO_CODIGO = re.compile(r"CIP(\d{14})(?:\d{4}|\d{6})")
+
+
+def fecha_codigo(codigo: str) -> datetime | None:
+    """Fecha de emisión (UTC) incluida en el código; None si no tiene el formato CIP."""
+    m = _FORMATO_CODIGO.fullmatch(codigo)
+    if not m:
+        return None
+    try:
+        return datetime.strptime(m.group(1), "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+
+
+class FiltroBloom:
+    """Conjunto probabilístico: sin falsos negativos, ~1% de falsos positivos a capacidad."""
+
+    def __init__(self, capacidad: int, tasa_falsos: float = 0.01) -> None:
+        self.capacidad = max(1, int(capacidad))
+        self.m = max(8, math.ceil(-self.capacidad * math.log(tasa_falsos) / (math.log(2) ** 2)))
+        self.k = max(1, round(self.m / self.capacidad * math.log(2)))
+        self.bits = bytearray((self.m + 7) // 8)
+        self.n = 0
+
+    def _posiciones(self, valor: str):
+        d = hashlib.blake2b(valor.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(d[:8], "little")
+        h2 = int.from_bytes(d[8:], "little") | 1
+        return ((h1 + i * h2) % self.m for i in range(self.k))
+
+    def agregar(self, valor: str) -> None:
+        for p in self._posiciones(valor):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.n += 1
+
+    def __contains__(self, valor: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._posiciones(valor))
+
+
+class FiltroCodigos:
+    """Descarta en memoria los códigos que con certeza no existen.
+
+    - Sin formato CIP o con fecha futura: no existe (salvo que la BD tenga
+      códigos antiguos sin ese formato; entonces se consulta el filtro).
+    - Con fecha anterior a la última recarga (menos el margen): el filtro de
+      Bloom tiene todos los códigos emitidos hasta entonces, así que si no
+      está, no existe.
+    - Más reciente: pudo emitirlo otro worker; se consulta la BD.
+
+    El filtro se carga completo la primera vez y luego se recarga de forma
+    incremental (por id) cada `recarga_s`. Las emisiones de este proceso se
+    agregan al momento. Los códigos eliminados siguen en el filtro: solo
+    cuestan la consulta a la BD.
+    """
+
+    def __init__(self, *, recarga_s: float, margen_s: float) -> None:
+        self.recarga_s = max(0.0, float(recarga_s))
+        self.margen = timedelta(seconds=max(0.0, float(margen_s)))
+        self._bloom: FiltroBloom | None = None
+        self._ultimo_id = 0
+        self._completo_hasta = datetime.min
+        self._sin_formato = False
+        self._recargado = 0.0
+        self._lock = threading.Lock()
+        self.rechazados = 0
+        self.consultados = 0
+
+    def puede_existir(self, codigo: str) -> bool:
+        self._recargar_si_toca()
+
+        fecha = fecha_codigo(codigo)
+        # Bajo el lock: filtro, fecha de corte e indicador se leen de la misma
+        # recarga y los contadores no pierden incrementos entre hilos.
+        with self._lock:
+            if fecha is None:
+                existe = self._sin_formato and codigo in self._bloom
+            elif fecha > datetime.utcnow() + self.margen:
+                existe = False
+            else:
+                existe = fecha >= self._completo_hasta or codigo in self._bloom
+
+            if existe:
+                self.consultados += 1
+            else:
+                self.rechazados += 1
+        return existe
+
+    def registrar(self, codigo: str) -> None:
+        """Agrega un código recién emitido por este proceso."""
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.agregar(codigo)
+                self._sin_formato = self._sin_formato or fecha_codigo(codigo) is None
+
+    def _recargar_si_toca(self) -> None:
+        if self._bloom is not None and time.monotonic() - self._recargado < self.recarga_s:
+            return
+        with self._lock:
+            if self._bloom is not None and time.monotonic() - self._recargado < self.recarga_s:
+                return
+
+            inicio = datetime.utcnow()
+            bloom, ultimo_id, sin_formato = self._bloom, self._ultimo_id, self._sin_formato
+            # Capacidad agotada: se reconstruye más grande para mantener la tasa de falsos positivos.
+            # Se llena aparte y se publica al final: las lecturas concurrentes no ven un filtro a medias.
+            if bloom is None or bloom.n > bloom.capacidad:
+                total = db.session.execute(select(func.count(DocumentoGenerado.id))).scalar() or 0
+                bloom, ultimo_id, sin_formato = FiltroBloom(max(2 * total, 10_000)), 0, False
+
+            filas = db.session.execute(
+                select(DocumentoGenerado.id, DocumentoGenerado.codigo)
+                .where(DocumentoGenerado.id > ultimo_id)
+                .order_by(DocumentoGenerado.id)
+            )
+            for doc_id, codigo in filas:
+                bloom.agregar(codigo)
+                sin_formato = sin_formato or fecha_codigo(codigo) is None
+                ultimo_id = doc_id
+
+            self._bloom, self._ultimo_id, self._sin_formato = bloom, ultimo_id, sin_formato
+            self._completo_hasta = inicio - self.margen
+            self._recargado = time.monotonic()
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "codigos": self._bloom.n if self._bloom is not None else 0,
+                "capacidad": self._bloom.capacidad if self._bloom is not None else 0,
+                "bytes": len(self._bloom.bits) if self._bloom is not None else 0,
+                "rechazados": self.rechazados,
+                "consultados": self.consultados,
+            }
+
+
+def obtener_filtro_codigos() -> FiltroCodigos | None:
+    """Filtro de la app actual (None si FILTRO_CODIGOS está desactivado)."""
+    cfg = current_app.config
+    if not cfg.get("FILTRO_CODIGOS"):
+        return None
+    filtro = current_app.extensions.get("filtro_codigos")
+    if filtro is None:
+        filtro = current_app.extensions.setdefault(
+            "filtro_codigos",
+            FiltroCodigos(
+                recarga_s=float(cfg.get("FILTRO_CODIGOS_RECARGA_SECONDS") or 0),
+                margen_s=float(cfg.get("FILTRO_CODIGOS_MARGEN_SECONDS") or 0),
+            ),
+        )
+    return filtro
+
+
+def codigo_puede_existir(codigo: str) -> bool:
+    """False solo si `codigo` con certeza no corresponde a ningún documento emitido."""
+    filtro = obtener_filtro_codigos()
+    return filtro is None or filtro.puede_existir(codigo)
+
+
+def registrar_codigo_emitido(codigo: str) -> None:
+    filtro = obtener_filtro_codigos()
+    if filtro is not None:
+        filtro.registrar(codigo)
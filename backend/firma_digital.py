@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import io
+from datetime import datetime
+from pathlib import Path
+
+from flask import current_app
+from sqlalchemy import func, select, update
+
+from backend.servicio_render import cupo_render
+from models import DocumentoGenerado, db
+
+try:  # Dependencia opcional: solo se necesita con PDF_FIRMA_DIGITAL.
+    from pyhanko import stamp
+    from pyhanko.pdf_utils import content, generic, layout
+    from pyhanko.pdf_utils.incremental_writer import IncrementalPdfFileWriter
+    from pyhanko.pdf_utils.reader import PdfFileReader
+    from pyhanko.sign import fields, signers
+except ImportError:  # pragma: no cover
+    signers = None
+
+
+def firma_digital_activa() -> bool:
+    return bool(current_app.config.get("PDF_FIRMA_DIGITAL"))
+
+
+def _ruta(valor: str) -> str:
+    p = Path(valor.strip())
+    if not p.is_absolute():
+        p = Path(current_app.root_path) / p
+    return str(p)
+
+
+def _firmante():
+    """Firmante con la llave y el certificado locales (se cargan una vez por app)."""
+    firmante = current_app.extensions.get("firmante_pdf")
+    if firmante is None:
+        if signers is None:
+            raise RuntimeError("PDF_FIRMA_DIGITAL requiere instalar pyHanko.")
+        cfg = current_app.config
+        if not cfg.get("PDF_FIRMA_LLAVE") or not cfg.get("PDF_FIRMA_CERTIFICADO"):
+            raise RuntimeError("PDF_FIRMA_DIGITAL requiere PDF_FIRMA_LLAVE y PDF_FIRMA_CERTIFICADO.")
+        clave = cfg.get("PDF_FIRMA_LLAVE_CLAVE") or None
+        firmante = signers.SimpleSigner.load(
+            _ruta(cfg["PDF_FIRMA_LLAVE"]),
+            _ruta(cfg["PDF_FIRMA_CERTIFICADO"]),
+            key_passphrase=clave.encode("utf-8") if clave else None,
+        )
+        if firmante is None:
+            raise RuntimeError("No se pudo cargar la llave o el certificado de firma digital.")
+        firmante = current_app.extensions.setdefault("firmante_pdf", firmante)
+    return firmante
+
+
+def firmar_pdf(pdf_bytes: bytes) -> bytes:
+    """Agrega la firma digital (actualización incremental sobre el PDF renderizado)."""
+    cfg = current_app.config
+    metadatos = signers.PdfSignatureMetadata(
+        field_name="FirmaCabildo",
+        reason=cfg.get("PDF_FIRMA_RAZON") or None,
+        location=cfg.get("PDF_FIRMA_UBICACION") or None,
+    )
+    firmante = _firmante()
+    out = signers.sign_pdf(IncrementalPdfFileWriter(io.BytesIO(pdf_bytes)), metadatos, signer=firmante)
+    return out.getvalue()
+
+
+if signers is not None:
+
+    class _FranjaSello(content.PdfContent):
+        """Franja de la página del sello importada como XObject (apariencia de la firma)."""
+
+        def __init__(self, pdf_sello: bytes, caja: tuple[float, float, float, float]) -> None:
+            super().__init__(box=layout.BoxConstraints(width=caja[2] - caja[0], height=caja[3] - caja[1]))
+            self.pdf_sello = pdf_sello
+            self.caja = caja
+
+        def render(self) -> bytes:
+            ref = self._ensure_writer.import_page_as_xobject(PdfFileReader(io.BytesIO(self.pdf_sello)))
+            xobj = ref.get_object()
+            x1, y1, _, _ = self.caja
+            xobj["/BBox"] = generic.ArrayObject(generic.FloatObject(v) for v in self.caja)
+            xobj["/Matrix"] = generic.ArrayObject(generic.FloatObject(v) for v in (1, 0, 0, 1, -x1, -y1))
+            self.resources.xobject["/Sello"] = ref
+            return b"/Sello Do"
+
+
+def sellar_copia_verificacion(pdf_firmado: bytes, *, consultado_en: datetime) -> bytes:
+    """Copia para verificación de un certificado firmado, sin invalidar su firma.
+
+    Reescribir el PDF (como `estampar_copia_verificacion`) rompe la firma. Aquí
+    el sello se agrega como apariencia visible de una segunda firma del
+    servidor, en una actualización incremental: la firma del certificado queda
+    intacta (agregar firmas es un cambio permitido) y la del sello certifica
+    la hora de la consulta.
+    """
+    from backend.pdf import _sello_verificacion_pdf_bytes, caja_sello_verificacion
+
+    caja = caja_sello_verificacion()
+    metadatos = signers.PdfSignatureMetadata(
+        field_name="SelloVerificacion",
+        reason="Copia para verificación (servidor central)",
+        location=current_app.config.get("PDF_FIRMA_UBICACION") or None,
+    )
+    firmante = signers.PdfSigner(
+        metadatos,
+        signer=_firmante(),
+        stamp_style=stamp.StaticStampStyle(
+            background=_FranjaSello(_sello_verificacion_pdf_bytes(consultado_en), caja),
+            background_layout=layout.SimpleBoxLayoutRule(
+                x_align=layout.AxisAlignment.ALIGN_MIN,
+                y_align=layout.AxisAlignment.ALIGN_MIN,
+                margins=layout.Margins.uniform(0),
+            ),
+            border_width=0,
+        ),
+        new_field_spec=fields.SigFieldSpec("SelloVerificacion", on_page=0, box=tuple(round(v) for v in caja)),
+    )
+    return firmante.sign_pdf(IncrementalPdfFileWriter(io.BytesIO(pdf_firmado))).getvalue()
+
+
+def pdf_firmado_guardado(doc_id: int, huella: str) -> bytes | None:
+    """PDF firmado persistido del documento si corresponde a `huella` (None si no)."""
+    return db.session.execute(
+        select(DocumentoGenerado.pdf_firmado).where(
+            DocumentoGenerado.id == doc_id, DocumentoGenerado.firma_huella == huella
+        )
+    ).scalar()
+
+
+def firmar_y_guardar(doc, pdf_bytes: bytes, *, huella: str) -> bytes:
+    """Firma el render del documento y lo deja persistido junto con su huella.
+
+    Se firma una vez por contenido: si otro proceso alcanzó a guardar la firma
+    de la misma huella, se descarta la propia y se retorna la ya persistida,
+    de modo que todas las respuestas entregan exactamente los mismos bytes.
+    Una firma de otra huella (datos del titular o render anteriores) se
+    reemplaza.
+    """
+    with cupo_render():
+        firmado = firmar_pdf(pdf_bytes)
+
+    resultado = db.session.execute(
+        update(DocumentoGenerado)
+        .where(DocumentoGenerado.id == doc.id, func.coalesce(DocumentoGenerado.firma_huella, "") != huella)
+        .values(pdf_firmado=firmado, firma_huella=huella, firmado_en=datetime.utcnow())
+    )
+    db.session.commit()
+    if resultado.rowcount:
+        return firmado
+    return pdf_firmado_guardado(doc.id, huella) or firmado
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 
 from flask import current_app
 
+from backend.almacen_pdf import limpiar_almacen
 from models import DocumentoGenerado, db
 
 
@@ -12,6 +13,7 @@ def limpiar_pdfs_expirados() -> int:
     """Elimina archivos PDF de certificados cuya ventana de retención ya venció.
 
     Mantiene el registro en la base de datos para verificación histórica.
+    Incluye los PDFs del almacén en disco (PDF_ALMACEN_DISCO).
     Retorna cantidad de archivos eliminados.
     """
     horas = int(current_app.config.get("CERT_FILE_RETENTION_HOURS") or 24)
@@ -27,6 +29,8 @@ def limpiar_pdfs_expirados() -> int:
         except Exception:
             pass
 
+    eliminados += limpiar_almacen()
+
     if eliminados:
         db.session.commit()
 
@@ -1,22 +1,30 @@
 from __future__ import annotations
 
+import copy
+import hashlib
 import io
 import os
+import threading
 from datetime import datetime, timezone
+from importlib.metadata import version as version_paquete
 from html import escape as html_escape
 from zoneinfo import ZoneInfo
 from pathlib import Path
+from types import SimpleNamespace
 
-import qrcode
 from flask import current_app
+from PIL import Image as PILImage
+from pypdf import PdfReader, PdfWriter
+from reportlab import rl_config
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.utils import ImageReader
 from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen.canvas import Canvas
 from reportlab.platypus import (
     HRFlowable,
-    Image,
     Paragraph,
     SimpleDocTemplate,
     Spacer,
@@ -25,6 +33,8 @@ from reportlab.platypus import (
     Flowable,
 )
 
+from backend.plantillas import DEFINICION_INICIAL
+from backend.qr import desempaquetar_qr, matriz_qr
 
 
 MESES_ES = {
@@ -43,6 +53,17 @@ MESES_ES = {
 }
 
 
+# Ajustes de layout (puntos PDF, hoja carta)
+ID_Y_OFFSET = 55  # px aprox desde el borde superior
+FOOTER_Y = 80     # px aprox desde el borde inferior
+TOP_MARGIN = 90
+SIGNATURE_TOP_SPACER = 60  # espacio antes de firma/QR
+SELLO_Y_OFFSET = 24  # aviso de copia para verificación (sobre el ID)
+MARGEN_LATERAL = 54
+MARGEN_INFERIOR = 50
+FIRMA_ANCHO = 180
+FIRMA_ALTO = 80
+FIRMA_DPI = 200  # resolución con la que se guarda la firma ya escalada
 
 class LinkNoWrap(Flowable):
     """Enlace sin salto de línea para ubicarlo debajo del QR."""
@@ -86,21 +107,139 @@ class LinkNoWrap(Flowable):
         y = 0
         c.drawString(x, y, self.text)
 
-        c.linkURL(self.url, (x, y, x + text_width, y + size + 2), relative=0)
+        # relative=1: el rectángulo sigue la posición del flowable en la página.
+        c.linkURL(self.url, (x, y, x + text_width, y + size + 2), relative=1)
         c.restoreState()
 
-def _qr_as_reportlab_image(data: str, size_px: int = 260) -> Image:
-    """Genera un QR y lo devuelve como Flowable Image."""
-    qr = qrcode.QRCode(version=1, box_size=10, border=2)
-    qr.add_data(data)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    img = img.resize((size_px, size_px))
+class QRVectorial(Flowable):
+    """QR dibujado como trazado vectorial (sin imagen PIL ni PNG intermedio).
 
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    buf.seek(0)
-    return Image(buf, width=110, height=110, hAlign="LEFT")
+    Cada fila de módulos oscuros consecutivos se une en un solo rectángulo y
+    todo el código va en un único path relleno. Si se entrega `matriz` (la
+    precalculada al emitir el documento) no se vuelve a codificar el QR.
+    """
+
+    def __init__(
+        self,
+        data: str | None = None,
+        *,
+        matriz: list[list[bool]] | None = None,
+        size: float = 110,
+        border: int = 2,
+    ) -> None:
+        super().__init__()
+        self.matrix = matriz if matriz is not None else matriz_qr(data or "")
+        self.border = border
+        self.size = float(size)
+        self.width = self.height = self.size
+        self.hAlign = "LEFT"
+
+    def wrap(self, availWidth, availHeight):  # noqa: N802
+        return self.width, self.height
+
+    def draw(self):  # noqa: N802
+        c = self.canv
+        n = len(self.matrix)
+        modulo = self.size / (n + 2 * self.border)
+
+        path = c.beginPath()
+        for fila, modulos in enumerate(self.matrix):
+            y = self.size - (self.border + fila + 1) * modulo
+            col = 0
+            while col < n:
+                if not modulos[col]:
+                    col += 1
+                    continue
+                inicio = col
+                while col < n and modulos[col]:
+                    col += 1
+                path.rect((self.border + inicio) * modulo, y, (col - inicio) * modulo, modulo)
+
+        c.saveState()
+        c.setFillColor(colors.black)
+        c.drawPath(path, stroke=0, fill=1)
+        c.restoreState()
+
+
+def _qr_certificado(verify_url: str, qr_matriz: bytes | None, *, size: float = 110) -> QRVectorial:
+    """QR del certificado: usa la matriz precalculada si existe, si no la codifica."""
+    if qr_matriz:
+        return QRVectorial(matriz=desempaquetar_qr(qr_matriz), size=size)
+    return QRVectorial(verify_url, size=size)
+
+
+class Firma:
+    """Firma decodificada y escalada a su tamaño impreso (`reader` para drawImage)."""
+
+    def __init__(self, im: PILImage.Image) -> None:
+        self.reader = ImageReader(im)
+        # Decodifica RGB/alfa una sola vez; drawImage solo lee estos datos.
+        self.reader.getRGBData()
+
+
+class FirmaImagen(Flowable):
+    """Imagen de la firma (ya decodificada y escalada)."""
+
+    def __init__(self, firma: Firma, *, width: float = FIRMA_ANCHO, height: float = FIRMA_ALTO) -> None:
+        super().__init__()
+        self.firma = firma
+        self.width = float(width)
+        self.height = float(height)
+        self.hAlign = "LEFT"
+
+    def wrap(self, availWidth, availHeight):  # noqa: N802
+        return self.width, self.height
+
+    def draw(self):  # noqa: N802
+        self.canv.drawImage(self.firma.reader, 0, 0, self.width, self.height, mask="auto")
+
+
+_firmas: dict[str, tuple[int, Firma]] = {}
+_firmas_lock = threading.Lock()
+
+
+def _cargar_firma(firma_path: Path) -> Firma | None:
+    """Firma decodificada y escalada a su tamaño impreso, cacheada por proceso.
+
+    Solo se vuelve a leer el archivo si cambia su mtime. Retorna None si no existe.
+    """
+    try:
+        mtime = firma_path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+    clave = str(firma_path)
+    entrada = _firmas.get(clave)
+    if entrada is not None and entrada[0] == mtime:
+        return entrada[1]
+
+    with _firmas_lock:
+        entrada = _firmas.get(clave)
+        if entrada is not None and entrada[0] == mtime:
+            return entrada[1]
+
+        with PILImage.open(firma_path) as im:
+            im.load()
+            if im.mode not in ("RGB", "RGBA", "L", "LA"):
+                im = im.convert("RGBA")
+            destino = (round(FIRMA_ANCHO / 72 * FIRMA_DPI), round(FIRMA_ALTO / 72 * FIRMA_DPI))
+            if im.width > destino[0] or im.height > destino[1]:
+                im = im.resize(destino, PILImage.LANCZOS)
+
+        firma = Firma(im)
+        _firmas[clave] = (mtime, firma)
+        return firma
+
+
+def configurar_reportlab(config) -> None:
+    """Ajusta una vez por proceso los parámetros globales de ReportLab.
+
+    ReportLab decide con un ajuste global (no por documento) si los streams
+    van además en ASCII85 (≈25% más grandes). Como PDF_COMPACTO es fijo por
+    proceso, se fija al arrancar (app y workers del render) y no en cada
+    render, donde varios hilos lo estarían escribiendo a la vez.
+    """
+    rl_config.useA85 = 0 if config.get("PDF_COMPACTO", True) else 1
 
 
 def _resolver_ruta_firma(ruta: str | None) -> Path | None:
@@ -115,6 +254,42 @@ def _resolver_ruta_firma(ruta: str | None) -> Path | None:
     return p
 
 
+def _ruta_firma_configurada() -> Path:
+    firma_ruta = current_app.config.get("CAPITAN_MENOR_FIRMA_RUTA")
+    return _resolver_ruta_firma(firma_ruta) or (Path(current_app.root_path) / "static" / "img" / "Firma_Diomedes.png")
+
+
+def version_firma_configurada() -> int | None:
+    """mtime del archivo de firma (el mismo que vigila `_cargar_firma`); None si no existe."""
+    try:
+        return _ruta_firma_configurada().stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+# Lo que determina los bytes de un mismo certificado además de sus datos: el
+# código que lo dibuja y las librerías que lo serializan.
+_FUENTES_RENDER = ("pdf.py", "pdf_canvas.py", "plantillas.py", "qr.py")
+_LIBRERIAS_RENDER = ("reportlab", "pypdf", "qrcode", "Pillow")
+_version_render: str | None = None
+
+
+def version_render() -> str:
+    """Identifica el render desplegado (igual en todos los workers con el mismo código).
+
+    Huella del contenido de las fuentes que dibujan el certificado y de las
+    versiones de las librerías. Va en la clave de caché: un despliegue que
+    cambia el render no sigue sirviendo (ni revalidando) los PDFs anteriores.
+    """
+    global _version_render
+    if _version_render is None:
+        base = Path(__file__).resolve().parent
+        partes = [(nombre, hashlib.sha256((base / nombre).read_bytes()).hexdigest()) for nombre in _FUENTES_RENDER]
+        partes += [(nombre, version_paquete(nombre)) for nombre in _LIBRERIAS_RENDER]
+        _version_render = hashlib.sha256(repr(partes).encode("utf-8")).hexdigest()[:16]
+    return _version_render
+
+
 def _tz() -> ZoneInfo:
     tz_name = current_app.config.get("APP_TIMEZONE") or "America/Bogota"
     try:
@@ -133,20 +308,34 @@ def _to_local(dt_utc_naive: datetime) -> datetime:
     return dt_utc.astimezone(tz)
 
 
-def _parrafo_principal_certificado(*, ciudadano, tipo_documento: str, texto_personalizado: str | None) -> str:
-    """Construye el párrafo principal del certificado.
+def _fecha_pdf(dt_utc: datetime):
+    """Formateador de CreationDate/ModDate fijo en la fecha de emisión.
+
+    Junto con invariant=1 (ID del documento derivado del contenido) hace que
+    el mismo certificado produzca siempre los mismos bytes.
+    """
+    texto = dt_utc.strftime("D:%Y%m%d%H%M%S+00'00'")
+    return lambda *_: texto
+
+
+def _parrafo_principal_certificado(
+    *, plantilla: "PlantillaCertificado", ciudadano, tipo_documento: str, texto_personalizado: str | None
+) -> str:
+    """Construye el párrafo principal del certificado con los textos de la plantilla.
 
     - Afiliación: texto estándar.
     - Especial: mantiene solo la frase de identificación + texto personalizado.
 
     Nota: texto_personalizado se escapa para evitar que rompa el markup de ReportLab.
     """
+    campos = {
+        "nombre": ciudadano.nombre_completo,
+        "tipo_documento": ciudadano.tipo_documento,
+        "numero_documento": ciudadano.numero_documento,
+    }
 
     if (tipo_documento or "").strip() == "certificado_especial":
-        intro = (
-            f"<b>{ciudadano.nombre_completo}</b> identificado(a) con {ciudadano.tipo_documento} No. "
-            f"<b>{ciudadano.numero_documento}</b>."
-        )
+        intro = plantilla.definicion["texto_especial"].format(**campos)
         t = (texto_personalizado or "").strip()
         if t:
             t = t[0].upper() + t[1:]
@@ -154,234 +343,115 @@ def _parrafo_principal_certificado(*, ciudadano, tipo_documento: str, texto_pers
             return f"{intro} {t}"
         return intro
 
-    return (
-        f"<b>{ciudadano.nombre_completo}</b> identificado(a) con {ciudadano.tipo_documento} No. "
-        f"<b>{ciudadano.numero_documento}</b> se encuentra debidamente afiliado(a) al Cabildo Menor Indígena "
-        "de la Peñata, perteneciente al Resguardo Indígena Zenú de San Andrés de Sotavento, Córdoba - Sucre, "
-        "y registrado en la base de datos del ministerio del interior, formando parte activa de nuestra comunidad "
-        "respetando los principios de identidad, unidad, territorio y cultura ancestral del pueblo Zenú."
-    )
+    return plantilla.definicion["texto_afiliacion"].format(**campos)
 
 
-def generar_certificado_pdf_bytes(
-    *,
-    ciudadano,
-    codigo: str,
-    verify_url: str,
-    emitido_en_utc: datetime,
-    tipo_documento: str = "certificado_afiliacion",
-    texto_personalizado: str | None = None,
-) -> bytes:
-    """Genera el certificado en bytes.
-
-    Cambios solicitados:
-    - No depende de un archivo guardado en disco.
-    - La fecha/hora de emisión debe corresponder al momento en que el usuario lo generó
-      (emitido_en_utc), no al momento en que se abre/descarga.
-    """
-    buf = io.BytesIO()
-
+def _parrafo_fecha_expedicion(plantilla: "PlantillaCertificado", emitido_en_utc: datetime) -> str:
+    """Párrafo con lugar, fecha y hora de expedición (hora local del proyecto)."""
     emitido_local = _to_local(emitido_en_utc)
-
-    styles = getSampleStyleSheet()
-    base = styles["Normal"]
-    base.fontName = "Helvetica"
-    base.fontSize = 11
-    base.leading = 16
-
-    header_style = ParagraphStyle(
-        "header",
-        parent=base,
-        fontSize=9,
-        leading=11,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor("#555555"),
-    )
-
-    title_style = ParagraphStyle(
-        "title",
-        parent=base,
-        fontSize=12,
-        leading=16,
-        alignment=TA_CENTER,
-        spaceBefore=30,
-        spaceAfter=30,
+    return plantilla.definicion["texto_expedicion"].format(
+        dia=f"{emitido_local.day:02d}",
+        mes=MESES_ES.get(emitido_local.month, str(emitido_local.month)),
+        anio=emitido_local.year,
+        hora=emitido_local.strftime("%I:%M %p"),
     )
-    title_style.fontName = "Helvetica-Bold"
 
-    body_style = ParagraphStyle(
-        "body",
-        parent=base,
-        alignment=TA_JUSTIFY,
-    )
 
-    small_left = ParagraphStyle(
-        "small_left",
-        parent=base,
-        fontSize=8,
-        leading=10,
-        alignment=TA_LEFT,
-        textColor=colors.HexColor("#444444"),
-    )
+class PlantillaCertificado:
+    """Partes invariantes del certificado, compiladas una vez por versión y proceso.
 
-    footer_style = ParagraphStyle(
-        "footer",
-        parent=base,
-        fontSize=7.5,
-        leading=9,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor("#111111"),
-    )
-    footer_style.fontName = "Helvetica-Bold"
-
-    # Ajustes de layout solicitados (copia de verificación):
-    ID_Y_OFFSET = 55
-    FOOTER_Y = 80
-    TOP_MARGIN = 90
-    SIGNATURE_TOP_SPACER = 60  # espacio antes de firma/QR 
-    ID_Y_OFFSET = 55
-    FOOTER_Y = 80
-    TOP_MARGIN = 90
-
-    ID_Y_OFFSET = 55  # px aprox desde el borde superior
-    FOOTER_Y = 80     # px aprox desde el borde inferior
-    TOP_MARGIN = 90
-    SIGNATURE_TOP_SPACER = 60  # espacio antes de firma/QR 
-    def _dibujar_id_documento(canvas, doc):  # noqa: N803
-        """Elementos fijos de la hoja.
+    Estilos, encabezado, preámbulo, título, leyenda legal y bloque de firma no
+    cambian entre certificados de la misma versión (ver backend/plantillas.py);
+    solo varían titular, código, fecha y QR.
 
-        - ID arriba a la izquierda (arriba del todo)
-        - Leyenda legal siempre al final de la hoja
-        """
-        canvas.saveState()
+    Los Paragraph se parsean aquí. Cada render recibe copias superficiales
+    porque ReportLab guarda estado de layout en la instancia (wrap/drawOn) y
+    la misma plantilla se comparte entre hilos.
+    """
 
-        canvas.setFont("Helvetica", 8)
-        canvas.setFillColor(colors.HexColor("#444444"))
-        texto_id = f"ID: {codigo}"
-        x_id = doc.leftMargin
-        y_id = doc.pagesize[1] - ID_Y_OFFSET 
-        canvas.drawString(x_id, y_id, texto_id)
-
-        footer_text = (
-            "Los Cabildos Menores son considerados Entidades territoriales Indígenas de carácter especial, Decreto "
-            "1386, por ende, puede Ejercer todas las funciones de las entidades territorial"
+    def __init__(self, definicion: dict, *, version: int, nombre_firma: str, doc_tipo: str, doc_num: str) -> None:
+        self.definicion = definicion
+        self.version = version
+
+        styles = getSampleStyleSheet()
+        base = styles["Normal"]
+        base.fontName = "Helvetica"
+        base.fontSize = 11
+        base.leading = 16
+
+        self.header_style = header_style = ParagraphStyle(
+            "header",
+            parent=base,
+            fontSize=9,
+            leading=11,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor("#555555"),
         )
-        para = Paragraph(footer_text, footer_style)
-        w, h = para.wrap(doc.width, doc.bottomMargin)
-        para.drawOn(canvas, doc.leftMargin, FOOTER_Y)
 
-        canvas.restoreState()
-
-    doc = SimpleDocTemplate(
-        buf,
-        pagesize=letter,
-        leftMargin=54,
-        rightMargin=54,
-        topMargin=TOP_MARGIN,
-        bottomMargin=50,
-        title="Certificado Cabildo Indígena de la Peñata",
-        author="Cabildo Indígena de la Peñata",
-    )
-
-    story = []
-
-    header_lines = [
-        "RESGUARDO INDIGENA ZENU SAN ANDRES DE SOTAVENTO",
-        "CORDOBA – SUCRE",
-        "CABILDO MENOR INDIGENA DE LA PEÑATA – TERRITORIO – SINCELEJO",
-        "NIT. 823.003.642-8",
-        "RESOLUCION N° 0022 DEL 26 DE OCTUBRE DEL 2011",
-    ]
-    for line in header_lines:
-        story.append(Paragraph(f"<b>{line}</b>", header_style))
-    story.append(Spacer(1, 16))
-
-    story.append(
-        Paragraph(
-            "El Capitán Menor Indígena de la Peñata, en uso de sus facultades legales Ley 21 1991, "
-            "Leyes complementarias y Decretos Complementarios, uso de costumbres propias del pueblo Zenú, "
-            "y en cumplimiento de su función de representación y organización comunitaria.",
-            body_style,
+        self.title_style = title_style = ParagraphStyle(
+            "title",
+            parent=base,
+            fontSize=12,
+            leading=16,
+            alignment=TA_CENTER,
+            spaceBefore=30,
+            spaceAfter=30,
         )
-    )
-    story.append(Paragraph("CERTIFICA QUE", title_style))
-
-    story.append(Paragraph(_parrafo_principal_certificado(ciudadano=ciudadano, tipo_documento=tipo_documento, texto_personalizado=texto_personalizado), body_style))
-
-    mes = MESES_ES.get(emitido_local.month, str(emitido_local.month))
-    hora = emitido_local.strftime("%I:%M %p")
+        title_style.fontName = "Helvetica-Bold"
 
-    story.append(Spacer(1, 10))
-    story.append(
-        Paragraph(
-            "La presente certificación se expide a solicitud del interesado (a), en la ciudad de "
-            f"<b>Sincelejo, Sucre</b>, a los <b>{emitido_local.day:02d}</b> días del mes de <b>{mes}</b> del año "
-            f"<b>{emitido_local.year}</b>, siendo las <b>{hora}</b>.",
-            body_style,
+        self.body_style = ParagraphStyle(
+            "body",
+            parent=base,
+            alignment=TA_JUSTIFY,
         )
-    )
-
-    story.append(Spacer(1, SIGNATURE_TOP_SPACER))
-
-    firma_ruta = current_app.config.get("CAPITAN_MENOR_FIRMA_RUTA")
-    nombre_firma = current_app.config.get("CAPITAN_MENOR_NOMBRE") or "CAPITÁN MENOR"
-    doc_tipo = current_app.config.get("CAPITAN_MENOR_DOCUMENTO_TIPO") or ""
-    doc_num = current_app.config.get("CAPITAN_MENOR_DOCUMENTO_NUMERO") or ""
-
-    signature_flowables = []
-    firma_path = _resolver_ruta_firma(firma_ruta) or (Path(current_app.root_path) / "static" / "img" / "Firma_Diomedes.png")
-
-    if firma_path.exists():
-        signature_flowables.append(Image(str(firma_path), width=180, height=80, hAlign="LEFT"))
-        signature_flowables.append(Spacer(1, 1))
 
-    signature_flowables.append(HRFlowable(width=250, thickness=1.2, color=colors.black))
-    signature_flowables.append(Spacer(1, 4))
-
-    nombre_con_doc = nombre_firma
-    if doc_tipo or doc_num:
-        nombre_con_doc = f"{nombre_firma}<br/>{doc_tipo} {doc_num}".strip()    
-
-    signature_flowables.append(
-        Paragraph(
-            nombre_con_doc,
-            ParagraphStyle(
-                "sig_name",
-                parent=base,
-                fontName="Helvetica-Bold",
-                fontSize=9.5,
-                leading=11,
-                alignment=TA_LEFT,
-            ),
+        self.small_left = small_left = ParagraphStyle(
+            "small_left",
+            parent=base,
+            fontSize=8,
+            leading=10,
+            alignment=TA_LEFT,
+            textColor=colors.HexColor("#444444"),
         )
-    )
 
-    signature_flowables.append(
-        Paragraph(
-            "Capitán Menor Indígena",
-            ParagraphStyle("sig_role", parent=base, fontSize=8.8, leading=10, alignment=TA_LEFT),
+        self.footer_style = footer_style = ParagraphStyle(
+            "footer",
+            parent=base,
+            fontSize=7.5,
+            leading=9,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor("#111111"),
         )
-    )
-
-    qr_img = _qr_as_reportlab_image(verify_url)
-    qr_block = [
-        qr_img,
-        Spacer(1, 4),
-        LinkNoWrap(verify_url, verify_url, width=110, font_name="Helvetica", font_size=7.2),
-        Spacer(1, 6),
-        Paragraph(
-            "Escanee el QR o haga clic en el enlace para validar la autenticidad y el estado de afiliación.",
-            small_left,
-        ),
-    ]
+        footer_style.fontName = "Helvetica-Bold"
+
+        self.encabezado = [Paragraph(f"<b>{line}</b>", header_style) for line in definicion["encabezado"]]
+        self.preambulo = Paragraph(definicion["preambulo"], self.body_style)
+        self.titulo = Paragraph(definicion["titulo"], title_style)
+        self.nota_qr = Paragraph(definicion["nota_qr"], small_left)
+
+        ancho = letter[0] - 2 * MARGEN_LATERAL
+        self.ancho = ancho
+        self.pie_legal = Paragraph(definicion["pie_legal"], footer_style)
+        self.pie_legal.wrap(ancho, MARGEN_INFERIOR)
+
+        nombre_con_doc = nombre_firma
+        if doc_tipo or doc_num:
+            nombre_con_doc = f"{nombre_firma}<br/>{doc_tipo} {doc_num}".strip()
+        self.nombre_con_doc = nombre_con_doc
+
+        self.sig_name_style = ParagraphStyle(
+            "sig_name",
+            parent=base,
+            fontName="Helvetica-Bold",
+            fontSize=9.5,
+            leading=11,
+            alignment=TA_LEFT,
+        )
+        self.sig_role_style = ParagraphStyle("sig_role", parent=base, fontSize=8.8, leading=10, alignment=TA_LEFT)
+        self.firma_nombre = Paragraph(nombre_con_doc, self.sig_name_style)
+        self.firma_rol = Paragraph(definicion["rol_firma"], self.sig_role_style)
 
-    table = Table(
-        [[signature_flowables, qr_block]],
-        colWidths=[doc.width * 0.60, doc.width * 0.40],
-        hAlign="LEFT",
-    )
-    table.setStyle(
-        TableStyle(
+        self.table_style = TableStyle(
             [
                 ("VALIGN", (0, 0), (-1, -1), "BOTTOM"),
                 ("ALIGN", (0, 0), (0, 0), "LEFT"),
@@ -391,103 +461,8 @@ def generar_certificado_pdf_bytes(
                 ("LEFTPADDING", (1, 0), (1, 0), 6),
             ]
         )
-    )
-    story.append(table)
 
-    # La leyenda legal e ID se pintan por canvas (footer fijo + ID arriba)
-    doc.build(story, onFirstPage=_dibujar_id_documento, onLaterPages=_dibujar_id_documento)
-    buf.seek(0)
-    return buf.getvalue()
-
-
-def generar_certificado_pdf(*, ciudadano, codigo: str, verify_url: str, out_path: str, emitido_en_utc: datetime | None = None) -> None:
-    """Crea un PDF (tamaño carta) en out_path.
-
-    Nota: el proyecto ya no guarda PDFs por defecto, pero mantenemos esta función
-    por compatibilidad.
-    """
-    out_file = Path(out_path)
-    out_file.parent.mkdir(parents=True, exist_ok=True)
-
-    if emitido_en_utc is None:
-        emitido_en_utc = datetime.utcnow()
-
-    pdf_bytes = generar_certificado_pdf_bytes(
-        ciudadano=ciudadano,
-        codigo=codigo,
-        verify_url=verify_url,
-        emitido_en_utc=emitido_en_utc,
-    )
-    out_file.write_bytes(pdf_bytes)
-    return
-
-    ahora = datetime.now()
-
-    styles = getSampleStyleSheet()
-    base = styles["Normal"]
-    base.fontName = "Helvetica"
-    base.fontSize = 11
-    base.leading = 16
-
-    header_style = ParagraphStyle(
-        "header",
-        parent=base,
-        fontSize=9,
-        leading=11,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor("#555555"),
-    )
-
-    title_style = ParagraphStyle(
-        "title",
-        parent=base,
-        fontSize=12,
-        leading=16,
-        alignment=TA_CENTER,
-        spaceBefore=30,
-        spaceAfter=30,
-    )
-    title_style.fontName = "Helvetica-Bold"
-
-    body_style = ParagraphStyle(
-        "body",
-        parent=base,
-        alignment=TA_JUSTIFY,
-    )
-
-    small_left = ParagraphStyle(
-        "small_left",
-        parent=base,
-        fontSize=8,
-        leading=10,
-        alignment=TA_LEFT,
-        textColor=colors.HexColor("#444444"),
-    )
-
-    link_style = ParagraphStyle(
-        "link",
-        parent=base,
-        fontSize=7.2,
-        leading=9,
-        alignment=TA_LEFT,
-        textColor=colors.HexColor("#0f3a5f"),
-    )
-
-    footer_style = ParagraphStyle(
-        "footer",
-        parent=base,
-        fontSize=7.5,
-        leading=9,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor("#111111"),
-    )
-    footer_style.fontName = "Helvetica-Bold"
-
-    ID_Y_OFFSET = 55
-    FOOTER_Y = 80
-    TOP_MARGIN = 90
-
-    def _dibujar_id_documento(canvas, doc):
+    def dibujar_fijos(self, canvas, doc, *, codigo: str) -> None:
         """Elementos fijos de la hoja.
 
         - ID arriba a la izquierda (arriba del todo)
@@ -497,57 +472,86 @@ def generar_certificado_pdf(*, ciudadano, codigo: str, verify_url: str, out_path
 
         canvas.setFont("Helvetica", 8)
         canvas.setFillColor(colors.HexColor("#444444"))
-        texto_id = f"ID: {codigo}"
-        canvas.drawString(doc.leftMargin, doc.pagesize[1] - ID_Y_OFFSET, texto_id)
+        canvas.drawString(doc.leftMargin, doc.pagesize[1] - ID_Y_OFFSET, f"ID: {codigo}")
 
-        footer_text = (
-            "Los Cabildos Menores son considerados Entidades territoriales Indígenas de carácter especial, Decreto "
-            "1386, por ende, puede Ejercer todas las funciones de las entidades territorial"
-        )
-        para = Paragraph(footer_text, footer_style)
-        para.wrap(doc.width, doc.bottomMargin)
-        para.drawOn(canvas, doc.leftMargin, FOOTER_Y)
+        copy.copy(self.pie_legal).drawOn(canvas, doc.leftMargin, FOOTER_Y)
 
         canvas.restoreState()
 
+
+_plantillas: dict[tuple[int, str, str, str], PlantillaCertificado] = {}
+_plantillas_lock = threading.Lock()
+
+
+def obtener_plantilla(version: int = 1, definicion: dict | None = None) -> PlantillaCertificado:
+    """Plantilla compilada para `version` y la configuración de firma vigente.
+
+    Se indexa por versión (las versiones publicadas no cambian) y por los
+    datos del firmante, para que un cambio en la configuración produzca una
+    plantilla nueva en lugar de reutilizar la anterior. Sin `definicion` se
+    usa la plantilla original.
+    """
+    clave = (
+        version,
+        current_app.config.get("CAPITAN_MENOR_NOMBRE") or "CAPITÁN MENOR",
+        current_app.config.get("CAPITAN_MENOR_DOCUMENTO_TIPO") or "",
+        current_app.config.get("CAPITAN_MENOR_DOCUMENTO_NUMERO") or "",
+    )
+    plantilla = _plantillas.get(clave)
+    if plantilla is None:
+        with _plantillas_lock:
+            plantilla = _plantillas.get(clave)
+            if plantilla is None:
+                _, nombre_firma, doc_tipo, doc_num = clave
+                plantilla = PlantillaCertificado(
+                    definicion if definicion is not None else DEFINICION_INICIAL,
+                    version=version,
+                    nombre_firma=nombre_firma,
+                    doc_tipo=doc_tipo,
+                    doc_num=doc_num,
+                )
+                _plantillas[clave] = plantilla
+    return plantilla
+
+
+def _construir_pdf(
+    *,
+    ciudadano,
+    codigo: str,
+    verify_url: str,
+    emitido_en_utc: datetime,
+    tipo_documento: str,
+    texto_personalizado: str | None,
+    qr_matriz: bytes | None = None,
+    plantilla: PlantillaCertificado,
+) -> bytes:
+    """Arma el certificado sobre la plantilla compilada."""
+    body_style = plantilla.body_style
+    buf = io.BytesIO()
+
     doc = SimpleDocTemplate(
-        str(out_file),
+        buf,
         pagesize=letter,
-        leftMargin=54,
-        rightMargin=54,
+        leftMargin=MARGEN_LATERAL,
+        rightMargin=MARGEN_LATERAL,
         topMargin=TOP_MARGIN,
-        bottomMargin=50,
-        title="Certificado Cabildo Indígena de la Peñata",
-        author="Cabildo Indígena de la Peñata",
+        bottomMargin=MARGEN_INFERIOR,
+        title=plantilla.definicion["titulo_pdf"],
+        author=plantilla.definicion["autor_pdf"],
+        invariant=1,
     )
 
     story = []
 
-    # Encabezado
-    header_lines = [
-        "RESGUARDO INDIGENA ZENU SAN ANDRES DE SOTAVENTO",
-        "CORDOBA – SUCRE",
-        "CABILDO MENOR INDIGENA DE LA PEÑATA – TERRITORIO – SINCELEJO",
-        "NIT. 823.003.642-8",
-        "RESOLUCION N° 0022 DEL 26 DE OCTUBRE DEL 2011",
-    ]
-    for line in header_lines:
-        story.append(Paragraph(f"<b>{line}</b>", header_style))
+    story.extend(copy.copy(p) for p in plantilla.encabezado)
     story.append(Spacer(1, 16))
-
-    story.append(
-        Paragraph(
-            "El Capitán Menor Indígena de la Peñata, en uso de sus facultades legales Ley 21 1991, "
-            "Leyes complementarias y Decretos Complementarios, uso de costumbres propias del pueblo Zenú, "
-            "y en cumplimiento de su función de representación y organización comunitaria.",
-            body_style,
-        )
-    )
-    story.append(Paragraph("CERTIFICA QUE", title_style))
+    story.append(copy.copy(plantilla.preambulo))
+    story.append(copy.copy(plantilla.titulo))
 
     story.append(
         Paragraph(
             _parrafo_principal_certificado(
+                plantilla=plantilla,
                 ciudadano=ciudadano,
                 tipo_documento=tipo_documento,
                 texto_personalizado=texto_personalizado,
@@ -556,73 +560,29 @@ def generar_certificado_pdf(*, ciudadano, codigo: str, verify_url: str, out_path
         )
     )
 
-    mes = MESES_ES.get(ahora.month, str(ahora.month))
-    hora = ahora.strftime("%I:%M %p")
-
     story.append(Spacer(1, 10))
-    story.append(
-        Paragraph(
-            "La presente certificación se expide a solicitud del interesado (a), en la ciudad de "
-            f"<b>Sincelejo, Sucre</b>, a los <b>{ahora.day:02d}</b> días del mes de <b>{mes}</b> del año "
-            f"<b>{ahora.year}</b>, siendo las <b>{hora}</b>.",
-            body_style,
-        )
-    )
+    story.append(Paragraph(_parrafo_fecha_expedicion(plantilla, emitido_en_utc), body_style))
 
     story.append(Spacer(1, SIGNATURE_TOP_SPACER))
 
-    # Firma (parametrizable por .env)
-    firma_ruta = current_app.config.get("CAPITAN_MENOR_FIRMA_RUTA")
-    nombre_firma = current_app.config.get("CAPITAN_MENOR_NOMBRE") or "CAPITÁN MENOR"
-    doc_tipo = current_app.config.get("CAPITAN_MENOR_DOCUMENTO_TIPO") or ""
-    doc_num = current_app.config.get("CAPITAN_MENOR_DOCUMENTO_NUMERO") or ""
-
     signature_flowables = []
-    firma_path = _resolver_ruta_firma(firma_ruta) or (Path(current_app.root_path) / "static" / "img" / "Firma_Diomedes.png")
-
-    if firma_path.exists():
-        signature_flowables.append(Image(str(firma_path), width=180, height=80, hAlign="LEFT"))
+    firma = _cargar_firma(_ruta_firma_configurada())
+    if firma is not None:
+        signature_flowables.append(FirmaImagen(firma))
         signature_flowables.append(Spacer(1, 1))
 
     signature_flowables.append(HRFlowable(width=250, thickness=1.2, color=colors.black))
     signature_flowables.append(Spacer(1, 4))
-    sufijo_doc = ""
-    if doc_tipo or doc_num:
-        sufijo_doc = f" - {doc_tipo} {doc_num}".strip()
-
-    signature_flowables.append(
-        Paragraph(
-            f"{nombre_firma}{sufijo_doc}",
-            ParagraphStyle(
-                "sig_name",
-                parent=base,
-                fontName="Helvetica-Bold",
-                fontSize=9.5,
-                leading=11,
-                alignment=TA_LEFT,
-            ),
-        )
-    )
-
-    signature_flowables.append(
-        Paragraph(
-            "Capitán Menor Indígena",
-            ParagraphStyle("sig_role", parent=base, fontSize=8.8, leading=10, alignment=TA_LEFT),
-        )
-    )
-
-    # QR + enlace + texto
-    qr_img = _qr_as_reportlab_image(verify_url)
+    signature_flowables.append(copy.copy(plantilla.firma_nombre))
+    signature_flowables.append(copy.copy(plantilla.firma_rol))
 
+    qr_img = _qr_certificado(verify_url, qr_matriz)
     qr_block = [
         qr_img,
         Spacer(1, 4),
         LinkNoWrap(verify_url, verify_url, width=110, font_name="Helvetica", font_size=7.2),
         Spacer(1, 6),
-        Paragraph(
-            "Escanee el QR o haga clic en el enlace para validar la autenticidad y el estado de afiliación.",
-            small_left,
-        ),
+        copy.copy(plantilla.nota_qr),
     ]
 
     table = Table(
@@ -630,282 +590,212 @@ def generar_certificado_pdf(*, ciudadano, codigo: str, verify_url: str, out_path
         colWidths=[doc.width * 0.60, doc.width * 0.40],
         hAlign="LEFT",
     )
-    table.setStyle(
-        TableStyle(
-            [
-                ("VALIGN", (0, 0), (-1, -1), "BOTTOM"),
-                ("ALIGN", (0, 0), (0, 0), "LEFT"),
-                ("ALIGN", (1, 0), (1, 0), "LEFT"),
-                ("LEFTPADDING", (0, 0), (-1, -1), 0),
-                ("RIGHTPADDING", (0, 0), (-1, -1), 0),
-                ("LEFTPADDING", (1, 0), (1, 0), 6),
-            ]
-        )
-    )
+    table.setStyle(plantilla.table_style)
     story.append(table)
 
-    story.append(Spacer(1, 10))
+    def _dibujar_fijos(canvas, doc):  # noqa: N803
+        canvas.setDateFormatter(_fecha_pdf(emitido_en_utc))
+        plantilla.dibujar_fijos(canvas, doc, codigo=codigo)
 
-    doc.build(story, onFirstPage=_dibujar_id_documento, onLaterPages=_dibujar_id_documento)
+    # La leyenda legal e ID se pintan por canvas (footer fijo + ID arriba)
+    doc.build(story, onFirstPage=_dibujar_fijos, onLaterPages=_dibujar_fijos)
+    return buf.getvalue()
 
 
-def generar_copia_verificacion_pdf_bytes(
+def generar_certificado_pdf_bytes(
     *,
     ciudadano,
     codigo: str,
     verify_url: str,
-    consultado_en: datetime,
     emitido_en_utc: datetime,
     tipo_documento: str = "certificado_afiliacion",
     texto_personalizado: str | None = None,
+    qr_matriz: bytes | None = None,
+    plantilla_version: int = 1,
+    plantilla_definicion: dict | None = None,
 ) -> bytes:
-    """Genera una copia del certificado para fines de verificación pública.
+    """Genera el certificado en bytes.
 
-    - No modifica ni depende del archivo original
-    - Incluye marca/leyenda indicando que es una copia
-    - Incluye fecha y hora de la consulta
+    Cambios solicitados:
+    - No depende de un archivo guardado en disco.
+    - La fecha/hora de emisión debe corresponder al momento en que el usuario lo generó
+      (emitido_en_utc), no al momento en que se abre/descarga.
 
-    Retorna el PDF en bytes (para abrirse en el navegador).
+    El motor se elige con PDF_MOTOR: "canvas" (coordenadas fijas, por defecto)
+    o "platypus". Si el contenido no cabe en el layout fijo se usa platypus.
+    Con PDF_COMPACTO se emite la versión de menor tamaño (ver configurar_reportlab).
+    `qr_matriz` es la matriz empaquetada guardada al emitir (para verify_url).
+    `plantilla_version`/`plantilla_definicion` son los del documento (ver
+    backend/plantillas.py); sin definición se usa la plantilla original.
     """
-    buf = io.BytesIO()
+    plantilla = obtener_plantilla(plantilla_version, plantilla_definicion)
+    if (current_app.config.get("PDF_MOTOR") or "canvas") == "canvas":
+        from backend.pdf_canvas import construir_pdf_canvas
+
+        pdf_bytes = construir_pdf_canvas(
+            ciudadano=ciudadano,
+            codigo=codigo,
+            verify_url=verify_url,
+            emitido_en_utc=emitido_en_utc,
+            tipo_documento=tipo_documento,
+            texto_personalizado=texto_personalizado,
+            qr_matriz=qr_matriz,
+            plantilla=plantilla,
+        )
+        if pdf_bytes is not None:
+            return pdf_bytes
 
-    styles = getSampleStyleSheet()
-    base = styles["Normal"]
-    base.fontName = "Helvetica"
-    base.fontSize = 11
-    base.leading = 16
-
-    aviso_style = ParagraphStyle(
-        "aviso",
-        parent=base,
-        fontSize=8.5,
-        leading=11,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor("#666666"),
-    )
-    aviso_style.fontName = "Helvetica-Bold"
-
-    header_style = ParagraphStyle(
-        "header",
-        parent=base,
-        fontSize=9,
-        leading=11,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor("#555555"),
+    return _construir_pdf(
+        ciudadano=ciudadano,
+        codigo=codigo,
+        verify_url=verify_url,
+        emitido_en_utc=emitido_en_utc,
+        tipo_documento=tipo_documento,
+        texto_personalizado=texto_personalizado,
+        qr_matriz=qr_matriz,
+        plantilla=plantilla,
     )
 
-    title_style = ParagraphStyle(
-        "title",
-        parent=base,
-        fontSize=12,
-        leading=16,
-        alignment=TA_CENTER,
-        spaceBefore=30,
-        spaceAfter=30,
-    )
-    title_style.fontName = "Helvetica-Bold"
 
-    body_style = ParagraphStyle(
-        "body",
-        parent=base,
-        alignment=TA_JUSTIFY,
-    )
+def comprobar_plantilla(definicion: dict) -> None:
+    """Renderiza certificados de ejemplo con ambos motores antes de publicar.
 
-    small_left = ParagraphStyle(
-        "small_left",
-        parent=base,
-        fontSize=8,
-        leading=10,
-        alignment=TA_LEFT,
-        textColor=colors.HexColor("#444444"),
-    )
+    Lanza ValueError si alguno falla. Que el motor canvas no la dibuje (retorna
+    None por markup que no maneja) es válido: esos certificados usan platypus.
+    """
+    try:
+        plantilla = PlantillaCertificado(
+            definicion,
+            version=0,
+            nombre_firma=current_app.config.get("CAPITAN_MENOR_NOMBRE") or "CAPITÁN MENOR",
+            doc_tipo=current_app.config.get("CAPITAN_MENOR_DOCUMENTO_TIPO") or "",
+            doc_num=current_app.config.get("CAPITAN_MENOR_DOCUMENTO_NUMERO") or "",
+        )
+    except Exception as e:  # noqa: BLE001
+        raise ValueError(f"La plantilla no se puede compilar: {e!r}") from e
+    ciudadano = SimpleNamespace(
+        nombre_completo="MARÍA JOSÉ PÉREZ MONTERROSA", tipo_documento="CC", numero_documento="1102345678"
+    )
+    verify_url = "https://cabildo.example/validar/CIP202601010800001234"
+
+    from backend.pdf_canvas import construir_pdf_canvas
+
+    for motor, construir in (("canvas", construir_pdf_canvas), ("platypus", _construir_pdf)):
+        for tipo_documento, texto in (("certificado_afiliacion", None), ("certificado_especial", "Texto de ejemplo.")):
+            try:
+                construir(
+                    ciudadano=ciudadano,
+                    codigo="CIP202601010800001234",
+                    verify_url=verify_url,
+                    emitido_en_utc=datetime(2026, 1, 1, 13, 0),
+                    tipo_documento=tipo_documento,
+                    texto_personalizado=texto,
+                    plantilla=plantilla,
+                )
+            except Exception as e:  # noqa: BLE001
+                raise ValueError(f"La plantilla no se puede dibujar con el motor {motor}: {e!r}") from e
 
-    link_style = ParagraphStyle(
-        "link",
-        parent=base,
-        fontSize=7.2,
-        leading=9,
-        alignment=TA_LEFT,
-        textColor=colors.HexColor("#0f3a5f"),
-    )
 
-    footer_style = ParagraphStyle(
-        "footer",
-        parent=base,
-        fontSize=7.5,
-        leading=9,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor("#111111"),
-    )
-    footer_style.fontName = "Helvetica-Bold"
+def generar_certificado_pdf(*, ciudadano, codigo: str, verify_url: str, out_path: str, emitido_en_utc: datetime | None = None) -> None:
+    """Crea un PDF (tamaño carta) en out_path.
 
-    ID_Y_OFFSET = 55
-    FOOTER_Y = 80
-    TOP_MARGIN = 90
-    SIGNATURE_TOP_SPACER = 60 
-    def _dibujar_id_documento(canvas, doc):  # noqa: N803
-        """Elementos fijos de la hoja.
+    Nota: el proyecto ya no guarda PDFs por defecto, pero mantenemos esta función
+    por compatibilidad.
+    """
+    out_file = Path(out_path)
+    out_file.parent.mkdir(parents=True, exist_ok=True)
 
-        - ID arriba a la izquierda (arriba del todo)
-        - Leyenda legal siempre al final de la hoja
-        """
-        canvas.saveState()
+    if emitido_en_utc is None:
+        emitido_en_utc = datetime.utcnow()
 
-        canvas.setFont("Helvetica", 8)
-        canvas.setFillColor(colors.HexColor("#444444"))
-        texto_id = f"ID: {codigo}"
-        canvas.drawString(doc.leftMargin, doc.pagesize[1] - ID_Y_OFFSET, texto_id)
+    pdf_bytes = generar_certificado_pdf_bytes(
+        ciudadano=ciudadano,
+        codigo=codigo,
+        verify_url=verify_url,
+        emitido_en_utc=emitido_en_utc,
+    )
+    out_file.write_bytes(pdf_bytes)
 
-        footer_text = (
-            "Los Cabildos Menores son considerados Entidades territoriales Indígenas de carácter especial, Decreto "
-            "1386, por ende, puede Ejercer todas las funciones de las entidades territorial"
-        )
-        para = Paragraph(footer_text, footer_style)
-        para.wrap(doc.width, doc.bottomMargin)
-        para.drawOn(canvas, doc.leftMargin, FOOTER_Y)
 
-        canvas.restoreState()
+def _sello_verificacion_pdf_bytes(consultado_en: datetime) -> bytes:
+    """Página transparente con el aviso de copia y la fecha/hora de la consulta.
 
-    doc = SimpleDocTemplate(
-        buf,
-        pagesize=letter,
-        leftMargin=54,
-        rightMargin=54,
-        topMargin=TOP_MARGIN,
-        bottomMargin=50,
-        title="Copia para verificación - Certificado Cabildo",
-        author="Cabildo Indígena de la Peñata",
-    )
+    Se ubica en la franja superior libre (sobre el ID del documento) para
+    superponerse al certificado ya renderizado sin mover su contenido.
+    """
+    buf = io.BytesIO()
+    ancho, alto = letter
+    c = Canvas(buf, pagesize=letter, pageCompression=1, invariant=1)
 
-    story = []
+    c.setFillColor(colors.HexColor("#666666"))
+    c.setFont("Helvetica-Bold", 8.5)
+    c.drawCentredString(ancho / 2, alto - SELLO_Y_OFFSET, "COPIA PARA VERIFICACIÓN (SERVIDOR CENTRAL)")
 
-    # Aviso de copia (servidor central)
     consulta_txt = consultado_en.strftime("%d/%m/%Y %I:%M %p")
-    story.append(Paragraph("COPIA PARA VERIFICACIÓN (SERVIDOR CENTRAL)", aviso_style))
-    story.append(Paragraph(f"Consulta realizada: {consulta_txt}", ParagraphStyle("aviso2", parent=aviso_style, fontName="Helvetica", fontSize=8.2)))
-    story.append(Spacer(1, 10))
-    story.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor("#DDDDDD")))
-    story.append(Spacer(1, 10))
+    c.setFont("Helvetica", 8.2)
+    c.drawCentredString(ancho / 2, alto - SELLO_Y_OFFSET - 11, f"Consulta realizada: {consulta_txt}")
 
-    header_lines = [
-        "RESGUARDO INDIGENA ZENU SAN ANDRES DE SOTAVENTO",
-        "CORDOBA – SUCRE",
-        "CABILDO MENOR INDIGENA DE LA PEÑATA – TERRITORIO – SINCELEJO",
-        "NIT. 823.003.642-8",
-        "RESOLUCION N° 0022 DEL 26 DE OCTUBRE DEL 2011",
-    ]
-    for line in header_lines:
-        story.append(Paragraph(f"<b>{line}</b>", header_style))
-    story.append(Spacer(1, 16))
-
-    story.append(
-        Paragraph(
-            "El Capitán Menor Indígena de la Peñata, en uso de sus facultades legales Ley 21 1991, "
-            "Leyes complementarias y Decretos Complementarios, uso de costumbres propias del pueblo Zenú, "
-            "y en cumplimiento de su función de representación y organización comunitaria.",
-            body_style,
-        )
-    )
-    story.append(Paragraph("CERTIFICA QUE", title_style))
+    c.setStrokeColor(colors.HexColor("#DDDDDD"))
+    c.setLineWidth(1)
+    y_linea = alto - SELLO_Y_OFFSET - 17
+    c.line(MARGEN_LATERAL, y_linea, ancho - MARGEN_LATERAL, y_linea)
 
-    story.append(
-        Paragraph(
-            _parrafo_principal_certificado(
-                ciudadano=ciudadano,
-                tipo_documento=tipo_documento,
-                texto_personalizado=texto_personalizado,
-            ),
-            body_style,
-        )
-    )
-
-    emitido_local = _to_local(emitido_en_utc)
-    mes = MESES_ES.get(emitido_local.month, str(emitido_local.month))
-    hora = emitido_local.strftime("%I:%M %p")
+    c.showPage()
+    c.save()
+    return buf.getvalue()
 
-    story.append(Spacer(1, 10))
-    story.append(
-        Paragraph(
-            "La presente certificación se expide a solicitud del interesado (a), en la ciudad de "
-            f"<b>Sincelejo, Sucre</b>, a los <b>{emitido_local.day:02d}</b> días del mes de <b>{mes}</b> del año "
-            f"<b>{emitido_local.year}</b>, siendo las <b>{hora}</b>.",
-            body_style,
-        )
-    )
 
-    story.append(Spacer(1, SIGNATURE_TOP_SPACER))
+def caja_sello_verificacion() -> tuple[float, float, float, float]:
+    """Rectángulo (x1, y1, x2, y2) de la hoja que ocupa el sello de verificación."""
+    ancho, alto = letter
+    return (MARGEN_LATERAL, alto - SELLO_Y_OFFSET - 19, ancho - MARGEN_LATERAL, alto - SELLO_Y_OFFSET + 10)
 
-    firma_ruta = current_app.config.get("CAPITAN_MENOR_FIRMA_RUTA")
-    nombre_firma = current_app.config.get("CAPITAN_MENOR_NOMBRE") or "CAPITÁN MENOR"
-    doc_tipo = current_app.config.get("CAPITAN_MENOR_DOCUMENTO_TIPO") or ""
-    doc_num = current_app.config.get("CAPITAN_MENOR_DOCUMENTO_NUMERO") or ""
 
-    signature_flowables = []
-    firma_path = _resolver_ruta_firma(firma_ruta) or (Path(current_app.root_path) / "static" / "img" / "Firma_Diomedes.png")
+def estampar_copia_verificacion(pdf_base: bytes, *, consultado_en: datetime) -> bytes:
+    """Superpone el sello de verificación a un certificado ya renderizado.
 
-    if firma_path.exists():
-        signature_flowables.append(Image(str(firma_path), width=180, height=80, hAlign="LEFT"))
-        signature_flowables.append(Spacer(1, 1))
+    El certificado base no se vuelve a maquetar: solo se fusiona una página
+    pequeña con el aviso de copia sobre la primera hoja. Reescribe el PDF, así
+    que no sirve para certificados firmados (ver `firma_digital.sellar_copia_verificacion`).
+    """
+    sello = PdfReader(io.BytesIO(_sello_verificacion_pdf_bytes(consultado_en))).pages[0]
 
-    signature_flowables.append(HRFlowable(width=250, thickness=1.2, color=colors.black))
-    signature_flowables.append(Spacer(1, 4))
+    writer = PdfWriter(clone_from=PdfReader(io.BytesIO(pdf_base)))
+    pagina = writer.pages[0]
+    pagina.merge_page(sello)
+    pagina.compress_content_streams()
+    writer.add_metadata({"/Title": "Copia para verificación - Certificado Cabildo"})
 
-    nombre_con_doc = nombre_firma
-    if doc_tipo or doc_num:
-        nombre_con_doc = f"{nombre_firma}<br/>{doc_tipo} {doc_num}".strip()
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
 
-    signature_flowables.append(
-        Paragraph(
-            nombre_con_doc,
-            ParagraphStyle(
-                "sig_name",
-                parent=base,
-                fontName="Helvetica-Bold",
-                fontSize=9.5,
-                leading=11,
-                alignment=TA_LEFT,
-            ),
-        )
-    )
 
-    signature_flowables.append(
-        Paragraph(
-            "Capitán Menor Indígena",
-            ParagraphStyle("sig_role", parent=base, fontSize=8.8, leading=10, alignment=TA_LEFT),
-        )
-    )
+def generar_copia_verificacion_pdf_bytes(
+    *,
+    ciudadano,
+    codigo: str,
+    verify_url: str,
+    consultado_en: datetime,
+    emitido_en_utc: datetime,
+    tipo_documento: str = "certificado_afiliacion",
+    texto_personalizado: str | None = None,
+) -> bytes:
+    """Genera una copia del certificado para fines de verificación pública.
 
-    qr_img = _qr_as_reportlab_image(verify_url)
-    qr_block = [
-        qr_img,
-        Spacer(1, 4),
-        LinkNoWrap(verify_url, verify_url, width=110, font_name="Helvetica", font_size=7.2),
-        Spacer(1, 6),
-        Paragraph(
-            "Escanee el QR o haga clic en el enlace para validar la autenticidad y el estado de afiliación.",
-            small_left,
-        ),
-    ]
+    - No modifica ni depende del archivo original
+    - Incluye marca/leyenda indicando que es una copia
+    - Incluye fecha y hora de la consulta
 
-    table = Table(
-        [[signature_flowables, qr_block]],
-        colWidths=[doc.width * 0.60, doc.width * 0.40],
-        hAlign="LEFT",
-    )
-    table.setStyle(
-        TableStyle(
-            [
-                ("VALIGN", (0, 0), (-1, -1), "BOTTOM"),
-                ("ALIGN", (0, 0), (0, 0), "LEFT"),
-                ("ALIGN", (1, 0), (1, 0), "LEFT"),
-                ("LEFTPADDING", (0, 0), (-1, -1), 0),
-                ("RIGHTPADDING", (0, 0), (-1, -1), 0),
-                ("LEFTPADDING", (1, 0), (1, 0), 6),
-            ]
-        )
+    Retorna el PDF en bytes (para abrirse en el navegador). Si ya se tiene el
+    certificado renderizado, usar `estampar_copia_verificacion` directamente.
+    """
+    pdf_base = generar_certificado_pdf_bytes(
+        ciudadano=ciudadano,
+        codigo=codigo,
+        verify_url=verify_url,
+        emitido_en_utc=emitido_en_utc,
+        tipo_documento=tipo_documento,
+        texto_personalizado=texto_personalizado,
     )
-    story.append(table)
-
-    doc.build(story, onFirstPage=_dibujar_id_documento, onLaterPages=_dibujar_id_documento)
-    buf.seek(0)
-    return buf.getvalue()
+    return estampar_copia_verificacion(pdf_base, consultado_en=consultado_en)
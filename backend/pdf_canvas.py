@@ -0,0 +1,378 @@
+"""Motor de render por coordenadas fijas para los certificados.
+
+El certificado ocupa una sola hoja con un layout fijo. En lugar de pasar por
+SimpleDocTemplate, Table y Paragraph en cada petición, aquí se dibuja directo
+sobre el canvas en las mismas posiciones que produce platypus:
+
+- Los bloques de texto fijos (encabezado, preámbulo, título, firma, leyenda)
+  se cortan en líneas una sola vez por plantilla.
+- Los párrafos variables (titular y fecha) se justifican aquí mismo: corte
+  de línea voraz por palabras y espacio extra repartido entre palabras, igual
+  que hace ReportLab.
+
+Si el contenido no cabe en la hoja (p. ej. un texto_personalizado muy largo)
+o trae markup que este motor no dibuja (saltos de línea explícitos o
+etiquetas distintas de <b>), `construir_pdf_canvas` retorna None y el
+llamador usa platypus.
+"""
+
+from __future__ import annotations
+
+import io
+import re
+import threading
+from datetime import datetime
+from html import unescape
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import HRFlowable
+
+from backend.pdf import (
+    FIRMA_ALTO,
+    FOOTER_Y,
+    ID_Y_OFFSET,
+    MARGEN_INFERIOR,
+    MARGEN_LATERAL,
+    SIGNATURE_TOP_SPACER,
+    TOP_MARGIN,
+    FirmaImagen,
+    LinkNoWrap,
+    PlantillaCertificado,
+    _cargar_firma,
+    _fecha_pdf,
+    _qr_certificado,
+    _parrafo_fecha_expedicion,
+    _parrafo_principal_certificado,
+    _ruta_firma_configurada,
+)
+
+
+# Geometría equivalente a SimpleDocTemplate + Frame (padding 6) + Table
+PADDING_FRAME = 6
+ANCHO_PAGINA, ALTO_PAGINA = letter
+ANCHO_DOC = ANCHO_PAGINA - 2 * MARGEN_LATERAL
+X_CONTENIDO = MARGEN_LATERAL + PADDING_FRAME
+ANCHO_CONTENIDO = ANCHO_DOC - 2 * PADDING_FRAME
+Y_TOPE = ALTO_PAGINA - TOP_MARGIN - PADDING_FRAME
+Y_FONDO = MARGEN_INFERIOR + PADDING_FRAME
+
+COL_FIRMA_ANCHO = ANCHO_DOC * 0.60
+COL_QR_X = X_CONTENIDO + COL_FIRMA_ANCHO + 6
+COL_QR_ANCHO = ANCHO_DOC * 0.40 - 6
+PADDING_CELDA = 3
+
+QR_SIZE = 110
+LINK_ALTO = 7.2 + 4
+HR_GROSOR = 1.2
+
+_TOKEN = re.compile(r"(<b>|</b>|<br/>)")
+
+
+def _palabras(markup: str, fuente: str, fuente_negrita: str) -> list[list[tuple[str, str]]] | None:
+    """Divide el markup (<b>, </b>) en palabras formadas por (fuente, texto).
+
+    Una palabra puede mezclar fuentes (p. ej. número en negrita seguido de
+    punto). Retorna None si hay saltos de línea explícitos (<br/>) u otras
+    etiquetas (<i>, <font>, ...), que solo platypus dibuja.
+    """
+    palabras: list[list[tuple[str, str]]] = []
+    actual: list[tuple[str, str]] = []
+    negrita = False
+
+    for token in _TOKEN.split(markup):
+        if token == "<b>":
+            negrita = True
+            continue
+        if token == "</b>":
+            negrita = False
+            continue
+        if token == "<br/>":
+            return None
+        if not token:
+            continue
+        if "<" in token:
+            return None
+
+        f = fuente_negrita if negrita else fuente
+        texto = unescape(token)
+        partes = texto.split()
+        if texto[:1].isspace() and actual:
+            palabras.append(actual)
+            actual = []
+        for i, parte in enumerate(partes):
+            if i > 0:
+                palabras.append(actual)
+                actual = []
+            actual.append((f, parte))
+        if texto[-1:].isspace() and actual:
+            palabras.append(actual)
+            actual = []
+
+    if actual:
+        palabras.append(actual)
+    return palabras
+
+
+def _ancho(frags: list[tuple[str, str]], size: float) -> float:
+    return sum(stringWidth(t, f, size) for f, t in frags)
+
+
+class Bloque:
+    """Párrafo ya cortado en líneas, listo para dibujar en cualquier posición."""
+
+    def __init__(
+        self,
+        palabras: list[list[tuple[str, str]]],
+        *,
+        ancho: float,
+        size: float,
+        leading: float,
+        alignment: int,
+        color,
+    ) -> None:
+        self.ancho = ancho
+        self.size = size
+        self.leading = leading
+        self.alignment = alignment
+        self.color = color
+        self.lineas = self._cortar(palabras)
+
+    @classmethod
+    def desde_estilo(cls, markup: str, estilo, *, ancho: float) -> "Bloque | None":
+        fuente = estilo.fontName
+        negrita = "Helvetica-Bold" if fuente == "Helvetica" else fuente
+        palabras = _palabras(markup, fuente, negrita)
+        if palabras is None:
+            return None
+        return cls(
+            palabras,
+            ancho=ancho,
+            size=estilo.fontSize,
+            leading=estilo.leading,
+            alignment=estilo.alignment,
+            color=estilo.textColor,
+        )
+
+    @classmethod
+    def multilinea(cls, markup: str, estilo, *, ancho: float) -> "Bloque | None":
+        """Bloque con saltos explícitos (<br/>): cada tramo se corta por separado."""
+        bloque = None
+        for tramo in markup.split("<br/>"):
+            parcial = cls.desde_estilo(tramo, estilo, ancho=ancho)
+            if parcial is None:
+                return None
+            if bloque is None:
+                bloque = parcial
+            else:
+                bloque.lineas.extend(parcial.lineas)
+        return bloque
+
+    @property
+    def alto(self) -> float:
+        return len(self.lineas) * self.leading
+
+    def _cortar(self, palabras):
+        """Corte voraz: la palabra pasa a la siguiente línea si no cabe."""
+        lineas = []
+        actual: list[list[tuple[str, str]]] = []
+        ancho_actual = 0.0
+        for palabra in palabras:
+            w = _ancho(palabra, self.size)
+            if actual:
+                espacio = stringWidth(" ", palabra[0][0], self.size)
+                if ancho_actual + espacio + w > self.ancho:
+                    lineas.append(self._linea(actual, ancho_actual))
+                    actual, ancho_actual = [palabra], w
+                    continue
+                ancho_actual += espacio + w
+                actual.append(palabra)
+            else:
+                actual, ancho_actual = [palabra], w
+        if actual:
+            lineas.append(self._linea(actual, ancho_actual))
+        return lineas
+
+    @staticmethod
+    def _linea(palabras, ancho: float):
+        # Une palabras en tramos de una misma fuente; el espacio entre
+        # palabras va con la fuente de la palabra siguiente (como ReportLab).
+        tramos: list[list[str]] = []
+        for i, palabra in enumerate(palabras):
+            for j, (f, t) in enumerate(palabra):
+                if i > 0 and j == 0:
+                    t = " " + t
+                if tramos and tramos[-1][0] == f:
+                    tramos[-1][1] += t
+                else:
+                    tramos.append([f, t])
+        return [(f, t) for f, t in tramos], ancho, len(palabras) - 1
+
+    def dibujar(self, c: Canvas, x: float, y_tope: float) -> float:
+        """Dibuja desde y_tope hacia abajo. Retorna la y del borde inferior."""
+        c.setFillColor(self.color)
+        tx = c.beginText()
+        y = y_tope - self.size
+        ultima = len(self.lineas) - 1
+        for i, (tramos, ancho, espacios) in enumerate(self.lineas):
+            extra = 0.0
+            x_linea = x
+            if self.alignment == TA_JUSTIFY and i < ultima and espacios:
+                extra = (self.ancho - ancho) / espacios
+            elif self.alignment == TA_CENTER:
+                x_linea = x + (self.ancho - ancho) / 2
+
+            tx.setTextOrigin(x_linea, y)
+            tx.setWordSpace(extra)
+            for f, t in tramos:
+                tx.setFont(f, self.size)
+                tx.textOut(t)
+            y -= self.leading
+        c.drawText(tx)
+        return y_tope - self.alto
+
+
+class DisenoCanvas:
+    """Bloques fijos de una plantilla ya cortados en líneas (uno por plantilla).
+
+    `dibujable` es False si algún bloque trae markup que este motor no maneja;
+    entonces todos los certificados de la plantilla se arman con platypus.
+    """
+
+    def __init__(self, plantilla: PlantillaCertificado) -> None:
+        self.plantilla = plantilla
+        d = plantilla.definicion
+        self.encabezado = [
+            Bloque.desde_estilo(f"<b>{line}</b>", plantilla.header_style, ancho=ANCHO_CONTENIDO)
+            for line in d["encabezado"]
+        ]
+        self.preambulo = Bloque.desde_estilo(d["preambulo"], plantilla.body_style, ancho=ANCHO_CONTENIDO)
+        self.titulo = Bloque.desde_estilo(d["titulo"], plantilla.title_style, ancho=ANCHO_CONTENIDO)
+        self.pie_legal = Bloque.desde_estilo(d["pie_legal"], plantilla.footer_style, ancho=ANCHO_DOC)
+        self.firma_nombre = Bloque.multilinea(plantilla.nombre_con_doc, plantilla.sig_name_style, ancho=COL_FIRMA_ANCHO)
+        self.firma_rol = Bloque.desde_estilo(d["rol_firma"], plantilla.sig_role_style, ancho=COL_FIRMA_ANCHO)
+        self.nota_qr = Bloque.desde_estilo(d["nota_qr"], plantilla.small_left, ancho=COL_QR_ANCHO)
+
+        fijos = [self.preambulo, self.titulo, self.pie_legal, self.firma_nombre, self.firma_rol, self.nota_qr]
+        self.dibujable = all(b is not None for b in self.encabezado + fijos)
+        if not self.dibujable:
+            return
+
+        ts = plantilla.title_style
+        y = Y_TOPE - sum(b.alto for b in self.encabezado) - 16
+        self.y_preambulo = y
+        y -= self.preambulo.alto + ts.spaceBefore
+        self.y_titulo = y
+        y -= self.titulo.alto + ts.spaceAfter
+        # Desde aquí empieza el contenido variable
+        self.y_principal = y
+
+        # Columna del QR (alineada abajo): nota, espacio, enlace, espacio, QR
+        self.alto_col_qr = self.nota_qr.alto + 6 + LINK_ALTO + 4 + QR_SIZE
+        # Columna de firma sin imagen: rol, nombre, espacio, línea (con 1 pt antes/después)
+        self.alto_col_firma = self.firma_rol.alto + self.firma_nombre.alto + 4 + 1 + HR_GROSOR + 1
+
+
+_disenos: dict[int, DisenoCanvas] = {}
+_disenos_lock = threading.Lock()
+
+
+def _diseno(plantilla: PlantillaCertificado) -> DisenoCanvas:
+    diseno = _disenos.get(id(plantilla))
+    if diseno is None or diseno.plantilla is not plantilla:
+        with _disenos_lock:
+            diseno = _disenos.get(id(plantilla))
+            if diseno is None or diseno.plantilla is not plantilla:
+                diseno = DisenoCanvas(plantilla)
+                _disenos[id(plantilla)] = diseno
+    return diseno
+
+
+def construir_pdf_canvas(
+    *,
+    ciudadano,
+    codigo: str,
+    verify_url: str,
+    emitido_en_utc: datetime,
+    tipo_documento: str,
+    texto_personalizado: str | None,
+    qr_matriz: bytes | None = None,
+    plantilla: PlantillaCertificado,
+) -> bytes | None:
+    """Dibuja el certificado en coordenadas fijas.
+
+    None si no cabe en una hoja o si la plantilla o el párrafo variable traen
+    markup que este motor no dibuja.
+    """
+    diseno = _diseno(plantilla)
+    if not diseno.dibujable:
+        return None
+
+    principal = Bloque.desde_estilo(
+        _parrafo_principal_certificado(
+            plantilla=plantilla,
+            ciudadano=ciudadano,
+            tipo_documento=tipo_documento,
+            texto_personalizado=texto_personalizado,
+        ),
+        plantilla.body_style,
+        ancho=ANCHO_CONTENIDO,
+    )
+    fecha = Bloque.desde_estilo(_parrafo_fecha_expedicion(plantilla, emitido_en_utc), plantilla.body_style, ancho=ANCHO_CONTENIDO)
+    if principal is None or fecha is None:
+        return None
+
+    firma = _cargar_firma(_ruta_firma_configurada())
+    alto_col_firma = diseno.alto_col_firma + (FIRMA_ALTO + 1 if firma is not None else 0)
+
+    y_fecha = diseno.y_principal - principal.alto - 10
+    y_tabla = y_fecha - fecha.alto - SIGNATURE_TOP_SPACER
+    y_tabla_fondo = y_tabla - max(alto_col_firma, diseno.alto_col_qr) - 2 * PADDING_CELDA
+    if y_tabla_fondo < Y_FONDO:
+        return None
+
+    buf = io.BytesIO()
+    c = Canvas(buf, pagesize=letter, invariant=1)
+    c.setDateFormatter(_fecha_pdf(emitido_en_utc))
+    c.setTitle(plantilla.definicion["titulo_pdf"])
+    c.setAuthor(plantilla.definicion["autor_pdf"])
+
+    # ID arriba y leyenda legal al pie (igual que onFirstPage en platypus)
+    c.setFont("Helvetica", 8)
+    c.setFillColor(colors.HexColor("#444444"))
+    c.drawString(MARGEN_LATERAL, ALTO_PAGINA - ID_Y_OFFSET, f"ID: {codigo}")
+    diseno.pie_legal.dibujar(c, MARGEN_LATERAL, FOOTER_Y + diseno.pie_legal.alto)
+
+    y = Y_TOPE
+    for bloque in diseno.encabezado:
+        y = bloque.dibujar(c, X_CONTENIDO, y)
+    diseno.preambulo.dibujar(c, X_CONTENIDO, diseno.y_preambulo)
+    diseno.titulo.dibujar(c, X_CONTENIDO, diseno.y_titulo)
+    principal.dibujar(c, X_CONTENIDO, diseno.y_principal)
+    fecha.dibujar(c, X_CONTENIDO, y_fecha)
+
+    # Columna de firma (alineada abajo, de abajo hacia arriba)
+    y = y_tabla_fondo + PADDING_CELDA
+    y = diseno.firma_rol.dibujar(c, X_CONTENIDO, y + diseno.firma_rol.alto) + diseno.firma_rol.alto
+    y = diseno.firma_nombre.dibujar(c, X_CONTENIDO, y + diseno.firma_nombre.alto) + diseno.firma_nombre.alto
+    y += 4 + 1
+    hr = HRFlowable(width=250, thickness=HR_GROSOR, color=colors.black)
+    hr.wrap(COL_FIRMA_ANCHO, HR_GROSOR)
+    hr.drawOn(c, X_CONTENIDO, y)
+    y += HR_GROSOR + 1
+    if firma is not None:
+        FirmaImagen(firma).drawOn(c, X_CONTENIDO, y + 1)
+
+    # Columna del QR
+    y = y_tabla_fondo + PADDING_CELDA
+    y = diseno.nota_qr.dibujar(c, COL_QR_X, y + diseno.nota_qr.alto) + diseno.nota_qr.alto + 6
+    LinkNoWrap(verify_url, verify_url, width=QR_SIZE, font_name="Helvetica", font_size=7.2).drawOn(c, COL_QR_X, y)
+    y += LINK_ALTO + 4
+    _qr_certificado(verify_url, qr_matriz, size=QR_SIZE).drawOn(c, COL_QR_X, y)
+
+    c.showPage()
+    c.save()
+    return buf.getvalue()
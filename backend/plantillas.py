@@ -0,0 +1,157 @@
+"""Plantillas de certificado versionadas.
+
+La plantilla reúne los textos del certificado (encabezado, preámbulo,
+párrafos, leyendas). Se guarda como JSON en `VersionPlantilla`:
+
+- Publicar una versión nueva no requiere redesplegar ni reiniciar: las
+  emisiones siguientes toman la última versión y cada proceso la compila la
+  primera vez que la usa (ver `obtener_plantilla` en backend/pdf.py).
+- Cada DocumentoGenerado guarda su `plantilla_version`, así que un re-render
+  produce siempre el mismo documento y la caché no se invalida al publicar.
+- La versión 1 es la plantilla original (DEFINICION_INICIAL) y existe aunque
+  la tabla esté vacía.
+
+Los textos admiten el markup de ReportLab y estos campos (el motor canvas
+solo dibuja <b>; con otras etiquetas o <br/> esa plantilla se arma con platypus):
+  texto_afiliacion / texto_especial: {nombre}, {tipo_documento}, {numero_documento}
+  texto_expedicion: {dia}, {mes}, {anio}, {hora}
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph
+
+from models import VersionPlantilla, db
+
+
+DEFINICION_INICIAL: dict = {
+    "titulo_pdf": "Certificado Cabildo Indígena de la Peñata",
+    "autor_pdf": "Cabildo Indígena de la Peñata",
+    "encabezado": [
+        "RESGUARDO INDIGENA ZENU SAN ANDRES DE SOTAVENTO",
+        "CORDOBA – SUCRE",
+        "CABILDO MENOR INDIGENA DE LA PEÑATA – TERRITORIO – SINCELEJO",
+        "NIT. 823.003.642-8",
+        "RESOLUCION N° 0022 DEL 26 DE OCTUBRE DEL 2011",
+    ],
+    "preambulo": (
+        "El Capitán Menor Indígena de la Peñata, en uso de sus facultades legales Ley 21 1991, "
+        "Leyes complementarias y Decretos Complementarios, uso de costumbres propias del pueblo Zenú, "
+        "y en cumplimiento de su función de representación y organización comunitaria."
+    ),
+    "titulo": "CERTIFICA QUE",
+    "texto_afiliacion": (
+        "<b>{nombre}</b> identificado(a) con {tipo_documento} No. "
+        "<b>{numero_documento}</b> se encuentra debidamente afiliado(a) al Cabildo Menor Indígena "
+        "de la Peñata, perteneciente al Resguardo Indígena Zenú de San Andrés de Sotavento, Córdoba - Sucre, "
+        "y registrado en la base de datos del ministerio del interior, formando parte activa de nuestra comunidad "
+        "respetando los principios de identidad, unidad, territorio y cultura ancestral del pueblo Zenú."
+    ),
+    "texto_especial": "<b>{nombre}</b> identificado(a) con {tipo_documento} No. <b>{numero_documento}</b>.",
+    "texto_expedicion": (
+        "La presente certificación se expide a solicitud del interesado (a), en la ciudad de "
+        "<b>Sincelejo, Sucre</b>, a los <b>{dia}</b> días del mes de <b>{mes}</b> del año "
+        "<b>{anio}</b>, siendo las <b>{hora}</b>."
+    ),
+    "rol_firma": "Capitán Menor Indígena",
+    "nota_qr": "Escanee el QR o haga clic en el enlace para validar la autenticidad y el estado de afiliación.",
+    "pie_legal": (
+        "Los Cabildos Menores son considerados Entidades territoriales Indígenas de carácter especial, Decreto "
+        "1386, por ende, puede Ejercer todas las funciones de las entidades territorial"
+    ),
+}
+
+_CAMPOS_EJEMPLO = {
+    "texto_afiliacion": {"nombre": "N", "tipo_documento": "CC", "numero_documento": "1"},
+    "texto_especial": {"nombre": "N", "tipo_documento": "CC", "numero_documento": "1"},
+    "texto_expedicion": {"dia": "01", "mes": "enero", "anio": 2026, "hora": "08:00 AM"},
+}
+
+# Las versiones publicadas no cambian: se cachean sin expiración.
+_definiciones: dict[int, dict] = {1: DEFINICION_INICIAL}
+_definiciones_lock = threading.Lock()
+
+
+def validar_definicion(definicion) -> dict:
+    """Comprueba campos, tipos, marcadores y markup. Lanza ValueError con el motivo."""
+    if not isinstance(definicion, dict):
+        raise ValueError("La plantilla debe ser un objeto JSON.")
+
+    faltantes = sorted(set(DEFINICION_INICIAL) - set(definicion))
+    if faltantes:
+        raise ValueError(f"Faltan campos en la plantilla: {', '.join(faltantes)}.")
+    sobrantes = sorted(set(definicion) - set(DEFINICION_INICIAL))
+    if sobrantes:
+        raise ValueError(f"Campos desconocidos en la plantilla: {', '.join(sobrantes)}.")
+
+    encabezado = definicion["encabezado"]
+    if not isinstance(encabezado, list) or not encabezado or not all(isinstance(x, str) for x in encabezado):
+        raise ValueError("`encabezado` debe ser una lista de líneas de texto.")
+    textos = {k: v for k, v in definicion.items() if k != "encabezado"}
+    for campo, valor in textos.items():
+        if not isinstance(valor, str) or not valor.strip():
+            raise ValueError(f"`{campo}` debe ser un texto no vacío.")
+
+    estilo = getSampleStyleSheet()["Normal"]
+    for campo, valor in list(textos.items()) + [("encabezado", f"<b>{x}</b>") for x in encabezado]:
+        try:
+            if campo in _CAMPOS_EJEMPLO:
+                valor = valor.format(**_CAMPOS_EJEMPLO[campo])
+            Paragraph(valor, estilo)
+        except (KeyError, IndexError) as e:
+            raise ValueError(f"`{campo}` usa un campo no disponible: {e}.") from e
+        except (ValueError, OSError) as e:  # OSError: <img> con un recurso que no se puede abrir
+            raise ValueError(f"`{campo}` tiene markup o llaves inválidas: {e}") from e
+
+    return definicion
+
+
+def version_vigente() -> int:
+    """Última versión publicada (la que usan las emisiones nuevas)."""
+    version = db.session.query(db.func.max(VersionPlantilla.version)).scalar()
+    return int(version or 1)
+
+
+def definicion_plantilla(version: int) -> dict:
+    """Definición de `version` (desde la caché del proceso o la BD)."""
+    definicion = _definiciones.get(version)
+    if definicion is None:
+        registro = db.session.get(VersionPlantilla, version)
+        if registro is None:
+            raise LookupError(f"No existe la versión {version} de la plantilla.")
+        definicion = json.loads(registro.definicion)
+        with _definiciones_lock:
+            definicion = _definiciones.setdefault(version, definicion)
+    return definicion
+
+
+def publicar_plantilla(definicion: dict, *, publicada_por: str | None = None) -> int:
+    """Valida y publica `definicion` como versión nueva. Retorna el número de versión.
+
+    Antes de publicar se dibujan certificados de ejemplo con ambos motores
+    (ver `comprobar_plantilla` en backend/pdf.py).
+    """
+    from backend.pdf import comprobar_plantilla
+
+    validar_definicion(definicion)
+    comprobar_plantilla(definicion)
+
+    if db.session.get(VersionPlantilla, 1) is None:
+        # La original queda registrada para poder consultarla y exportarla.
+        db.session.add(VersionPlantilla(version=1, definicion=json.dumps(DEFINICION_INICIAL, ensure_ascii=False)))
+        db.session.flush()
+
+    version = version_vigente() + 1
+    db.session.add(
+        VersionPlantilla(
+            version=version,
+            definicion=json.dumps(definicion, ensure_ascii=False),
+            publicada_por=publicada_por,
+        )
+    )
+    db.session.commit()
+    return version
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask, current_app
+
+from backend.cache_pdf import obtener_pdf_certificado
+from backend.certificados import url_verificacion
+from backend.exportacion_zip import datos_exportacion
+from backend.servicio_render import ErrorRender
+
+
+class Precalentador:
+    """Renderiza en segundo plano los certificados recién emitidos.
+
+    - El cliente casi siempre pide el PDF justo después de emitirlo: si el
+      render ya terminó se sirve desde caché, y si sigue en curso la petición
+      se une a él (ver render_unico).
+    - Es un best-effort: con la cola llena, o si el pool de render está
+      ocupado, el certificado simplemente se renderiza al pedirlo.
+    """
+
+    def __init__(self, app: Flask, *, cola_max: int) -> None:
+        self._app = app
+        self._cupos = threading.BoundedSemaphore(max(1, int(cola_max)))
+        self._ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="precalentado")
+
+    def encolar(self, doc, ciudadano, verify_url: str) -> bool:
+        if not self._cupos.acquire(blocking=False):
+            return False
+        (doc_copia, ciudadano_copia), = datos_exportacion([(doc, ciudadano)])
+        try:
+            self._ejecutor.submit(self._renderizar, doc_copia, ciudadano_copia, verify_url)
+        except RuntimeError:  # ejecutor cerrado
+            self._cupos.release()
+            return False
+        return True
+
+    def _renderizar(self, doc, ciudadano, verify_url: str) -> None:
+        try:
+            with self._app.app_context():
+                obtener_pdf_certificado(doc=doc, ciudadano=ciudadano, verify_url=verify_url)
+        except ErrorRender as e:
+            self._app.logger.info("Precalentado omitido para %s: %s", doc.codigo, e)
+        except Exception:  # noqa: BLE001
+            self._app.logger.exception("Precalentado falló para %s", doc.codigo)
+        finally:
+            self._cupos.release()
+
+    def cerrar(self) -> None:
+        self._ejecutor.shutdown(wait=False, cancel_futures=True)
+
+
+def precalentar_certificado(doc, ciudadano) -> bool:
+    """Encola el render de `doc` para la petición actual (retorna si se encoló)."""
+    if not current_app.config.get("PRECALENTAR_CERTIFICADOS"):
+        return False
+
+    precalentador = current_app.extensions.get("precalentador")
+    if precalentador is None:
+        precalentador = current_app.extensions.setdefault(
+            "precalentador",
+            Precalentador(
+                current_app._get_current_object(),
+                cola_max=int(current_app.config.get("PRECALENTADO_COLA_MAX") or 0),
+            ),
+        )
+    # El enlace del QR depende del host de esta petición.
+    return precalentador.encolar(doc, ciudadano, url_verificacion(doc.codigo))
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import qrcode
+
+
+def matriz_qr(data: str) -> list[list[bool]]:
+    """Módulos del QR para `data` (sin borde), igual a lo que se imprime en el PDF."""
+    qr = qrcode.QRCode(version=1, border=0)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+def empaquetar_qr(matriz: list[list[bool]]) -> bytes:
+    """Serializa la matriz en un byte con el tamaño + un bit por módulo (fila a fila)."""
+    n = len(matriz)
+    bits = "".join("1" if modulo else "0" for fila in matriz for modulo in fila)
+    bits += "0" * (-len(bits) % 8)
+    return bytes([n]) + int(bits, 2).to_bytes(len(bits) // 8, "big")
+
+
+def desempaquetar_qr(datos: bytes) -> list[list[bool]]:
+    n = datos[0]
+    bits = bin(int.from_bytes(datos[1:], "big"))[2:].zfill((len(datos) - 1) * 8)
+    return [[bits[fila * n + col] == "1" for col in range(n)] for fila in range(n)]
@@ -0,0 +1,406 @@
+"""Recursos estáticos compilados (CSS/JS minificados, con huella y precomprimidos).
+
+`python manage_assets.py build` genera en static/dist/:
+
+- <ruta>.<huella>.<ext>: el paquete minificado; la huella cambia con el
+  contenido, así que se sirve como inmutable con caché de un año.
+- Variantes .gz y .br del mismo archivo (si comprimen), que se entregan
+  según Accept-Encoding sin comprimir en cada petición.
+- manifest.json: ruta lógica -> ruta compilada.
+
+En las plantillas `url_recurso('css/styles.css')` reemplaza a
+`url_for('static', filename='css/styles.css')`. Sin compilar (p. ej. en
+desarrollo) retorna la URL del archivo original; para paquetes de varios
+archivos, `urls_recurso` retorna las de cada fuente.
+
+Las librerías de terceros se sirven desde static/vendor a versiones fijas
+(nada de CDNs ni @latest) y van dentro del paquete JS:
+
+- sweetalert2: `python manage_assets.py vendor` descarga la versión de
+  VENDOR desde el registro de npm. El tarball debe coincidir con la
+  integridad fijada en VENDOR (sha512 del registro) y cada archivo extraído
+  con su sha512; `build` rechaza un archivo vendorizado que no coincida.
+  `manage_assets.py vendor --fijar paquete@versión` obtiene esos valores.
+- lucide: `python manage_assets.py iconos` genera static/vendor/lucide/iconos.js
+  solo con los iconos que usan las plantillas y el JS (data-lucide="...").
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import re
+import tarfile
+import urllib.request
+from pathlib import Path
+from zipfile import ZipFile
+
+from flask import Blueprint, abort, current_app, request, send_file, url_for
+from werkzeug.security import safe_join
+
+try:  # Dependencias opcionales: solo las usa el build.
+    import rjsmin
+except ImportError:  # pragma: no cover
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:  # pragma: no cover
+    rcssmin = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:  # Fuente de los SVG de lucide (solo para `manage_assets.py iconos`).
+    import lucide as lucide_svg
+except ImportError:  # pragma: no cover
+    lucide_svg = None
+
+
+DIRECTORIO_DIST = "dist"
+MANIFIESTO = "manifest.json"
+
+# Paquetes: ruta lógica (la que usan las plantillas) -> archivos fuente en static/, en orden.
+PAQUETES: dict[str, tuple[str, ...]] = {
+    "css/styles.css": ("css/styles.css",),
+    "js/main.js": (
+        "vendor/sweetalert2/sweetalert2.all.min.js",
+        "js/main.js",
+        "vendor/lucide/iconos.js",
+    ),
+}
+
+# Librerías de npm vendorizadas: paquete -> (versión fija, integridad del tarball en el
+# registro, {archivo del tarball: (destino en static/, integridad del archivo)}).
+# Las integridades se obtienen con `manage_assets.py vendor --fijar paquete@versión`;
+# vacías, `vendor` y `build` se niegan a usar el paquete.
+VENDOR: dict[str, tuple[str, str, dict[str, tuple[str, str]]]] = {
+    "sweetalert2": (
+        "11.23.0",
+        "",
+        {"package/dist/sweetalert2.all.min.js": ("vendor/sweetalert2/sweetalert2.all.min.js", "")},
+    ),
+}
+REGISTRO_NPM = "https://registry.npmjs.org"
+
+ICONOS_LUCIDE = "vendor/lucide/iconos.js"
+_USO_ICONO = re.compile(r"""data-lucide=["']([a-z0-9-]+)["']""")
+
+UN_ANIO_S = 365 * 24 * 3600
+
+
+recursos = Blueprint("recursos", __name__)
+
+
+def _minificar(contenido: str, extension: str, fuente: str = "") -> str:
+    if fuente.endswith(f".min{extension}"):
+        return contenido
+    if extension == ".js" and rjsmin is not None:
+        return rjsmin.jsmin(contenido)
+    if extension == ".css" and rcssmin is not None:
+        return rcssmin.cssmin(contenido)
+    return contenido
+
+
+def _escribir(ruta: Path, data: bytes) -> None:
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ruta.with_name(ruta.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, ruta)
+
+
+def construir_recursos(static_dir: Path) -> dict[str, str]:
+    """Compila los paquetes de PAQUETES en static/dist y escribe el manifiesto.
+
+    Conserva los archivos de la compilación anterior (páginas ya servidas
+    pueden seguir pidiéndolos durante un despliegue) y borra los más viejos.
+    """
+    dist = static_dir / DIRECTORIO_DIST
+    anterior = leer_manifiesto(dist)
+
+    # Se valida todo antes de escribir: un build fallido no deja static/dist a medias.
+    faltantes = [f for fuentes in PAQUETES.values() for f in fuentes if not (static_dir / f).is_file()]
+    if faltantes:
+        raise FileNotFoundError(
+            f"Faltan fuentes: {', '.join(faltantes)} "
+            "(ejecute `manage_assets.py vendor` / `manage_assets.py iconos`)."
+        )
+    verificar_vendor(static_dir)
+
+    manifiesto: dict[str, str] = {}
+    for nombre, fuentes in PAQUETES.items():
+        base, extension = os.path.splitext(nombre)
+        # Cada fuente se minifica por separado (las .min ya vienen minificadas).
+        partes = [_minificar((static_dir / f).read_text(encoding="utf-8"), extension, f).strip() for f in fuentes]
+        # ";" entre scripts: un archivo sin punto y coma final no se pega al siguiente.
+        separador = "\n;\n" if extension == ".js" else "\n"
+        data = separador.join(partes).encode("utf-8") + b"\n"
+
+        huella = hashlib.sha256(data).hexdigest()[:12]
+        compilado = f"{base}.{huella}{extension}"
+        _escribir(dist / compilado, data)
+
+        comprimido = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(comprimido) < len(data):
+            _escribir(dist / f"{compilado}.gz", comprimido)
+        if brotli is not None:
+            comprimido = brotli.compress(data, quality=11)
+            if len(comprimido) < len(data):
+                _escribir(dist / f"{compilado}.br", comprimido)
+
+        manifiesto[nombre] = f"{DIRECTORIO_DIST}/{compilado}"
+
+    _escribir(dist / MANIFIESTO, (json.dumps(manifiesto, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+    _podar(dist, set(manifiesto.values()) | set(anterior.values()))
+    return manifiesto
+
+
+def _integridad(data: bytes, algoritmo: str = "sha512") -> str:
+    """Integridad en formato SRI/npm: "<algoritmo>-<digest en base64>"."""
+    return f"{algoritmo}-{base64.b64encode(hashlib.new(algoritmo, data).digest()).decode('ascii')}"
+
+
+def _tarball_npm(paquete: str, version: str) -> tuple[bytes, str]:
+    """Tarball de `paquete@version` y la integridad que publica el registro (ya comprobada)."""
+    with urllib.request.urlopen(f"{REGISTRO_NPM}/{paquete}/{version}", timeout=30) as r:
+        dist = json.load(r)["dist"]
+    with urllib.request.urlopen(dist["tarball"], timeout=60) as r:
+        tarball = r.read()
+
+    algoritmo = dist["integrity"].partition("-")[0]
+    if _integridad(tarball, algoritmo) != dist["integrity"]:
+        raise ValueError(f"La integridad de {paquete}@{version} no coincide con la del registro.")
+    return tarball, dist["integrity"]
+
+
+def fijar_vendor(paquete: str, version: str) -> tuple[str, str, dict[str, tuple[str, str]]]:
+    """Entrada de VENDOR para `paquete@version`, con las integridades tomadas del registro.
+
+    Usa los mismos archivos que la entrada actual del paquete.
+    """
+    tarball, integridad = _tarball_npm(paquete, version)
+    archivos: dict[str, tuple[str, str]] = {}
+    with tarfile.open(fileobj=io.BytesIO(tarball), mode="r:gz") as tar:
+        for origen, (destino, _) in VENDOR[paquete][2].items():
+            archivos[origen] = (destino, _integridad(tar.extractfile(origen).read()))
+    return version, integridad, archivos
+
+
+def descargar_vendor(static_dir: Path) -> dict[str, str]:
+    """Descarga las librerías de VENDOR a static/vendor (versión e integridades fijadas).
+
+    Retorna {paquete: versión}. No escribe nada si algún paquete no tiene
+    las integridades fijadas o si el tarball o un archivo no coinciden.
+    """
+    archivos_nuevos: dict[str, bytes] = {}
+    descargadas: dict[str, str] = {}
+    for paquete, (version, integridad, archivos) in VENDOR.items():
+        if not integridad or not all(esperada for _, esperada in archivos.values()):
+            raise ValueError(
+                f"{paquete}@{version} no tiene la integridad fijada en VENDOR "
+                f"(ejecute `manage_assets.py vendor --fijar {paquete}@{version}`)."
+            )
+        tarball, publicada = _tarball_npm(paquete, version)
+        if publicada != integridad:
+            raise ValueError(f"El registro publica otra integridad para {paquete}@{version} que la fijada en VENDOR.")
+
+        with tarfile.open(fileobj=io.BytesIO(tarball), mode="r:gz") as tar:
+            for origen, (destino, esperada) in archivos.items():
+                data = tar.extractfile(origen).read()
+                if _integridad(data) != esperada:
+                    raise ValueError(f"{origen} de {paquete}@{version} no coincide con la integridad fijada.")
+                archivos_nuevos[destino] = data
+        descargadas[paquete] = version
+
+    for destino, data in archivos_nuevos.items():
+        _escribir(static_dir / destino, data)
+    return descargadas
+
+
+def verificar_vendor(static_dir: Path) -> None:
+    """Comprueba los archivos vendorizados contra las integridades de VENDOR.
+
+    Lanza ValueError si alguno no tiene integridad fijada, falta o no coincide.
+    """
+    errores = []
+    for paquete, (version, _, archivos) in VENDOR.items():
+        for destino, esperada in archivos.values():
+            ruta = static_dir / destino
+            if not esperada:
+                errores.append(f"{destino}: {paquete}@{version} sin integridad fijada")
+            elif not ruta.is_file():
+                errores.append(f"{destino}: falta")
+            elif _integridad(ruta.read_bytes()) != esperada:
+                errores.append(f"{destino}: no coincide con {paquete}@{version}")
+    if errores:
+        raise ValueError(
+            "Archivos vendorizados no verificados: " + "; ".join(errores)
+            + " (ejecute `manage_assets.py vendor`; para fijar una versión, `vendor --fijar paquete@versión`)."
+        )
+
+
+def iconos_usados(*directorios: Path) -> list[str]:
+    """Nombres de iconos lucide usados (data-lucide) en plantillas y JS propios."""
+    nombres: set[str] = set()
+    for directorio in directorios:
+        for ruta in directorio.rglob("*"):
+            partes = ruta.relative_to(directorio).parts
+            if ruta.suffix not in (".html", ".js") or DIRECTORIO_DIST in partes or "vendor" in partes:
+                continue
+            nombres.update(_USO_ICONO.findall(ruta.read_text(encoding="utf-8")))
+    return sorted(nombres)
+
+
+def generar_iconos_lucide(static_dir: Path, templates_dir: Path) -> list[str]:
+    """Genera ICONOS_LUCIDE solo con los iconos usados. Retorna sus nombres.
+
+    Expone `window.lucide.createIcons()` como la librería original: reemplaza
+    cada `<i data-lucide="nombre">` por su SVG, conservando sus atributos.
+    """
+    if lucide_svg is None:
+        raise RuntimeError("Generar los iconos requiere instalar el paquete lucide (ver requirements.txt).")
+
+    nombres = iconos_usados(templates_dir, static_dir)
+    iconos: dict[str, str] = {}
+    with ZipFile(Path(lucide_svg.__file__).with_name("lucide.zip")) as zip_svg:
+        disponibles = set(zip_svg.namelist())
+        faltantes = [n for n in nombres if f"{n}.svg" not in disponibles]
+        if faltantes:
+            raise ValueError(f"Iconos inexistentes en lucide: {', '.join(faltantes)}.")
+        for nombre in nombres:
+            svg = zip_svg.read(f"{nombre}.svg").decode("utf-8")
+            cuerpo = svg[svg.index(">") + 1 : svg.rindex("</svg>")]
+            iconos[nombre] = " ".join(cuerpo.split()).replace("> <", "><")
+
+    version = getattr(lucide_svg, "__version__", None) or _version_distribucion("lucide")
+    js = _PLANTILLA_ICONOS.replace("__VERSION__", version).replace(
+        "__ICONOS__", json.dumps(iconos, indent=2, sort_keys=True)
+    )
+    _escribir(static_dir / ICONOS_LUCIDE, js.encode("utf-8"))
+    return nombres
+
+
+def _version_distribucion(nombre: str) -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version(nombre)
+    except PackageNotFoundError:  # pragma: no cover
+        return "?"
+
+
+_PLANTILLA_ICONOS = """/*! Iconos Lucide (https://lucide.dev, licencia ISC), paquete lucide __VERSION__.
+ * Solo los iconos usados; generado por `python manage_assets.py iconos`, no editar. */
+(function () {
+  var ICONOS = __ICONOS__;
+  var ATRIBUTOS = {
+    xmlns: 'http://www.w3.org/2000/svg', width: '24', height: '24', viewBox: '0 0 24 24', fill: 'none',
+    stroke: 'currentColor', 'stroke-width': '2', 'stroke-linecap': 'round', 'stroke-linejoin': 'round'
+  };
+
+  function createIcons() {
+    document.querySelectorAll('i[data-lucide]').forEach(function (el) {
+      var nombre = el.getAttribute('data-lucide');
+      if (!Object.prototype.hasOwnProperty.call(ICONOS, nombre)) return;
+      var svg = document.createElementNS(ATRIBUTOS.xmlns, 'svg');
+      Object.keys(ATRIBUTOS).forEach(function (k) { svg.setAttribute(k, ATRIBUTOS[k]); });
+      Array.prototype.forEach.call(el.attributes, function (a) { svg.setAttribute(a.name, a.value); });
+      svg.setAttribute('class', ('lucide lucide-' + nombre + ' ' + (el.getAttribute('class') || '')).trim());
+      svg.innerHTML = ICONOS[nombre];
+      el.parentNode.replaceChild(svg, el);
+    });
+  }
+
+  window.lucide = { createIcons: createIcons, icons: ICONOS };
+})();
+"""
+
+
+def limpiar_recursos(static_dir: Path) -> int:
+    """Elimina static/dist (se vuelve a servir los archivos originales). Retorna cuántos archivos se borraron."""
+    dist = static_dir / DIRECTORIO_DIST
+    if not dist.is_dir():
+        return 0
+    borrados = 0
+    for ruta in sorted(dist.rglob("*"), reverse=True):
+        if ruta.is_dir():
+            ruta.rmdir()
+        else:
+            ruta.unlink()
+            borrados += 1
+    dist.rmdir()
+    return borrados
+
+
+def _podar(dist: Path, vigentes: set[str]) -> None:
+    conservar = {Path(v).relative_to(DIRECTORIO_DIST).as_posix() for v in vigentes}
+    for ruta in dist.rglob("*"):
+        if not ruta.is_file() or ruta.name == MANIFIESTO:
+            continue
+        relativa = ruta.relative_to(dist).as_posix()
+        original = relativa.removesuffix(".gz").removesuffix(".br")
+        if original not in conservar:
+            ruta.unlink()
+
+
+def leer_manifiesto(dist: Path) -> dict[str, str]:
+    try:
+        return json.loads((dist / MANIFIESTO).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _manifiesto() -> dict[str, str]:
+    """Manifiesto de la app actual (se lee una vez por proceso)."""
+    manifiesto = current_app.extensions.get("manifiesto_recursos")
+    if manifiesto is None:
+        dist = Path(current_app.static_folder) / DIRECTORIO_DIST
+        manifiesto = current_app.extensions.setdefault("manifiesto_recursos", leer_manifiesto(dist))
+    return manifiesto
+
+
+def url_recurso(filename: str, **values) -> str:
+    """Como url_for('static', filename=...), pero con el nombre compilado si existe."""
+    return url_for("static", filename=_manifiesto().get(filename, filename), **values)
+
+
+def urls_recurso(filename: str) -> list[str]:
+    """URLs para incluir el paquete `filename`: la compilada, o sin compilar las de cada fuente existente."""
+    compilado = _manifiesto().get(filename)
+    if compilado is not None:
+        return [url_for("static", filename=compilado)]
+    fuentes = PAQUETES.get(filename, (filename,))
+    return [url_for("static", filename=f) for f in fuentes if os.path.isfile(os.path.join(current_app.static_folder, f))]
+
+
+@recursos.get(f"/static/{DIRECTORIO_DIST}/<path:filename>")
+def recurso_compilado(filename: str):
+    """Archivo compilado, precomprimido según Accept-Encoding e inmutable.
+
+    Detrás de nginx conviene servir /static directamente (gzip_static /
+    brotli_static); esta ruta cubre el despliegue sin servidor web delante.
+    """
+    ruta = safe_join(os.path.join(current_app.static_folder, DIRECTORIO_DIST), filename)
+    if ruta is None or not os.path.isfile(ruta) or filename == MANIFIESTO:
+        abort(404)
+
+    codificacion = None
+    for nombre, extension in (("br", ".br"), ("gzip", ".gz")):
+        if nombre in request.accept_encodings and os.path.isfile(ruta + extension):
+            codificacion, ruta = nombre, ruta + extension
+            break
+
+    resp = send_file(ruta, mimetype=mimetypes.guess_type(filename)[0], conditional=True, max_age=UN_ANIO_S)
+    if codificacion is not None:
+        resp.headers["Content-Encoding"] = codificacion
+    resp.vary.add("Accept-Encoding")
+    resp.cache_control.public = True
+    resp.cache_control.immutable = True
+    return resp
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from flask import current_app
+
+from backend.servicio_render import TiempoRenderAgotado, presupuesto_render_s
+
+try:  # fcntl solo existe en POSIX; en Windows se coordina solo entre hilos.
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+class _Vuelo:
+    """Render en curso: los demás interesados esperan su resultado."""
+
+    __slots__ = ("evento", "resultado", "error")
+
+    def __init__(self) -> None:
+        self.evento = threading.Event()
+        self.resultado: bytes | None = None
+        self.error: BaseException | None = None
+
+
+_vuelos: dict[tuple, _Vuelo] = {}
+_vuelos_lock = threading.Lock()
+_ultimo_barrido = 0.0
+
+
+def una_sola_vez(clave: tuple, render: Callable[[], bytes]) -> bytes:
+    """Ejecuta `render` una sola vez por `clave` entre peticiones concurrentes.
+
+    - Entre hilos del mismo proceso: el primero renderiza y los que llegan
+      mientras tanto reciben los mismos bytes (o el mismo error).
+    - Entre procesos (RENDER_COMPARTIDO_ENTRE_PROCESOS): el render se hace con
+      un lock de archivo tomado y el resultado se deja unos segundos en disco
+      (RENDER_COMPARTIDO_TTL_SECONDS) para los workers que esperaban el lock.
+    """
+    with _vuelos_lock:
+        vuelo = _vuelos.get(clave)
+        lider = vuelo is None
+        if lider:
+            vuelo = _vuelos[clave] = _Vuelo()
+
+    if not lider:
+        # Quien espera no aguarda más que el presupuesto de un render.
+        if not vuelo.evento.wait(presupuesto_render_s()):
+            raise TiempoRenderAgotado("Tiempo de espera del render agotado")
+        if vuelo.error is not None:
+            raise vuelo.error
+        return vuelo.resultado
+
+    try:
+        vuelo.resultado = _entre_procesos(clave, render)
+        return vuelo.resultado
+    except BaseException as e:
+        vuelo.error = e
+        raise
+    finally:
+        with _vuelos_lock:
+            _vuelos.pop(clave, None)
+        vuelo.evento.set()
+
+
+def _entre_procesos(clave: tuple, render: Callable[[], bytes]) -> bytes:
+    cfg = current_app.config
+    if fcntl is None or not cfg.get("RENDER_COMPARTIDO_ENTRE_PROCESOS"):
+        return render()
+
+    ttl = float(cfg.get("RENDER_COMPARTIDO_TTL_SECONDS") or 0)
+    directorio = Path(cfg.get("CERTIFICADOS_DIR") or "generated") / ".en_vuelo"
+    directorio.mkdir(parents=True, exist_ok=True)
+    nombre = hashlib.sha256(repr(clave).encode("utf-8")).hexdigest()
+    resultado = directorio / f"{nombre}.pdf"
+
+    with open(directorio / f"{nombre}.lock", "a+b") as lock:
+        _tomar_lock(lock, presupuesto_render_s())
+        try:
+            data = _leer_reciente(resultado, ttl)
+            if data is not None:
+                return data
+            data = render()
+            if ttl > 0:
+                tmp = directorio / f"{nombre}.{os.getpid()}.{threading.get_ident()}.tmp"
+                tmp.write_bytes(data)
+                os.replace(tmp, resultado)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+    _barrer(directorio, ttl)
+    return data
+
+
+def _tomar_lock(lock, timeout_s: float | None) -> None:
+    """flock exclusivo, esperando como máximo `timeout_s` (otro worker renderizando)."""
+    limite = None if timeout_s is None else time.monotonic() + timeout_s
+    while True:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return
+        except BlockingIOError:
+            if limite is not None and time.monotonic() >= limite:
+                raise TiempoRenderAgotado("Tiempo de espera del render agotado") from None
+            time.sleep(0.02)
+
+
+def _leer_reciente(ruta: Path, ttl: float) -> bytes | None:
+    try:
+        if ttl <= 0 or time.time() - ruta.stat().st_mtime > ttl:
+            return None
+        return ruta.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _barrer(directorio: Path, ttl: float) -> None:
+    """Elimina resultados y locks vencidos (a lo sumo una vez por minuto por proceso).
+
+    Borrar un lock que otro proceso acaba de abrir solo puede provocar un
+    render duplicado, nunca un resultado incorrecto.
+    """
+    global _ultimo_barrido
+    ahora = time.time()
+    if ahora - _ultimo_barrido < 60:
+        return
+    _ultimo_barrido = ahora
+
+    limite = ahora - max(ttl, 60)
+    for ruta in directorio.iterdir():
+        try:
+            if ruta.stat().st_mtime < limite:
+                ruta.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+from flask import Response, current_app, request
+
+from backend.condicional import aplicar_validadores
+
+
+def etag_pdf(pdf_bytes: bytes) -> str:
+    """ETag fuerte a partir del contenido (el render es determinista)."""
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def respuesta_render_no_disponible():
+    """503 rápido cuando no hay cupo o tiempo para generar el PDF (ver LimitadorRender)."""
+    retry_after = int(current_app.config.get("PDF_RETRY_AFTER_SECONDS") or 5)
+    return (
+        "El servicio de certificados está ocupado. Intente de nuevo en unos segundos.",
+        503,
+        {"Retry-After": str(retry_after), "Cache-Control": "no-store"},
+    )
+
+
+def respuesta_pdf(
+    pdf_bytes: bytes,
+    *,
+    download_name: str,
+    as_attachment: bool,
+    etag: str | None = None,
+    ultima_modificacion: datetime | None = None,
+) -> Response:
+    """Respuesta HTTP con el PDF, sin copias intermedias del documento.
+
+    El cuerpo es el mismo objeto `bytes` que entrega la caché o el render: no
+    se envuelve en BytesIO ni se relee por bloques como hace send_file. Se
+    conserva lo que aportaba send_file: ETag, 304 condicional y rangos.
+
+    Si la ruta ya calculó sus validadores desde los metadatos (ver
+    backend/condicional.py) se usan esos; si no, el ETag es el hash del PDF.
+    """
+    resp = current_app.response_class([pdf_bytes], mimetype="application/pdf", direct_passthrough=True)
+    resp.content_length = len(pdf_bytes)
+    resp.headers.set("Content-Disposition", "attachment" if as_attachment else "inline", filename=download_name)
+    aplicar_validadores(resp, etag or etag_pdf(pdf_bytes), ultima_modificacion)
+    return resp.make_conditional(request, accept_ranges=True, complete_length=len(pdf_bytes))
+
+
+def respuesta_pdf_delegada(ruta: Path, *, download_name: str, as_attachment: bool) -> Response:
+    """Respuesta sin cuerpo: nginx (X-Accel-Redirect) o Apache (X-Sendfile) envían el archivo.
+
+    El servidor web se encarga del envío con sendfile, de los rangos y de la
+    revalidación (ETag/Last-Modified del archivo, que no cambia una vez escrito).
+    """
+    cfg = current_app.config
+    resp = current_app.response_class(mimetype="application/pdf")
+    resp.headers.set("Content-Disposition", "attachment" if as_attachment else "inline", filename=download_name)
+    resp.cache_control.no_cache = True
+
+    entrega = cfg.get("PDF_ENTREGA")
+    if entrega == "x-accel-redirect":
+        relativa = ruta.relative_to(Path(cfg.get("CERTIFICADOS_DIR") or "generated")).as_posix()
+        resp.headers["X-Accel-Redirect"] = f"{(cfg.get('PDF_ACCEL_PREFIJO') or '').rstrip('/')}/{relativa}"
+    elif entrega == "x-sendfile":
+        resp.headers["X-Sendfile"] = str(ruta.resolve())
+    else:
+        # config.py ya lo valida al arrancar; aquí solo si se cambió en app.config.
+        raise RuntimeError(f"PDF_ENTREGA={entrega!r} no es válido.")
+    return resp
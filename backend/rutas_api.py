@@ -11,6 +11,7 @@ from backend.certificados import (
     normalizar_texto_especial,
     validar_token_verificacion,
 )
+from backend.precalentado import precalentar_certificado
 from backend.verificacion_fecha_nacimiento import (
     clave_bloqueo,
     esta_bloqueado,
@@ -161,6 +162,8 @@ def api_generar_certificado():
     except Exception:
         return jsonify({"success": False, "message": "No se pudo generar el certificado."}), 500
 
+    precalentar_certificado(doc, ciudadano)
+
     return jsonify(
         {
             "success": True,
@@ -219,6 +222,8 @@ def api_admin_generar_certificado():
     except Exception:
         return jsonify({"success": False, "message": "No se pudo generar el certificado."}), 500
 
+    precalentar_certificado(doc, ciudadano)
+
     return jsonify(
         {
             "success": True,
@@ -360,6 +365,8 @@ def api_admin_generar_certificado_especial():
     except Exception:
         return jsonify({"success": False, "message": "No se pudo generar el certificado."}), 500
 
+    precalentar_certificado(doc, ciudadano)
+
     return jsonify(
         {
             "success": True,
@@ -1,18 +1,29 @@
 from __future__ import annotations
 
-import io
 from datetime import datetime
 
-from flask import Blueprint, abort, request, send_file
+from flask import Blueprint, abort
 
-from backend.pdf import generar_certificado_pdf_bytes
+from backend.cache_pdf import obtener_pdf_certificado, ruta_pdf_almacenado, validadores_certificado
+from backend.certificados import url_verificacion
+from backend.condicional import no_modificado
+from backend.filtro_codigos import codigo_puede_existir
+from backend.respuesta_pdf import respuesta_pdf, respuesta_pdf_delegada, respuesta_render_no_disponible
+from backend.servicio_render import ErrorRender
 from models import Ciudadano, DocumentoGenerado, db
 
 
 certificados = Blueprint("certificados", __name__, url_prefix="/certificados")
 
 
+@certificados.errorhandler(ErrorRender)
+def _render_no_disponible(e):
+    return respuesta_render_no_disponible()
+
+
 def _obtener_doc_o_404(codigo: str) -> DocumentoGenerado:
+    if not codigo_puede_existir(codigo):
+        abort(404)
     doc = DocumentoGenerado.query.filter_by(codigo=codigo).first()
     if not doc:
         abort(404)
@@ -27,27 +38,28 @@ def descargar_certificado(codigo: str):
     if not ciudadano:
         abort(404)
 
+    verify_url = url_verificacion(codigo)
+    etag, ultima = validadores_certificado(doc=doc, ciudadano=ciudadano, verify_url=verify_url)
+    # Una revalidación no es una descarga nueva: responde 304 sin contarla ni renderizar.
+    no_cambio = no_modificado(etag, ultima)
+    if no_cambio is not None:
+        return no_cambio
+
     doc.descargas = (doc.descargas or 0) + 1
     doc.descargado_en = datetime.utcnow()
     db.session.commit()
 
-    verify_url = f"{request.host_url.rstrip('/')}/verificar-certificados?codigo={codigo}"
-    pdf_bytes = generar_certificado_pdf_bytes(
-        ciudadano=ciudadano,
-        codigo=codigo,
-        verify_url=verify_url,
-        emitido_en_utc=doc.creado_en,
-        tipo_documento=getattr(doc, "tipo_documento", "certificado_afiliacion"),
-        texto_personalizado=getattr(doc, "texto_personalizado", None),
-    )
+    ruta = ruta_pdf_almacenado(doc=doc, ciudadano=ciudadano, verify_url=verify_url)
+    if ruta is not None:
+        return respuesta_pdf_delegada(ruta, download_name=f"certificado_{codigo}.pdf", as_attachment=True)
 
-    filename = f"certificado_{codigo}.pdf"
-    return send_file(
-        io.BytesIO(pdf_bytes),
+    pdf_bytes = obtener_pdf_certificado(doc=doc, ciudadano=ciudadano, verify_url=verify_url)
+    return respuesta_pdf(
+        pdf_bytes,
+        download_name=f"certificado_{codigo}.pdf",
         as_attachment=True,
-        download_name=filename,
-        mimetype="application/pdf",
-        conditional=True,
+        etag=etag,
+        ultima_modificacion=ultima,
     )
 
 @certificados.get("/ver/<codigo>")
@@ -59,21 +71,21 @@ def ver_certificado(codigo: str):
     if not ciudadano:
         abort(404)
 
-    verify_url = f"{request.host_url.rstrip('/')}/verificar-certificados?codigo={codigo}"
-    pdf_bytes = generar_certificado_pdf_bytes(
-        ciudadano=ciudadano,
-        codigo=codigo,
-        verify_url=verify_url,
-        emitido_en_utc=doc.creado_en,
-        tipo_documento=getattr(doc, "tipo_documento", "certificado_afiliacion"),
-        texto_personalizado=getattr(doc, "texto_personalizado", None),
-    )
+    verify_url = url_verificacion(codigo)
+    etag, ultima = validadores_certificado(doc=doc, ciudadano=ciudadano, verify_url=verify_url)
+    no_cambio = no_modificado(etag, ultima)
+    if no_cambio is not None:
+        return no_cambio
+
+    ruta = ruta_pdf_almacenado(doc=doc, ciudadano=ciudadano, verify_url=verify_url)
+    if ruta is not None:
+        return respuesta_pdf_delegada(ruta, download_name=f"certificado_{codigo}.pdf", as_attachment=False)
 
-    filename = f"certificado_{codigo}.pdf"
-    return send_file(
-        io.BytesIO(pdf_bytes),
+    pdf_bytes = obtener_pdf_certificado(doc=doc, ciudadano=ciudadano, verify_url=verify_url)
+    return respuesta_pdf(
+        pdf_bytes,
+        download_name=f"certificado_{codigo}.pdf",
         as_attachment=False,
-        download_name=filename,
-        mimetype="application/pdf",
-        conditional=True,
+        etag=etag,
+        ultima_modificacion=ultima,
     )
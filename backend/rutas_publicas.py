@@ -1,13 +1,19 @@
 from __future__ import annotations
 
-import io
 from datetime import datetime, timezone
 
 from zoneinfo import ZoneInfo
 
-from flask import Blueprint, current_app, redirect, render_template, request, send_file, url_for
+from flask import Blueprint, abort, current_app, redirect, render_template, request, url_for
 
-from backend.pdf import generar_copia_verificacion_pdf_bytes
+from backend.cache_paginas import PaginaCacheada, contexto_cacheable, html_para_peticion, obtener_cache_paginas
+from backend.cache_pdf import obtener_copia_verificacion, validadores_copia_verificacion
+from backend.certificados import url_verificacion
+from backend.condicional import aplicar_validadores, huella, no_modificado, ultima_modificacion, version_despliegue
+from backend.filtro_codigos import codigo_puede_existir
+from backend.respuesta_pdf import respuesta_pdf, respuesta_render_no_disponible
+from backend.servicio_render import ErrorRender
+from backend.vista_previa import alto_vista_previa, anchos_vista_previa, obtener_vista_previa, version_vista_previa
 
 from models import Ciudadano, DocumentoGenerado, db
 
@@ -15,6 +21,11 @@ from models import Ciudadano, DocumentoGenerado, db
 publico = Blueprint("publico", __name__)
 
 
+@publico.errorhandler(ErrorRender)
+def _render_no_disponible(e):
+    return respuesta_render_no_disponible()
+
+
 @publico.get("/validar/<codigo>")
 def validar_documento(codigo: str):
     """Compatibilidad para URLs antiguas del QR.
@@ -24,11 +35,23 @@ def validar_documento(codigo: str):
     return redirect(url_for("publico.verificar_certificados", codigo=codigo), code=302)
 
 
+@publico.get("/v/<codigo>")
+def verificar_corto(codigo: str):
+    """Ruta corta canónica del QR y del enlace impreso en el certificado.
+
+    Sirve la misma página de verificación sin redirección intermedia.
+    """
+    return _pagina_verificacion(codigo.strip())
+
+
 @publico.get("/verificar-certificados")
 def verificar_certificados():
     """Página para verificación manual y por enlace/QR."""
-    codigo = (request.args.get("codigo") or "").strip()
+    return _pagina_verificacion((request.args.get("codigo") or "").strip())
 
+
+def _pagina_verificacion(codigo: str):
+    """Renderiza la verificación de `codigo` (vacío: solo el formulario)."""
     if not codigo:
         return render_template(
             "verificar_certificados.html",
@@ -38,7 +61,27 @@ def verificar_certificados():
             show_loader=False,
         )
 
-    doc = DocumentoGenerado.query.filter_by(codigo=codigo).first()
+    cache = obtener_cache_paginas()
+    pagina = cache.get(codigo) if cache.activa else None
+    if pagina is None:
+        resultado = _construir_pagina_verificacion(codigo)
+        if not isinstance(resultado, PaginaCacheada):
+            return resultado
+        pagina = resultado
+
+    no_cambio = no_modificado(pagina.etag, pagina.ultima)
+    if no_cambio is not None:
+        return no_cambio
+    resp = current_app.make_response(html_para_peticion(pagina))
+    return aplicar_validadores(resp, pagina.etag, pagina.ultima)
+
+
+def _construir_pagina_verificacion(codigo: str):
+    """Consulta y renderiza la página de `codigo` y la deja en la micro-caché.
+
+    Retorna la PaginaCacheada, o una respuesta final (404 o 304 sin renderizar).
+    """
+    doc = DocumentoGenerado.query.filter_by(codigo=codigo).first() if codigo_puede_existir(codigo) else None
     if not doc:
         return render_template(
             "verificar_certificados.html",
@@ -68,7 +111,36 @@ def verificar_certificados():
     emitido_local = (doc.creado_en.replace(tzinfo=timezone.utc).astimezone(tz))
     emision_str = emitido_local.strftime('%d/%m/%Y %I:%M %p')
 
-    return render_template(
+    # La página depende solo de estos datos: si no cambiaron, 304 sin plantilla.
+    version = version_vista_previa(doc=doc, ciudadano=ciudadano, verify_url=url_verificacion(codigo))
+    etag = huella(
+        "pagina_verificacion",
+        codigo,
+        version,
+        bool(ciudadano.activo),
+        sorted(anchos_vista_previa()),
+        current_app.config.get("APP_TIMEZONE"),
+        version_despliegue(),
+    )
+    ultima = ultima_modificacion(doc.creado_en, ciudadano.actualizado_en or ciudadano.fecha_registro)
+    no_cambio = no_modificado(etag, ultima)
+    if no_cambio is not None:
+        return no_cambio
+
+    vista_previa = None
+    anchos = anchos_vista_previa()
+    if disponible and anchos:
+        urls = [
+            url_for("publico.vista_previa_verificacion", codigo=doc.codigo, version=version, ancho=a) for a in anchos
+        ]
+        vista_previa = {
+            "src": urls[0],
+            "srcset": ", ".join(f"{u} {i + 1}x" for i, u in enumerate(urls)),
+            "ancho": anchos[0],
+            "alto": alto_vista_previa(anchos[0]),
+        }
+
+    html = render_template(
         "verificar_certificados.html",
         active="verificar",
         codigo=codigo,
@@ -78,18 +150,25 @@ def verificar_certificados():
         ver_doc_disponible=disponible,
         ver_doc_url=f"/validar/{doc.codigo}/documento" if disponible else None,
         emision_str=emision_str,
+        vista_previa=vista_previa,
         show_loader=True,
+        **contexto_cacheable(),
     )
+    pagina = PaginaCacheada(html, etag, ultima)
+    obtener_cache_paginas().put(codigo, pagina, ciudadano_id=ciudadano.id)
+    return pagina
+
 
 
 @publico.get("/validar/<codigo>/documento")
 def ver_documento_verificacion(codigo: str):
     """Retorna una copia del certificado para verificación pública.
 
-    Esta copia se genera al momento de la consulta e incluye marca de verificación.
+    Esta copia se genera al momento de la consulta: se estampa la marca de
+    verificación sobre el certificado (tomado de caché o renderizado una vez).
     El registro se conserva en la base de datos para verificación cuando se requiera.
     """
-    doc = DocumentoGenerado.query.filter_by(codigo=codigo).first()
+    doc = DocumentoGenerado.query.filter_by(codigo=codigo).first() if codigo_puede_existir(codigo) else None
     if not doc:
         return render_template("verificacion_publica.html", found=False), 404
 
@@ -97,21 +176,57 @@ def ver_documento_verificacion(codigo: str):
     if not ciudadano:
         return render_template("verificacion_publica.html", found=False), 404
 
-    verify_url = f"{request.host_url.rstrip('/')}/verificar-certificados?codigo={codigo}"
-    pdf_bytes = generar_copia_verificacion_pdf_bytes(
+    verify_url = url_verificacion(codigo)
+    consultado_en = datetime.now()
+    # El sello lleva el minuto de la consulta: dentro del mismo minuto la copia no cambia.
+    etag, ultima = validadores_copia_verificacion(
+        doc=doc, ciudadano=ciudadano, verify_url=verify_url, consultado_en=consultado_en
+    )
+    no_cambio = no_modificado(etag, ultima)
+    if no_cambio is not None:
+        return no_cambio
+
+    pdf_bytes = obtener_copia_verificacion(
+        doc=doc,
         ciudadano=ciudadano,
-        codigo=codigo,
         verify_url=verify_url,
-        consultado_en=datetime.now(),
-        emitido_en_utc=doc.creado_en,
-        tipo_documento=getattr(doc, "tipo_documento", "certificado_afiliacion"),
-        texto_personalizado=getattr(doc, "texto_personalizado", None),
+        consultado_en=consultado_en,
     )
 
-    return send_file(
-        io.BytesIO(pdf_bytes),
-        mimetype="application/pdf",
-        as_attachment=False,
+    return respuesta_pdf(
+        pdf_bytes,
         download_name=f"verificacion_{codigo}.pdf",
-        conditional=True,
+        as_attachment=False,
+        etag=etag,
+        ultima_modificacion=ultima,
     )
+
+
+@publico.get("/validar/<codigo>/vista-previa/<version>/<int:ancho>.png")
+def vista_previa_verificacion(codigo: str, version: str, ancho: int):
+    """Imagen PNG del certificado para la página de verificación.
+
+    La URL incluye la huella del contenido, así que la respuesta es inmutable
+    y se cachea sin revalidar. Una huella vieja redirige a la vigente.
+    """
+    if ancho not in anchos_vista_previa() or not codigo_puede_existir(codigo):
+        abort(404)
+
+    doc = DocumentoGenerado.query.filter_by(codigo=codigo).first()
+    ciudadano = db.session.get(Ciudadano, doc.ciudadano_id) if doc else None
+    if not ciudadano:
+        abort(404)
+
+    verify_url = url_verificacion(codigo)
+    vigente = version_vista_previa(doc=doc, ciudadano=ciudadano, verify_url=verify_url)
+    if version != vigente:
+        return redirect(url_for("publico.vista_previa_verificacion", codigo=codigo, version=vigente, ancho=ancho))
+
+    png = obtener_vista_previa(doc=doc, ciudadano=ciudadano, verify_url=verify_url, ancho=ancho)
+    resp = current_app.response_class([png], mimetype="image/png", direct_passthrough=True)
+    resp.content_length = len(png)
+    resp.cache_control.public = True
+    resp.cache_control.max_age = 365 * 24 * 3600
+    resp.cache_control.immutable = True
+    resp.set_etag(vigente)
+    return resp.make_conditional(request)
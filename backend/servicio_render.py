@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturoTimeout
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+from typing import Iterator
+
+from flask import Flask, current_app
+
+from backend.pdf import configurar_reportlab, generar_certificado_pdf_bytes
+
+
+# Configuración que el render lee de current_app (se replica en cada worker).
+CLAVES_CONFIG_RENDER = (
+    "APP_TIMEZONE",
+    "CAPITAN_MENOR_NOMBRE",
+    "CAPITAN_MENOR_DOCUMENTO_TIPO",
+    "CAPITAN_MENOR_DOCUMENTO_NUMERO",
+    "CAPITAN_MENOR_FIRMA_RUTA",
+    "PDF_COMPACTO",
+    "PDF_MOTOR",
+)
+
+
+class ErrorRender(RuntimeError):
+    """El certificado no pudo renderizarse en el pool (la petición debe responder 503)."""
+
+
+class ColaRenderLlena(ErrorRender):
+    pass
+
+
+class TiempoRenderAgotado(ErrorRender):
+    pass
+
+
+class LimitadorRender:
+    """Cupos para el trabajo pesado de PDF (render, estampado, rasterizado) del proceso.
+
+    - Como mucho `concurrentes` trabajos a la vez; hasta `cola_max` peticiones
+      más esperan un cupo durante `espera_s` como máximo.
+    - Con la espera llena, o agotada, se lanza ColaRenderLlena y la petición
+      responde 503 de inmediato en lugar de encolarse detrás de ReportLab.
+    - Las respuestas desde caché no pasan por aquí, así que siguen saliendo
+      durante una ráfaga, igual que los endpoints livianos.
+    - concurrentes=0 desactiva el límite.
+    """
+
+    def __init__(self, *, concurrentes: int, cola_max: int, espera_s: float) -> None:
+        self.concurrentes = max(0, int(concurrentes))
+        self.cola_max = max(0, int(cola_max))
+        self.espera_s = max(0.0, float(espera_s))
+        self._cupos = threading.Semaphore(self.concurrentes)
+        self._lock = threading.Lock()
+        self._en_espera = 0
+        self.rechazos = 0
+
+    @contextmanager
+    def cupo(self) -> Iterator[None]:
+        if not self.concurrentes:
+            yield
+            return
+
+        if not self._cupos.acquire(blocking=False):
+            with self._lock:
+                if self._en_espera >= self.cola_max:
+                    self.rechazos += 1
+                    raise ColaRenderLlena("Demasiados PDFs en proceso")
+                self._en_espera += 1
+            try:
+                obtenido = self._cupos.acquire(timeout=self.espera_s)
+            finally:
+                with self._lock:
+                    self._en_espera -= 1
+            if not obtenido:
+                with self._lock:
+                    self.rechazos += 1
+                raise ColaRenderLlena("Sin cupo para generar el PDF")
+
+        try:
+            yield
+        finally:
+            self._cupos.release()
+
+
+def cupo_render():
+    """Context manager que reserva un cupo de LimitadorRender para la app actual."""
+    limitador = current_app.extensions.get("limitador_render")
+    if limitador is None:
+        cfg = current_app.config
+        limitador = current_app.extensions.setdefault(
+            "limitador_render",
+            LimitadorRender(
+                concurrentes=int(cfg.get("PDF_CONCURRENCIA_MAX") or 0),
+                cola_max=int(cfg.get("PDF_COLA_MAX") or 0),
+                espera_s=float(cfg.get("PDF_ESPERA_MAX_SECONDS") or 0),
+            ),
+        )
+    return limitador.cupo()
+
+
+def presupuesto_render_s() -> float | None:
+    """Tiempo máximo por render (RENDER_TIMEOUT_SECONDS); None si no hay límite."""
+    timeout = float(current_app.config.get("RENDER_TIMEOUT_SECONDS") or 0)
+    return timeout if timeout > 0 else None
+
+
+# --- Lado worker (proceso hijo) ---
+
+_app_worker: Flask | None = None
+
+
+def _iniciar_worker(root_path: str, cfg: dict) -> None:
+    """Crea una app mínima con la configuración del padre y deja su contexto activo."""
+    global _app_worker
+    _app_worker = Flask("cabildo_render", root_path=root_path)
+    _app_worker.config.update(cfg)
+    configurar_reportlab(_app_worker.config)
+    _app_worker.app_context().push()
+
+
+def _renderizar_en_worker(datos_ciudadano: dict, kwargs: dict) -> bytes:
+    return generar_certificado_pdf_bytes(ciudadano=SimpleNamespace(**datos_ciudadano), **kwargs)
+
+
+# --- Lado web ---
+
+
+class ServicioRender:
+    """Pool de procesos para el render de certificados.
+
+    - ReportLab es Python puro y retiene el GIL: renderizar en procesos aparte
+      evita que unas cuantas descargas bloqueen al resto de peticiones.
+    - La cola es acotada: con `workers + cola_max` trabajos en curso, los
+      nuevos se rechazan de inmediato (ColaRenderLlena).
+    - Cada trabajo tiene un tiempo máximo de espera (TiempoRenderAgotado); si
+      aún no había empezado, se cancela.
+    - Cada worker se recicla tras `max_trabajos` renders.
+    - Con workers=0 el render se hace en el hilo de la petición.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        cola_max: int,
+        timeout_s: float,
+        max_trabajos: int,
+        root_path: str,
+        cfg: dict,
+    ) -> None:
+        self.workers = max(0, int(workers))
+        self.timeout_s = float(timeout_s) if timeout_s and timeout_s > 0 else None
+        self.max_trabajos = max(0, int(max_trabajos))
+        self._root_path = root_path
+        self._cfg = cfg
+        self._cupos = threading.BoundedSemaphore(self.workers + max(0, int(cola_max))) if self.workers else None
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _obtener_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                kwargs = dict(
+                    max_workers=self.workers,
+                    initializer=_iniciar_worker,
+                    initargs=(self._root_path, self._cfg),
+                )
+                try:
+                    # max_tasks_per_child existe desde Python 3.11 (usa "spawn").
+                    self._pool = ProcessPoolExecutor(max_tasks_per_child=self.max_trabajos or None, **kwargs)
+                except TypeError:
+                    self._pool = ProcessPoolExecutor(**kwargs)
+            return self._pool
+
+    def _descartar_pool(self, pool: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def renderizar(self, *, ciudadano, **kwargs) -> bytes:
+        if not self.workers:
+            # En el hilo de la petición no se puede interrumpir el render: el
+            # presupuesto solo se vigila para dejarlo en el log.
+            t0 = time.monotonic()
+            data = generar_certificado_pdf_bytes(ciudadano=ciudadano, **kwargs)
+            duracion = time.monotonic() - t0
+            if self.timeout_s and duracion > self.timeout_s:
+                current_app.logger.warning(
+                    "Render de %s tardó %.1fs (presupuesto %.1fs)", kwargs.get("codigo"), duracion, self.timeout_s
+                )
+            return data
+
+        if not self._cupos.acquire(blocking=False):
+            raise ColaRenderLlena("Cola de render llena")
+
+        datos_ciudadano = {
+            "id": ciudadano.id,
+            "nombre_completo": ciudadano.nombre_completo,
+            "tipo_documento": ciudadano.tipo_documento,
+            "numero_documento": ciudadano.numero_documento,
+        }
+        pool = self._obtener_pool()
+        try:
+            futuro = pool.submit(_renderizar_en_worker, datos_ciudadano, kwargs)
+        except BrokenProcessPool as e:
+            self._cupos.release()
+            self._descartar_pool(pool)
+            raise ErrorRender("Pool de render caído") from e
+        except BaseException:
+            self._cupos.release()
+            raise
+        futuro.add_done_callback(lambda _f: self._cupos.release())
+
+        try:
+            return futuro.result(timeout=self.timeout_s)
+        except FuturoTimeout as e:
+            futuro.cancel()
+            raise TiempoRenderAgotado("Tiempo de render agotado") from e
+        except BrokenProcessPool as e:
+            self._descartar_pool(pool)
+            raise ErrorRender("Pool de render caído") from e
+
+    def cerrar(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def obtener_servicio() -> ServicioRender:
+    """Servicio de render de la app actual (el pool se levanta al primer render)."""
+    servicio = current_app.extensions.get("servicio_render")
+    if servicio is None:
+        cfg = current_app.config
+        servicio = current_app.extensions.setdefault(
+            "servicio_render",
+            ServicioRender(
+                workers=int(cfg.get("RENDER_WORKERS") or 0),
+                cola_max=int(cfg.get("RENDER_COLA_MAX") or 0),
+                timeout_s=float(cfg.get("RENDER_TIMEOUT_SECONDS") or 0),
+                max_trabajos=int(cfg.get("RENDER_MAX_TRABAJOS_POR_WORKER") or 0),
+                root_path=current_app.root_path,
+                cfg={k: cfg.get(k) for k in CLAVES_CONFIG_RENDER},
+            ),
+        )
+    return servicio
+
+
+def renderizar_certificado(
+    *,
+    ciudadano,
+    codigo: str,
+    verify_url: str,
+    emitido_en_utc: datetime,
+    tipo_documento: str = "certificado_afiliacion",
+    texto_personalizado: str | None = None,
+    qr_matriz: bytes | None = None,
+    plantilla_version: int = 1,
+    plantilla_definicion: dict | None = None,
+) -> bytes:
+    """Renderiza el certificado mediante el servicio de render configurado."""
+    with cupo_render():
+        return obtener_servicio().renderizar(
+            ciudadano=ciudadano,
+            codigo=codigo,
+            verify_url=verify_url,
+            emitido_en_utc=emitido_en_utc,
+            tipo_documento=tipo_documento,
+            texto_personalizado=texto_personalizado,
+            qr_matriz=qr_matriz,
+            plantilla_version=plantilla_version,
+            plantilla_definicion=plantilla_definicion,
+        )
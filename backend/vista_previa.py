@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import hashlib
+import io
+
+from flask import current_app
+
+from backend.cache_pdf import clave_certificado, obtener_cache_vista_previa, obtener_pdf_certificado
+from backend.render_unico import una_sola_vez
+from backend.servicio_render import cupo_render
+
+try:  # Dependencia opcional: sin ella la página solo ofrece el PDF.
+    import pypdfium2 as pdfium
+except ImportError:  # pragma: no cover
+    pdfium = None
+
+
+# Proporción de la hoja carta (8.5 x 11 in).
+_PROPORCION_CARTA = 11 / 8.5
+
+
+def anchos_vista_previa() -> tuple[int, ...]:
+    """Anchos servidos (1x y 2x para pantallas densas). Vacío si está desactivada."""
+    ancho = int(current_app.config.get("VISTA_PREVIA_ANCHO") or 0)
+    if pdfium is None or ancho <= 0:
+        return ()
+    return (ancho, ancho * 2)
+
+
+def alto_vista_previa(ancho: int) -> int:
+    return round(ancho * _PROPORCION_CARTA)
+
+
+def version_vista_previa(*, doc, ciudadano, verify_url: str) -> str:
+    """Huella del contenido: cambia si cambia cualquier dato que afecte al certificado."""
+    clave = clave_certificado(doc=doc, ciudadano=ciudadano, verify_url=verify_url)
+    return hashlib.sha256(repr(clave).encode("utf-8")).hexdigest()[:16]
+
+
+def rasterizar_pdf(pdf_bytes: bytes, *, ancho: int) -> bytes:
+    """PNG de la primera página con `ancho` píxeles, en paleta de 64 colores."""
+    documento = pdfium.PdfDocument(pdf_bytes)
+    try:
+        pagina = documento[0]
+        imagen = pagina.render(scale=ancho / pagina.get_width()).to_pil()
+    finally:
+        documento.close()
+
+    out = io.BytesIO()
+    imagen.convert("RGB").quantize(colors=64).save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+def obtener_vista_previa(*, doc, ciudadano, verify_url: str, ancho: int) -> bytes:
+    """Vista previa PNG del certificado: se rasteriza una vez por código y ancho."""
+    cache = obtener_cache_vista_previa()
+    clave = ("vista_previa", clave_certificado(doc=doc, ciudadano=ciudadano, verify_url=verify_url), ancho)
+
+    png = cache.get(clave)
+    if png is not None:
+        return png
+
+    def _rasterizar() -> bytes:
+        pdf_bytes = obtener_pdf_certificado(doc=doc, ciudadano=ciudadano, verify_url=verify_url)
+        with cupo_render():
+            return rasterizar_pdf(pdf_bytes, ancho=ancho)
+
+    png = una_sola_vez(clave, _rasterizar)
+    cache.put(clave, png, ciudadano_id=ciudadano.id)
+    return png
@@ -0,0 +1,91 @@
+"""CREADO PARA USARSE DURANTE EL DESARROLLO DE LA APLICACIÓN
+
+Benchmark del render de certificados PDF por motor.
+
+Compara el motor de coordenadas fijas (`canvas`) contra el de flujo
+(`platypus`), con y sin modo compacto (PDF_COMPACTO), generando el mismo
+certificado N veces en cada combinación. Reporta tiempo y tamaño del PDF.
+No toca la BD: usa la configuración del proyecto y un titular de ejemplo.
+
+EJEMPLOS RAPIDOS:
+  python bench_pdf.py
+  python bench_pdf.py --n 100
+  python bench_pdf.py --texto-largo      # fuerza el fallback a platypus
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from dotenv import load_dotenv
+
+
+def _app_minima():
+    """App Flask con la configuración del proyecto, sin BD ni blueprints."""
+    load_dotenv(override=False)
+    from flask import Flask
+
+    import config
+
+    app = Flask(__name__)
+    app.config.from_object(config)
+    return app
+
+
+def _medir(app, motor: str, compacto: bool, n: int, kwargs: dict) -> tuple[float, int]:
+    from backend.pdf import configurar_reportlab, generar_certificado_pdf_bytes
+
+    app.config["PDF_MOTOR"] = motor
+    app.config["PDF_COMPACTO"] = compacto
+    # Un solo hilo: aquí sí se puede cambiar el ajuste global entre mediciones.
+    configurar_reportlab(app.config)
+    with app.app_context():
+        # Calentamiento: plantilla, firma y fuentes quedan cargadas.
+        data = generar_certificado_pdf_bytes(**kwargs)
+        t0 = time.perf_counter()
+        for _ in range(n):
+            data = generar_certificado_pdf_bytes(**kwargs)
+        ms = (time.perf_counter() - t0) * 1000 / n
+    return ms, len(data)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del render de certificados PDF")
+    parser.add_argument("--n", type=int, default=30, help="Renders por motor (default: 30)")
+    parser.add_argument("--texto-largo", action="store_true", help="Certificado especial que no cabe en una página")
+    args = parser.parse_args(argv)
+
+    from backend.certificados import url_verificacion
+
+    ciudadano = SimpleNamespace(
+        id=1,
+        nombre_completo="María José Pérez Altamiranda",
+        tipo_documento="CC",
+        numero_documento="1102858449",
+    )
+    codigo = "CIP202603051702001234"
+    kwargs = dict(
+        ciudadano=ciudadano,
+        codigo=codigo,
+        verify_url=url_verificacion(codigo, base_url="http://localhost:5000"),
+        emitido_en_utc=datetime(2026, 3, 5, 17, 2),
+    )
+    if args.texto_largo:
+        kwargs["tipo_documento"] = "certificado_especial"
+        kwargs["texto_personalizado"] = "hace parte activa de la comunidad y sus actividades culturales " * 20
+
+    app = _app_minima()
+    for motor in ("platypus", "canvas"):
+        for compacto in (False, True):
+            ms, size = _medir(app, motor, compacto, max(1, args.n), kwargs)
+            modo = "compacto" if compacto else "normal"
+            print(f"{motor:<9} {modo:<9} {ms:8.2f} ms/render  {size:7d} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -105,6 +105,74 @@ CERT_FILE_RETENTION_HOURS = int(os.getenv("CERT_FILE_RETENTION_HOURS") or "24")
 # Ejemplos: 30, 180 (6 meses aprox.)
 VERIFY_DOC_RETENTION_DAYS = int(os.getenv("VERIFY_DOC_RETENTION_DAYS") or "30")
 
+# Almacén en disco de PDFs renderizados:
+# CERTIFICADOS_DIR/pdf/<versión del render>/ab/cd/<huella>.pdf, con escritura
+# atómica y retención de CERT_FILE_RETENTION_HOURS (los de renders anteriores se
+# retiran a los pocos minutos).
+PDF_ALMACEN_DISCO = _as_bool(os.getenv("PDF_ALMACEN_DISCO"), default=False)
+# Entrega del archivo por el servidor web (requiere PDF_ALMACEN_DISCO):
+#   ""                 -> Python envía los bytes (por defecto)
+#   "x-accel-redirect" -> nginx; PDF_ACCEL_PREFIJO es una location `internal`
+#                         con `alias` a CERTIFICADOS_DIR
+#   "x-sendfile"       -> Apache con mod_xsendfile
+PDF_ENTREGA = (os.getenv("PDF_ENTREGA") or "").strip().lower()
+if PDF_ENTREGA not in {"", "x-accel-redirect", "x-sendfile"}:
+    raise RuntimeError(f"PDF_ENTREGA={PDF_ENTREGA!r} no es válido: use x-accel-redirect, x-sendfile o déjelo vacío.")
+PDF_ACCEL_PREFIJO = os.getenv("PDF_ACCEL_PREFIJO") or "/_certificados"
+
+# Caché en memoria de PDFs ya renderizados (bytes por proceso). 0 desactiva.
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES") or str(32 * 1024 * 1024))
+
+# Vista previa PNG en la página de verificación (requiere pypdfium2).
+# Ancho en píxeles de la imagen 1x (también se sirve 2x); 0 la desactiva.
+VISTA_PREVIA_ANCHO = int(os.getenv("VISTA_PREVIA_ANCHO") or "480")
+VISTA_PREVIA_CACHE_MAX_BYTES = int(os.getenv("VISTA_PREVIA_CACHE_MAX_BYTES") or str(8 * 1024 * 1024))
+
+# Micro-caché (por proceso) del HTML de la página de verificación por código.
+# Los cambios del Admin la invalidan en el proceso que los atiende; en los
+# demás workers la página vieja dura como máximo estos segundos. 0 desactiva.
+PAGINA_VERIFICACION_CACHE_SECONDS = float(os.getenv("PAGINA_VERIFICACION_CACHE_SECONDS") or "30")
+PAGINA_VERIFICACION_CACHE_MAX = int(os.getenv("PAGINA_VERIFICACION_CACHE_MAX") or "1000")
+
+# Rechazo rápido de códigos inexistentes (formato + filtro de Bloom en memoria)
+# sin consultar la BD. Los códigos con fecha posterior a la última recarga del
+# filtro (menos el margen) siempre se consultan: pueden venir de otro worker.
+FILTRO_CODIGOS = _as_bool(os.getenv("FILTRO_CODIGOS"), default=True)
+FILTRO_CODIGOS_RECARGA_SECONDS = float(os.getenv("FILTRO_CODIGOS_RECARGA_SECONDS") or "60")
+FILTRO_CODIGOS_MARGEN_SECONDS = float(os.getenv("FILTRO_CODIGOS_MARGEN_SECONDS") or "120")
+
+# Motor de render del certificado: "canvas" (coordenadas fijas) o "platypus".
+# Con "canvas", los textos que no caben en la hoja se renderizan con platypus.
+PDF_MOTOR = (os.getenv("PDF_MOTOR") or "canvas").strip().lower()
+
+# PDFs compactos: streams binarios (sin ASCII85).
+PDF_COMPACTO = _as_bool(os.getenv("PDF_COMPACTO"), default=True)
+
+# Pool de procesos para renderizar PDFs fuera de los hilos web.
+# 0 workers = render en el hilo de la petición (por defecto en desarrollo).
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS") or ("2" if IS_PRODUCTION else "0"))
+# Trabajos en espera además de los que ya se ejecutan; al superarlo se responde 503.
+RENDER_COLA_MAX = int(os.getenv("RENDER_COLA_MAX") or "8")
+RENDER_TIMEOUT_SECONDS = float(os.getenv("RENDER_TIMEOUT_SECONDS") or "20")
+# Cada worker se reemplaza tras N renders (0 = nunca).
+RENDER_MAX_TRABAJOS_POR_WORKER = int(os.getenv("RENDER_MAX_TRABAJOS_POR_WORKER") or "200")
+# Límite de PDFs generándose a la vez por proceso (render, sello, vista previa).
+# Hasta PDF_COLA_MAX peticiones más esperan cupo PDF_ESPERA_MAX_SECONDS; el resto
+# recibe 503 con Retry-After. RENDER_TIMEOUT_SECONDS es el presupuesto por render.
+PDF_CONCURRENCIA_MAX = int(os.getenv("PDF_CONCURRENCIA_MAX") or str(max(RENDER_WORKERS, 2)))
+PDF_COLA_MAX = int(os.getenv("PDF_COLA_MAX") or "8")
+PDF_ESPERA_MAX_SECONDS = float(os.getenv("PDF_ESPERA_MAX_SECONDS") or "3")
+PDF_RETRY_AFTER_SECONDS = int(os.getenv("PDF_RETRY_AFTER_SECONDS") or "5")
+# Peticiones simultáneas del mismo certificado comparten un solo render. Entre
+# workers se coordinan con un lock de archivo en CERTIFICADOS_DIR/.en_vuelo y el
+# resultado queda ahí N segundos para quienes esperaban (0 = no se comparte).
+RENDER_COMPARTIDO_ENTRE_PROCESOS = _as_bool(os.getenv("RENDER_COMPARTIDO_ENTRE_PROCESOS"), default=True)
+RENDER_COMPARTIDO_TTL_SECONDS = float(os.getenv("RENDER_COMPARTIDO_TTL_SECONDS") or "30")
+# Render en segundo plano de cada certificado recién emitido, para que la
+# descarga que sigue salga de caché. Cola máxima de certificados pendientes.
+PRECALENTAR_CERTIFICADOS = _as_bool(os.getenv("PRECALENTAR_CERTIFICADOS"), default=True)
+PRECALENTADO_COLA_MAX = int(os.getenv("PRECALENTADO_COLA_MAX") or "16")
+
 # Token firmado tras verificación (habilita la generación)
 VERIFY_TOKEN_MAX_AGE_SECONDS = int(os.getenv("VERIFY_TOKEN_MAX_AGE_SECONDS") or "300")
 
@@ -114,6 +182,16 @@ CAPITAN_MENOR_NOMBRE = os.getenv("CAPITAN_MENOR_NOMBRE") or "DIOMEDES FARID MONT
 CAPITAN_MENOR_DOCUMENTO_TIPO = os.getenv("CAPITAN_MENOR_DOCUMENTO_TIPO") or "CC"
 CAPITAN_MENOR_DOCUMENTO_NUMERO = os.getenv("CAPITAN_MENOR_DOCUMENTO_NUMERO") or ""
 
+# --- Firma digital del PDF (opcional, requiere pyHanko) ---
+# Cada certificado se firma una sola vez, en su primer render; el PDF firmado
+# se guarda en la BD y es el que se entrega desde entonces.
+PDF_FIRMA_DIGITAL = _as_bool(os.getenv("PDF_FIRMA_DIGITAL"), default=False)
+PDF_FIRMA_LLAVE = os.getenv("PDF_FIRMA_LLAVE") or ""  # llave privada PEM
+PDF_FIRMA_CERTIFICADO = os.getenv("PDF_FIRMA_CERTIFICADO") or ""  # certificado PEM
+PDF_FIRMA_LLAVE_CLAVE = os.getenv("PDF_FIRMA_LLAVE_CLAVE") or ""  # contraseña de la llave (si tiene)
+PDF_FIRMA_RAZON = os.getenv("PDF_FIRMA_RAZON") or "Certificado emitido por el Cabildo Menor Indígena de la Peñata"
+PDF_FIRMA_UBICACION = os.getenv("PDF_FIRMA_UBICACION") or "Sincelejo, Sucre"
+
 # --- Verificación por fecha de nacimiento ---
 BIRTHDATE_CHALLENGE_EXPIRES_MINUTES = int(os.getenv("BIRTHDATE_CHALLENGE_EXPIRES_MINUTES") or "10")
 BIRTHDATE_SESSION_MINUTES = int(os.getenv("BIRTHDATE_SESSION_MINUTES") or "30")
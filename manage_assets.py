@@ -0,0 +1,188 @@
+"""CLI para compilar los recursos estáticos (CSS/JS) antes de desplegar.
+
+Genera en static/dist/ los paquetes minificados con huella de contenido en
+el nombre (p. ej. js/main.3f9a1c2b7d4e.js), sus variantes .gz y .br y el
+manifest.json que usa `url_recurso` en las plantillas. Las páginas piden los
+nombres con huella, que se sirven como inmutables con caché de un año: un
+despliegue con cambios cambia la huella y los navegadores descargan lo nuevo.
+
+Las librerías de terceros (sweetalert2, iconos lucide) se vendorizan en
+static/vendor/ a versiones fijas y van dentro del paquete JS: las páginas no
+dependen de ningún CDN.
+
+FLUJO SUGERIDO (despliegue):
+  1) python manage_assets.py vendor   (una vez, o al cambiar la versión fijada)
+  2) python manage_assets.py build
+
+CAMBIAR LA VERSION DE UNA LIBRERIA:
+  python manage_assets.py vendor --fijar sweetalert2@11.23.0
+  (pegar la entrada impresa en VENDOR, ejecutar `vendor` y versionar el archivo)
+
+EJEMPLOS RAPIDOS:
+  python manage_assets.py vendor
+  python manage_assets.py vendor --fijar sweetalert2@11.23.0
+  python manage_assets.py iconos
+  python manage_assets.py build
+  python manage_assets.py clean
+
+NOTAS:
+- Minificación: rjsmin y rcssmin; brotli para las variantes .br. Si no están
+  instalados se compila igual (sin minificar / sin .br).
+- Al usar un icono nuevo (data-lucide="...") ejecute `iconos` y versione
+  static/vendor/lucide/iconos.js.
+- Sin compilar, las plantillas usan los archivos originales de static/.
+- Los paquetes (qué fuentes van en cada archivo) se definen en backend/recursos.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+
+
+def _tamano(ruta: Path) -> str:
+    return f"{ruta.stat().st_size / 1024:.1f} KB" if ruta.is_file() else "-"
+
+
+def cmd_build() -> int:
+    from backend.recursos import DIRECTORIO_DIST, PAQUETES, brotli, construir_recursos, rcssmin, rjsmin  # type: ignore
+
+    if rjsmin is None or rcssmin is None:
+        print("Aviso: falta rjsmin o rcssmin; los paquetes se generan sin minificar.")
+    if brotli is None:
+        print("Aviso: falta brotli; no se generan variantes .br.")
+
+    try:
+        manifiesto = construir_recursos(STATIC_DIR)
+    except (FileNotFoundError, ValueError) as e:
+        print(str(e))
+        return 1
+    for nombre, compilado in manifiesto.items():
+        original = sum((STATIC_DIR / f).stat().st_size for f in PAQUETES[nombre]) / 1024
+        ruta = STATIC_DIR / compilado
+        print(
+            f"{nombre}\t-> {compilado}\toriginal:{original:.1f} KB\tmin:{_tamano(ruta)}"
+            f"\tgz:{_tamano(ruta.with_name(ruta.name + '.gz'))}\tbr:{_tamano(ruta.with_name(ruta.name + '.br'))}"
+        )
+    print(f"Manifiesto: static/{DIRECTORIO_DIST}/manifest.json (reinicie la app para usarlo)")
+    return 0
+
+
+def cmd_vendor(fijar: str | None) -> int:
+    from backend.recursos import VENDOR, descargar_vendor, fijar_vendor  # type: ignore
+
+    if fijar:
+        paquete, _, version = fijar.rpartition("@")
+        if paquete not in VENDOR or not version:
+            print(f"Use paquete@versión con un paquete de VENDOR ({', '.join(VENDOR)}).")
+            return 2
+        try:
+            entrada = fijar_vendor(paquete, version)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"No se pudo consultar el registro: {e}")
+            return 1
+        print("Reemplace la entrada en VENDOR (backend/recursos.py) y ejecute `vendor`:")
+        print(f"    {paquete!r}: {entrada!r},")
+        return 0
+
+    try:
+        descargadas = descargar_vendor(STATIC_DIR)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"No se pudo descargar: {e}")
+        return 1
+
+    for paquete, version in descargadas.items():
+        for destino, _ in VENDOR[paquete][2].values():
+            print(f"{paquete}@{version}\t-> static/{destino}\t{_tamano(STATIC_DIR / destino)}")
+    return 0
+
+
+def cmd_iconos() -> int:
+    from backend.recursos import ICONOS_LUCIDE, generar_iconos_lucide  # type: ignore
+
+    try:
+        nombres = generar_iconos_lucide(STATIC_DIR, TEMPLATES_DIR)
+    except (RuntimeError, ValueError) as e:
+        print(str(e))
+        return 1
+
+    print(f"{len(nombres)} iconos -> static/{ICONOS_LUCIDE}\t{_tamano(STATIC_DIR / ICONOS_LUCIDE)}")
+    print(", ".join(nombres))
+    return 0
+
+
+def cmd_clean() -> int:
+    from backend.recursos import limpiar_recursos  # type: ignore
+
+    borrados = limpiar_recursos(STATIC_DIR)
+    print(f"Eliminados {borrados} archivos compilados.")
+    return 0
+
+
+EPILOG = """USO:
+  python manage_assets.py <comando>
+
+COMANDOS:
+  vendor [--fijar paquete@versión]
+    - Descarga a static/vendor/ las librerías de npm a la versión fijada en
+      backend/recursos.py (VENDOR). El tarball y cada archivo deben coincidir
+      con las integridades (sha512) fijadas ahí; si no, no escribe nada.
+    - --fijar: consulta el registro e imprime la entrada de VENDOR (versión e
+      integridades) para esa versión. No descarga a static/.
+
+  iconos
+    - Genera static/vendor/lucide/iconos.js solo con los iconos usados en
+      templates/ y static/js/.
+
+  build
+    - Minifica, pone huella y precomprime los paquetes en static/dist/.
+    - Se niega a compilar si un archivo vendorizado no coincide con VENDOR.
+    - Conserva la compilación anterior y elimina las más viejas.
+
+  clean
+    - Elimina static/dist/ (las páginas vuelven a usar los originales).
+"""
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="manage_assets.py",
+        description="CLI para compilar los recursos estáticos (CSS/JS).",
+        formatter_class=argparse.RawTextHelpFormatter,
+        epilog=EPILOG,
+    )
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    p_vendor = sub.add_parser("vendor", help="Descargar librerías de terceros (versión fija)")
+    p_vendor.add_argument("--fijar", metavar="PAQUETE@VERSION", help="Imprimir la entrada de VENDOR para esa versión")
+    sub.add_parser("iconos", help="Generar los iconos lucide usados")
+    sub.add_parser("build", help="Compilar recursos")
+    sub.add_parser("clean", help="Eliminar recursos compilados")
+
+    return p
+
+
+def main(argv: list[str]) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.cmd == "vendor":
+        return cmd_vendor(args.fijar)
+    if args.cmd == "iconos":
+        return cmd_iconos()
+    if args.cmd == "build":
+        return cmd_build()
+    if args.cmd == "clean":
+        return cmd_clean()
+
+    parser.print_help()
+    return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
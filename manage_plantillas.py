@@ -0,0 +1,173 @@
+"""CREADO PARA USARSE DURANTE EL DESARROLLO DE LA APLICACIÓN
+
+CLI para administrar las versiones de la plantilla de certificados.
+
+La plantilla (encabezado, NIT, resolución, textos legales, pie) se guarda
+versionada en la tabla `versiones_plantilla`. Publicar una versión nueva no
+requiere redesplegar: las emisiones siguientes la usan de inmediato y los
+certificados ya emitidos conservan la versión con la que se generaron.
+
+FLUJO SUGERIDO:
+  1) Exportar la versión vigente a un archivo JSON.
+  2) Editar los textos.
+  3) Publicar el archivo como versión nueva (se valida antes de guardar).
+
+EJEMPLOS RAPIDOS:
+  python manage_plantillas.py list
+  python manage_plantillas.py export --out plantilla.json
+  python manage_plantillas.py export --version 1 --out plantilla_v1.json
+  python manage_plantillas.py publish --file plantilla.json --por "Juan Perez"
+
+NOTAS:
+- Las versiones publicadas no se editan ni se eliminan.
+- Campos disponibles en los textos: ver backend/plantillas.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+
+def _bootstrap_app():
+    """Carga .env e inicializa la app/DB con el mismo stack del proyecto."""
+    load_dotenv(override=False)
+    from app import crear_app  # type: ignore
+
+    app = crear_app()
+    return app
+
+
+def _fmt_dt(dt: datetime | None) -> str:
+    if not dt:
+        return ""
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def cmd_list(app) -> int:
+    from backend.plantillas import version_vigente  # type: ignore
+    from models import VersionPlantilla  # type: ignore
+
+    with app.app_context():
+        rows = VersionPlantilla.query.order_by(VersionPlantilla.version.desc()).all()
+        vigente = version_vigente()
+        if not rows:
+            print("v1\t(plantilla original, sin publicaciones)\tvigente")
+            return 0
+
+        for r in rows:
+            marca = "vigente" if r.version == vigente else ""
+            print(f"v{r.version}\tpublicada:{_fmt_dt(r.publicada_en)}\tpor:{r.publicada_por or ''}\t{marca}")
+
+    return 0
+
+
+def cmd_export(app, version: int | None, out: str | None) -> int:
+    from backend.plantillas import definicion_plantilla, version_vigente  # type: ignore
+
+    with app.app_context():
+        if version is None:
+            version = version_vigente()
+        try:
+            definicion = definicion_plantilla(version)
+        except LookupError as e:
+            print(str(e))
+            return 1
+
+    data = json.dumps(definicion, ensure_ascii=False, indent=2) + "\n"
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            f.write(data)
+        print(f"Versión {version} exportada a {out}")
+    else:
+        sys.stdout.write(data)
+    return 0
+
+
+def cmd_publish(app, path: str, por: str | None) -> int:
+    from backend.plantillas import publicar_plantilla  # type: ignore
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            definicion = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"No se pudo leer {path}: {e}")
+        return 2
+
+    with app.app_context():
+        try:
+            version = publicar_plantilla(definicion, publicada_por=(por or "").strip() or None)
+        except ValueError as e:
+            print(f"Plantilla inválida: {e}")
+            return 2
+
+    print(f"Publicada la versión {version}. Las emisiones nuevas ya la usan.")
+    return 0
+
+
+EPILOG = """USO:
+  python manage_plantillas.py <comando> [opciones]
+
+COMANDOS:
+  list
+    - Lista las versiones publicadas y marca la vigente.
+
+  export
+    - Escribe la definición JSON de una versión.
+    - Opcional: --version N (por defecto la vigente), --out archivo.json (por defecto stdout)
+
+  publish
+    - Valida y publica un archivo JSON como versión nueva (queda vigente).
+    - Requiere: --file archivo.json
+    - Opcional: --por "nombre de quien publica"
+"""
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="manage_plantillas.py",
+        description="CLI para administrar las versiones de la plantilla de certificados.",
+        formatter_class=argparse.RawTextHelpFormatter,
+        epilog=EPILOG,
+    )
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("list", help="Listar versiones")
+
+    p_exp = sub.add_parser("export", help="Exportar una versión a JSON")
+    p_exp.add_argument("--version", type=int, default=None)
+    p_exp.add_argument("--out", default=None)
+
+    p_pub = sub.add_parser("publish", help="Publicar una versión nueva")
+    p_pub.add_argument("--file", required=True)
+    p_pub.add_argument("--por", default=None)
+
+    return p
+
+
+def main(argv: list[str]) -> int:
+    os.environ.setdefault("APP_MODE", os.getenv("APP_MODE", "development"))
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    app = _bootstrap_app()
+
+    if args.cmd == "list":
+        return cmd_list(app)
+    if args.cmd == "export":
+        return cmd_export(app, version=args.version, out=args.out)
+    if args.cmd == "publish":
+        return cmd_publish(app, path=args.file, por=args.por)
+
+    parser.print_help()
+    return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -4,6 +4,7 @@ from .documento_generado import DocumentoGenerado
 from .bloqueo_verificacion import BloqueoVerificacion
 from .admin_user import AdminUser
 from .admin_login_attempt import AdminLoginAttempt
+from .version_plantilla import VersionPlantilla
 
 __all__ = [
     "db",
@@ -13,4 +14,5 @@ __all__ = [
     "BloqueoVerificacion",
     "AdminUser",
     "AdminLoginAttempt",
+    "VersionPlantilla",
 ]
@@ -34,6 +34,9 @@ class Ciudadano(db.Model):
 
     fecha_registro = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Último cambio del registro (validadores HTTP de certificados y verificación).
+    actualizado_en = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+
     def __repr__(self) -> str:
         return f"<Ciudadano {self.numero_documento} - {self.nombre_completo}>"
 
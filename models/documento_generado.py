@@ -41,6 +41,23 @@ class DocumentoGenerado(db.Model):
     # Se almacena como texto plano (sin HTML). El PDF se encarga de escaparlo.
     texto_personalizado = db.Column(db.Text, nullable=True)
 
+    # QR precalculado al emitir: enlace codificado y matriz de módulos empaquetada
+    # (1 byte de tamaño + 1 bit por módulo). El render solo lo dibuja.
+    qr_datos = db.Column(db.String(255), nullable=True)
+    qr_matriz = db.Column(db.LargeBinary, nullable=True)
+
+    # Versión de la plantilla (VersionPlantilla) con la que se emitió. Los
+    # re-renders usan siempre esta versión, aunque se publique una nueva.
+    plantilla_version = db.Column(db.Integer, nullable=False, default=1)
+
+    # Con PDF_FIRMA_DIGITAL: PDF firmado y la huella del contenido firmado
+    # (clave_certificado). Se sirve este mismo archivo mientras la huella no
+    # cambie; si cambian los datos del titular, el firmante o el render, se
+    # vuelve a firmar. Diferido para no cargarlo en cada consulta del registro.
+    pdf_firmado = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    firma_huella = db.Column(db.String(64), nullable=True)
+    firmado_en = db.Column(db.DateTime, nullable=True)
+
     # Ruta del archivo generado (absoluta). No se expone al cliente.
     pdf_path = db.Column(db.String(300), nullable=False)
 
@@ -29,6 +29,19 @@ def asegurar_columna_activo() -> None:
             conn.execute(text("ALTER TABLE ciudadanos ADD COLUMN activo BOOLEAN NOT NULL DEFAULT 1"))
 
 
+def asegurar_columna_actualizado_en() -> None:
+    """Agrega la columna actualizado_en si la BD ya existía y no la tiene.
+
+    Los registros antiguos quedan en NULL: se toma fecha_registro como último cambio.
+    """
+    engine = db.engine
+    with engine.begin() as conn:
+        info = conn.execute(text("PRAGMA table_info(ciudadanos)")).fetchall()
+        columnas = {row[1] for row in info}
+        if "actualizado_en" not in columnas:
+            conn.execute(text("ALTER TABLE ciudadanos ADD COLUMN actualizado_en DATETIME"))
+
+
 def asegurar_columnas_admin_users() -> None:
     """Agrega columnas de seguridad a la tabla admin_users si no existen.
 
@@ -89,6 +102,50 @@ def asegurar_columnas_certificados_especiales() -> None:
         if "texto_personalizado" not in columnas:
             conn.execute(text("ALTER TABLE documentos_generados ADD COLUMN texto_personalizado TEXT"))
 
+def asegurar_columnas_qr_documentos() -> None:
+    """Agrega las columnas del QR precalculado a documentos_generados.
+
+    Los registros antiguos quedan en NULL y su QR se codifica al renderizar.
+    """
+    engine = db.engine
+    with engine.begin() as conn:
+        info = conn.execute(text("PRAGMA table_info(documentos_generados)")).fetchall()
+        columnas = {row[1] for row in info}
+
+        if "qr_datos" not in columnas:
+            conn.execute(text("ALTER TABLE documentos_generados ADD COLUMN qr_datos TEXT"))
+        if "qr_matriz" not in columnas:
+            conn.execute(text("ALTER TABLE documentos_generados ADD COLUMN qr_matriz BLOB"))
+
+
+def asegurar_columna_plantilla_documentos() -> None:
+    """Agrega plantilla_version a documentos_generados.
+
+    Los registros antiguos quedan con la versión 1 (la plantilla original).
+    """
+    engine = db.engine
+    with engine.begin() as conn:
+        info = conn.execute(text("PRAGMA table_info(documentos_generados)")).fetchall()
+        columnas = {row[1] for row in info}
+        if "plantilla_version" not in columnas:
+            conn.execute(text("ALTER TABLE documentos_generados ADD COLUMN plantilla_version INTEGER NOT NULL DEFAULT 1"))
+
+
+def asegurar_columnas_firma_documentos() -> None:
+    """Agrega las columnas del PDF firmado digitalmente a documentos_generados."""
+    engine = db.engine
+    with engine.begin() as conn:
+        info = conn.execute(text("PRAGMA table_info(documentos_generados)")).fetchall()
+        columnas = {row[1] for row in info}
+
+        if "pdf_firmado" not in columnas:
+            conn.execute(text("ALTER TABLE documentos_generados ADD COLUMN pdf_firmado BLOB"))
+        if "firmado_en" not in columnas:
+            conn.execute(text("ALTER TABLE documentos_generados ADD COLUMN firmado_en DATETIME"))
+        if "firma_huella" not in columnas:
+            conn.execute(text("ALTER TABLE documentos_generados ADD COLUMN firma_huella VARCHAR(64)"))
+
+
 def asegurar_tablas() -> None:
     """Crea tablas y aplica migraciones ligeras compatibles con SQLite."""
     db.create_all()
@@ -99,6 +156,10 @@ def asegurar_tablas() -> None:
         conn.execute(text("DROP TABLE IF EXISTS retos_fecha_nacimiento"))
     asegurar_columna_fecha_nacimiento()
     asegurar_columna_activo()
+    asegurar_columna_actualizado_en()
     asegurar_columnas_admin_users()
     asegurar_columna_generado_por_documentos()
     asegurar_columnas_certificados_especiales()
+    asegurar_columnas_qr_documentos()
+    asegurar_columna_plantilla_documentos()
+    asegurar_columnas_firma_documentos()
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from .db import db
+
+
+class VersionPlantilla(db.Model):
+    """Versión publicada de la plantilla de certificados.
+
+    - La definición (textos del encabezado, preámbulo, leyendas...) se guarda
+      como JSON; ver backend/plantillas.py.
+    - Las versiones no se editan: un cambio se publica como versión nueva y
+      cada DocumentoGenerado conserva la versión con la que se emitió.
+    """
+
+    __tablename__ = "versiones_plantilla"
+
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    definicion = db.Column(db.Text, nullable=False)
+    publicada_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    publicada_por = db.Column(db.String(120), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<VersionPlantilla v{self.version}>"
@@ -1070,6 +1070,10 @@ document.addEventListener('DOMContentLoaded', () => {
   });
 
   const flashEl = document.querySelector('[data-flash-kind][data-flash-text]');
+  if (flashEl && !(window.Swal && typeof window.Swal.fire === 'function')) {
+    // Sin sweetalert2 el aviso se muestra en la página.
+    flashEl.style.display = '';
+  }
   if (flashEl && window.Swal && typeof window.Swal.fire === 'function') {
     const kind = (flashEl.getAttribute('data-flash-kind') || 'info').toLowerCase();
     const text = flashEl.getAttribute('data-flash-text') || '';
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ))
+
+# config.py lee el entorno al importarse (y lo importan los módulos de
+# backend), así que BD, certificados y firma de prueba se fijan antes de
+# recolectar las pruebas.
+_BASE = Path(tempfile.mkdtemp(prefix="cabildo_pruebas_"))
+_FIRMA = _BASE / "firma.png"
+_imagen = Image.new("RGBA", (300, 120), (0, 0, 0, 0))
+_imagen.paste((20, 20, 90, 255), (20, 60, 280, 66))
+_imagen.save(_FIRMA)
+
+os.environ.update(
+    APP_MODE="development",
+    DATABASE_DIR=str(_BASE / "db"),
+    CERTIFICADOS_DIR=str(_BASE / "generated"),
+    SECRET_KEY="pruebas",
+    SEED_ON_START="0",
+    ENABLE_CSRF="0",
+    ENABLE_RATELIMIT="0",
+    ENABLE_SECURITY_HEADERS="0",
+    RENDER_WORKERS="0",
+    CAPITAN_MENOR_FIRMA_RUTA=str(_FIRMA),
+)
+
+_documentos = itertools.count(10_000_001)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_BASE, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def app():
+    """App con BD y certificados en un directorio temporal (una por sesión)."""
+    from app import crear_app
+
+    return crear_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(client):
+    with client.session_transaction() as sesion:
+        sesion["admin_logged_in"] = True
+    return client
+
+
+@pytest.fixture
+def ciudadano(app):
+    """Ciudadano nuevo en cada prueba (documento distinto)."""
+    from models import Ciudadano, db
+
+    with app.app_context():
+        c = Ciudadano(
+            nombre_completo="Juan Pérez García",
+            tipo_documento="CC",
+            numero_documento=str(next(_documentos)),
+            fecha_nacimiento=date(1990, 1, 1),
+        )
+        db.session.add(c)
+        db.session.commit()
+        return c.id
+
+
+@pytest.fixture
+def codigo(app, ciudadano):
+    """Código de un certificado de afiliación emitido para `ciudadano`."""
+    from backend.certificados import generar_o_reutilizar_certificado
+    from models import Ciudadano, db
+
+    with app.app_context():
+        doc, _ = generar_o_reutilizar_certificado(db.session.get(Ciudadano, ciudadano))
+        return doc.codigo
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import io
+
+from pypdf import PdfReader
+
+from models import Ciudadano, DocumentoGenerado, db
+
+
+def _descargas(app, codigo: str) -> int:
+    with app.app_context():
+        return DocumentoGenerado.query.filter_by(codigo=codigo).one().descargas or 0
+
+
+def _texto_pdf(data: bytes) -> str:
+    return "".join(p.extract_text() for p in PdfReader(io.BytesIO(data)).pages)
+
+
+def test_descarga_cuenta_y_repite_los_mismos_bytes(app, client, codigo):
+    r1 = client.get(f"/certificados/descargar/{codigo}")
+    r2 = client.get(f"/certificados/descargar/{codigo}")
+
+    assert r1.status_code == r2.status_code == 200
+    assert r1.mimetype == "application/pdf"
+    assert r1.data == r2.data
+    assert r1.headers["ETag"] == r2.headers["ETag"]
+    assert _descargas(app, codigo) == 2
+
+
+def test_revalidacion_responde_304_sin_contar_descarga(app, client, codigo):
+    r = client.get(f"/certificados/descargar/{codigo}")
+    assert r.status_code == 200
+    assert _descargas(app, codigo) == 1
+
+    etag = r.headers["ETag"]
+    r304 = client.get(f"/certificados/descargar/{codigo}", headers={"If-None-Match": etag})
+    assert r304.status_code == 304
+    assert r304.data == b""
+    assert r304.headers["ETag"] == etag
+    assert _descargas(app, codigo) == 1
+
+
+def test_editar_ciudadano_invalida_pdf_y_pagina(app, admin_client, ciudadano, codigo):
+    antes = admin_client.get(f"/certificados/ver/{codigo}")
+    pagina_antes = admin_client.get(f"/verificar-certificados?codigo={codigo}")
+    assert "Juan Pérez García" in _texto_pdf(antes.data)
+    assert "Juan Pérez García" in pagina_antes.get_data(as_text=True)
+
+    with app.app_context():
+        c = db.session.get(Ciudadano, ciudadano)
+        form = {
+            "nombre": "Juana Pérez Gómez",
+            "tipo": c.tipo_documento,
+            "numero": c.numero_documento,
+            "nacimiento": c.fecha_nacimiento.isoformat(),
+            "activo": "1",
+        }
+    r = admin_client.post(f"/admin/ciudadanos/{ciudadano}/editar", data=form)
+    assert r.status_code == 302
+
+    # El validador anterior ya no coincide: se entrega el PDF con los datos nuevos.
+    despues = admin_client.get(f"/certificados/ver/{codigo}", headers={"If-None-Match": antes.headers["ETag"]})
+    assert despues.status_code == 200
+    assert despues.headers["ETag"] != antes.headers["ETag"]
+    assert "Juana Pérez Gómez" in _texto_pdf(despues.data)
+
+    pagina = admin_client.get(f"/verificar-certificados?codigo={codigo}").get_data(as_text=True)
+    assert "Juana Pérez Gómez" in pagina
+    assert "Juan Pérez García" not in pagina
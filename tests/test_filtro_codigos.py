@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from backend.filtro_codigos import FiltroBloom, FiltroCodigos, fecha_codigo
+
+
+def test_bloom_sin_falsos_negativos_y_pocos_positivos():
+    bloom = FiltroBloom(1000)
+    emitidos = [f"CIP20260101080000{i:04d}" for i in range(1000)]
+    for codigo in emitidos:
+        bloom.agregar(codigo)
+
+    assert all(codigo in bloom for codigo in emitidos)
+    falsos = sum(f"CIP20250101080000{i:04d}" in bloom for i in range(10_000))
+    assert falsos < 300  # ~1% a capacidad
+
+
+def test_fecha_codigo():
+    assert fecha_codigo("CIP202601010800001234").isoformat() == "2026-01-01T08:00:00"
+    assert fecha_codigo("CIP2026010108000012") is None
+    assert fecha_codigo("XYZ") is None
+
+
+def test_filtro_rechaza_codigos_desconocidos(app, codigo):
+    with app.app_context():
+        filtro = FiltroCodigos(recarga_s=3600, margen_s=0)
+
+        assert filtro.puede_existir(codigo)
+        assert not filtro.puede_existir("CIP202001010800001234")  # anterior a la carga, no emitido
+        assert not filtro.puede_existir("CIP209901010800001234")  # fecha futura
+        assert not filtro.puede_existir("NO-ES-UN-CODIGO")
+
+        filtro.registrar("CIP202001010800004321")
+        assert filtro.puede_existir("CIP202001010800004321")
+
+        stats = filtro.estadisticas()
+    assert stats["consultados"] == 2
+    assert stats["rechazados"] == 3
+
+
+def test_codigo_desconocido_responde_404(client):
+    assert client.get("/certificados/descargar/CIP202001010800001234").status_code == 404
+    assert client.get("/certificados/ver/CIP202001010800009999").status_code == 404
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from backend.pdf import generar_certificado_pdf_bytes
+
+
+TITULAR = SimpleNamespace(nombre_completo="Ana María Pérez", tipo_documento="CC", numero_documento="1102858449")
+
+
+def _render(**kwargs) -> bytes:
+    datos = dict(
+        ciudadano=TITULAR,
+        codigo="CIP202601010800001234",
+        verify_url="http://localhost/v/CIP202601010800001234",
+        emitido_en_utc=datetime(2026, 1, 1, 8, 0),
+    )
+    datos.update(kwargs)
+    return generar_certificado_pdf_bytes(**datos)
+
+
+@pytest.mark.parametrize("motor", ["canvas", "platypus"])
+@pytest.mark.parametrize("compacto", [True, False])
+def test_render_determinista(app, motor, compacto):
+    with app.app_context():
+        app.config.update(PDF_MOTOR=motor, PDF_COMPACTO=compacto)
+        try:
+            primero = _render()
+            segundo = _render()
+        finally:
+            app.config.update(PDF_MOTOR="canvas", PDF_COMPACTO=True)
+    assert primero.startswith(b"%PDF-")
+    assert primero == segundo
+
+
+def test_render_depende_de_los_datos(app):
+    with app.app_context():
+        base = _render()
+        otro_titular = _render(ciudadano=SimpleNamespace(**{**vars(TITULAR), "nombre_completo": "Otro Nombre"}))
+        otra_fecha = _render(emitido_en_utc=datetime(2026, 1, 2, 8, 0))
+    assert base != otro_titular
+    assert base != otra_fecha